@@ -0,0 +1,84 @@
+"""
+Short-lived per-user cache for the activity dashboard.
+
+The dashboard is rebuilt from audit_logs and user_sessions. It only
+changes when something is audited, so entries live for
+ACTIVITY_CACHE_TTL seconds (default 30). log_audit() drops the user's
+entry when it queues an event, and the audit pipeline drops it again once
+the event is written.
+
+The cache is per process. With several workers, the other workers may
+serve a stale dashboard for at most the TTL.
+"""
+
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+ACTIVITY_CACHE_TTL = float(os.getenv("ACTIVITY_CACHE_TTL", "30"))
+ACTIVITY_CACHE_SIZE = int(os.getenv("ACTIVITY_CACHE_SIZE", "10000"))
+
+
+class ActivityCache:
+    """Thread-safe user_id -> (expires_at, dashboard) map"""
+
+    def __init__(self, ttl_seconds: float = ACTIVITY_CACHE_TTL, max_entries: int = ACTIVITY_CACHE_SIZE):
+        self.ttl = ttl_seconds
+        self.max_entries = max(0, max_entries)
+        self._entries: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, user_id) -> Optional[Dict[str, Any]]:
+        key = str(user_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry[1]
+
+    def put(self, user_id, dashboard: Dict[str, Any]):
+        if self.ttl <= 0 or self.max_entries == 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                # Drop expired entries first, then the oldest
+                for key in [k for k, (expires_at, _) in self._entries.items() if expires_at < now]:
+                    del self._entries[key]
+                while len(self._entries) >= self.max_entries:
+                    del self._entries[next(iter(self._entries))]
+            self._entries[str(user_id)] = (now + self.ttl, dashboard)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            if self._entries.pop(str(user_id), None) is not None:
+                self.invalidations += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+            }
+
+
+# Singleton instance
+_cache = None
+
+
+def get_activity_cache() -> ActivityCache:
+    """Get or create the activity dashboard cache"""
+    global _cache
+    if _cache is None:
+        _cache = ActivityCache()
+    return _cache
@@ -0,0 +1,228 @@
+"""
+Amortization Engine - EMIs and repayment schedules for arrays of loans.
+
+Every EMI, agreement total, schedule and schedule chart in the backend is
+computed here, so they all agree to the paisa.
+
+Rounding rules (all amounts are held as integer paise internally):
+- EMI = P * r * (1+r)^n / ((1+r)^n - 1), rounded half-up to the paisa
+- Outstanding balance after period k comes from the closed form
+  B_k = P * (1+r)^k - EMI * ((1+r)^k - 1) / r, rounded half-up to the paisa
+- Principal component of period k = B_{k-1} - B_k and
+  interest component = EMI - principal, so every row adds up exactly
+- The final installment clears the balance: principal = B_{n-1},
+  interest = B_{n-1} * r (rounded). It absorbs the EMI rounding residue.
+
+Due dates fall on the same day of the month as the start date, shifted k
+calendar months and clamped to the month end (31 Jan -> 28/29 Feb).
+
+Schedules are built without Python loops. A portfolio of loans with
+different tenures is laid out as one flat array of periods, so
+regenerating 100k schedules takes a few seconds.
+"""
+
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+ArrayLike = Union[float, int, Sequence[float], np.ndarray]
+
+# Guards half-up rounding against binary representation (1.005 -> 1.01)
+PAISE_EPSILON = 1e-6
+
+
+def to_paise(amount: ArrayLike) -> np.ndarray:
+    """Rupees -> integer paise, rounded half-up"""
+    return np.floor(np.asarray(amount, dtype=np.float64) * 100 + 0.5 + PAISE_EPSILON).astype(np.int64)
+
+
+def to_rupees(paise: ArrayLike) -> np.ndarray:
+    return np.asarray(paise, dtype=np.int64) / 100
+
+
+def _monthly_rate(annual_rate: ArrayLike) -> np.ndarray:
+    return np.asarray(annual_rate, dtype=np.float64) / (12 * 100)
+
+
+def _closed_form_balance(principal, monthly_rate, emi, periods) -> np.ndarray:
+    """Outstanding balance (rupees, unrounded) after `periods` installments"""
+    growth = (1 + monthly_rate) ** periods
+    with np.errstate(divide='ignore', invalid='ignore'):
+        paid = np.where(monthly_rate == 0, emi * periods, emi * (growth - 1) / monthly_rate)
+    return principal * growth - paid
+
+
+def emi(principal: ArrayLike, annual_rate: ArrayLike, tenure_months: ArrayLike) -> np.ndarray:
+    """EMI in rupees (paise-exact) for each loan"""
+    return to_rupees(_emi_paise(principal, annual_rate, tenure_months))
+
+
+def _emi_paise(principal, annual_rate, tenure_months) -> np.ndarray:
+    principal = np.asarray(principal, dtype=np.float64)
+    tenure = np.maximum(np.asarray(tenure_months, dtype=np.float64), 1)
+    monthly_rate = _monthly_rate(annual_rate)
+
+    factor = (1 + monthly_rate) ** tenure
+    with np.errstate(divide='ignore', invalid='ignore'):
+        raw = np.where(
+            monthly_rate == 0,
+            principal / tenure,
+            principal * monthly_rate * factor / (factor - 1)
+        )
+    return to_paise(raw)
+
+
+def totals(principal: ArrayLike, annual_rate: ArrayLike, tenure_months: ArrayLike) -> Dict[str, np.ndarray]:
+    """
+    EMI, total repayment and total interest per loan, equal to the sums of
+    the full schedule but computed from the closed form in O(1) per loan.
+    """
+    principal = np.asarray(principal, dtype=np.float64)
+    tenure = np.maximum(np.asarray(tenure_months, dtype=np.int64), 1)
+    monthly_rate = _monthly_rate(annual_rate)
+    emi_paise = _emi_paise(principal, annual_rate, tenure)
+
+    last_balance = to_paise(_closed_form_balance(principal, monthly_rate, to_rupees(emi_paise), tenure - 1))
+    last_balance = np.maximum(last_balance, 0)
+    last_installment = last_balance + to_paise(to_rupees(last_balance) * monthly_rate)
+
+    repayment_paise = emi_paise * (tenure - 1) + last_installment
+    return {
+        'emi': to_rupees(emi_paise),
+        'total_repayment': to_rupees(repayment_paise),
+        'total_interest': to_rupees(repayment_paise - to_paise(principal)),
+    }
+
+
+def add_months(start: np.ndarray, months: np.ndarray) -> np.ndarray:
+    """Calendar month arithmetic on datetime64[D] arrays, clamped to month end"""
+    start = np.asarray(start, dtype='datetime64[D]')
+    start_month = start.astype('datetime64[M]')
+    day_offset = (start - start_month.astype('datetime64[D]')).astype(np.int64)
+
+    target_month = start_month + np.asarray(months, dtype=np.int64)
+    month_start = target_month.astype('datetime64[D]')
+    month_end = (target_month + 1).astype('datetime64[D]') - 1
+    return np.minimum(month_start + day_offset, month_end)
+
+
+class PortfolioSchedule:
+    """
+    Flat amortization table for many loans. Row i is installment
+    emi_number[i] of loan loan_index[i]; amounts are integer paise.
+    """
+
+    def __init__(self, loan_index, emi_number, due_date, emi_paise, principal_paise, interest_paise, outstanding_paise):
+        self.loan_index = loan_index
+        self.emi_number = emi_number
+        self.due_date = due_date
+        self.emi_paise = emi_paise
+        self.principal_paise = principal_paise
+        self.interest_paise = interest_paise
+        self.outstanding_paise = outstanding_paise
+
+    def __len__(self) -> int:
+        return len(self.emi_number)
+
+    @property
+    def emi_amount(self) -> np.ndarray:
+        return to_rupees(self.emi_paise)
+
+    @property
+    def principal_component(self) -> np.ndarray:
+        return to_rupees(self.principal_paise)
+
+    @property
+    def interest_component(self) -> np.ndarray:
+        return to_rupees(self.interest_paise)
+
+    @property
+    def outstanding_principal(self) -> np.ndarray:
+        return to_rupees(self.outstanding_paise)
+
+    @property
+    def total_payable(self) -> float:
+        return float(self.emi_paise.sum()) / 100
+
+    @property
+    def total_interest(self) -> float:
+        return float(self.interest_paise.sum()) / 100
+
+    def to_rows(self) -> List[Dict[str, Any]]:
+        """Schedule rows as dicts (the shape stored in the repayments table)"""
+        due_dates = self.due_date.astype(object) if self.due_date is not None else [None] * len(self)
+        return [
+            {
+                "emi_number": int(number),
+                "due_date": due,
+                "emi_amount": emi_amount,
+                "principal_component": principal,
+                "interest_component": interest,
+                "outstanding_principal": outstanding
+            }
+            for number, due, emi_amount, principal, interest, outstanding in zip(
+                self.emi_number.tolist(),
+                due_dates,
+                self.emi_amount.tolist(),
+                self.principal_component.tolist(),
+                self.interest_component.tolist(),
+                self.outstanding_principal.tolist()
+            )
+        ]
+
+
+def portfolio_schedule(
+    principal: ArrayLike,
+    annual_rate: ArrayLike,
+    tenure_months: ArrayLike,
+    start_date: Optional[Union[date, Sequence[date], np.ndarray]] = None
+) -> PortfolioSchedule:
+    """Full schedules for every loan in one vectorized pass"""
+    principal = np.atleast_1d(np.asarray(principal, dtype=np.float64))
+    tenure = np.maximum(np.atleast_1d(np.asarray(tenure_months, dtype=np.int64)), 1)
+    monthly_rate = np.broadcast_to(_monthly_rate(annual_rate), principal.shape)
+    emi_paise = np.broadcast_to(_emi_paise(principal, annual_rate, tenure), principal.shape)
+
+    # One row per installment: loan index + period number (1..n)
+    loan_index = np.repeat(np.arange(principal.size), tenure)
+    offsets = np.cumsum(tenure) - tenure
+    emi_number = np.arange(loan_index.size) - np.repeat(offsets, tenure) + 1
+
+    row_rate = monthly_rate[loan_index]
+    row_emi = emi_paise[loan_index]
+    outstanding = to_paise(_closed_form_balance(
+        principal[loan_index], row_rate, to_rupees(row_emi), emi_number
+    ))
+    outstanding = np.maximum(outstanding, 0)
+
+    # Balance before each installment: previous row, or the principal for row 1
+    opening = np.empty_like(outstanding)
+    opening[1:] = outstanding[:-1]
+    opening[offsets] = to_paise(principal)
+
+    is_last = emi_number == tenure[loan_index]
+    outstanding[is_last] = 0
+    principal_paise = opening - outstanding
+    interest_paise = row_emi - principal_paise
+    interest_paise[is_last] = to_paise(to_rupees(opening[is_last]) * row_rate[is_last])
+    installment = principal_paise + interest_paise
+
+    due_date = None
+    if start_date is not None:
+        starts = np.broadcast_to(np.asarray(start_date, dtype='datetime64[D]'), principal.shape)
+        due_date = add_months(starts[loan_index], emi_number)
+
+    return PortfolioSchedule(
+        loan_index, emi_number, due_date, installment, principal_paise, interest_paise, outstanding
+    )
+
+
+def schedule(
+    principal: float,
+    annual_rate: float,
+    tenure_months: int,
+    start_date: Optional[date] = None
+) -> PortfolioSchedule:
+    """Full schedule for a single loan"""
+    return portfolio_schedule([principal], [annual_rate], [tenure_months], start_date)
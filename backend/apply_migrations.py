@@ -0,0 +1,106 @@
+"""
+Apply the SQL migrations in backend/migrations/ to the configured database.
+
+create_all() only creates missing tables; constraints, indexes and other
+changes to existing tables live in numbered .sql files. Each file runs once,
+in name order, and is recorded in the schema_migrations table.
+
+Files run in one transaction, unless their header has
+"-- migrate: no-transaction" (needed for CREATE INDEX CONCURRENTLY). Those
+run statement by statement in autocommit mode, so each statement must be
+idempotent (IF NOT EXISTS).
+
+A header line "-- migrate: skip-if <query>" names a query returning one
+boolean. When it is true the file is recorded as applied without running,
+e.g. when create_all() already built the schema the file would change.
+The header is the comment block at the top of the file.
+
+Usage: python apply_migrations.py [--list]
+"""
+import asyncio
+import os
+import sys
+
+from sqlalchemy import text
+
+import database
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+DIRECTIVE_PREFIX = "-- migrate:"
+
+
+def split_statements(sql: str):
+    """Statements of a no-transaction file: comments dropped, split on ';' at line end"""
+    lines = [line for line in sql.splitlines() if not line.strip().startswith("--")]
+    statements = (statement.strip().rstrip(";").strip() for statement in "\n".join(lines).split(";\n"))
+    return [statement for statement in statements if statement]
+
+
+def directives(sql: str):
+    """"-- migrate: ..." lines of the header -> {"no-transaction": "", "skip-if": "<query>", ...}"""
+    found = {}
+    for line in sql.splitlines():
+        line = line.strip()
+        if not line.startswith("--"):
+            break
+        if line.startswith(DIRECTIVE_PREFIX):
+            name, _, argument = line[len(DIRECTIVE_PREFIX):].strip().partition(" ")
+            found[name] = argument.strip()
+    return found
+
+
+def migration_files():
+    return sorted(name for name in os.listdir(MIGRATIONS_DIR) if name.endswith(".sql"))
+
+
+async def apply_migrations(list_only: bool = False, engine=None):
+    engine = engine or database.engine
+    print(f"Connecting to database...")
+    async with engine.begin() as conn:
+        await conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            " name VARCHAR(255) PRIMARY KEY,"
+            " applied_at TIMESTAMPTZ NOT NULL DEFAULT now())"
+        ))
+        applied = set((await conn.execute(text("SELECT name FROM schema_migrations"))).scalars().all())
+
+    for name in migration_files():
+        if name in applied:
+            print(f"  [applied] {name}")
+            continue
+        if list_only:
+            print(f"  [pending] {name}")
+            continue
+
+        with open(os.path.join(MIGRATIONS_DIR, name)) as f:
+            sql = f.read()
+
+        options = directives(sql)
+        skip = False
+        if options.get("skip-if"):
+            async with engine.connect() as conn:
+                skip = bool((await conn.exec_driver_sql(options["skip-if"])).scalar())
+
+        if skip:
+            print(f"  Skipping {name} (skip-if condition holds)")
+        elif "no-transaction" in options:
+            print(f"  Applying {name}...")
+            async with engine.connect() as conn:
+                conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+                for statement in split_statements(sql):
+                    await conn.exec_driver_sql(statement)
+        else:
+            print(f"  Applying {name}...")
+            async with engine.begin() as conn:
+                # Files hold several statements; asyncpg runs them as one script
+                raw = await conn.get_raw_connection()
+                await raw.driver_connection.execute(sql)
+
+        async with engine.begin() as conn:
+            await conn.execute(text("INSERT INTO schema_migrations (name) VALUES (:name)"), {"name": name})
+
+    print("Done!")
+
+
+if __name__ == "__main__":
+    asyncio.run(apply_migrations(list_only="--list" in sys.argv))
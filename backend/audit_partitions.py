@@ -0,0 +1,268 @@
+"""
+Audit Log Partitions - monthly range partitions for audit_logs + archival.
+
+On Postgres, audit_logs is partitioned by RANGE (created_at), one partition
+per calendar month (audit_logs_y2026m01, ...) plus audit_logs_default as a
+safety net. The application keeps reading and writing audit_logs itself;
+each partition carries the (user_id, ..., created_at DESC) indexes, so the
+activity queries run the same way as on a plain table.
+
+- ensure_partitions(): creates the current month plus
+  AUDIT_PARTITION_MONTHS_AHEAD (default 3) months ahead. Runs at app
+  startup and then every AUDIT_PARTITION_CHECK_HOURS (default 12).
+- archive_partitions(): handles month partitions that end more than
+  AUDIT_RETENTION_MONTHS (default 24) months ago. Each one is detached,
+  exported to AUDIT_ARCHIVE_DIR as gzip CSV with a JSON manifest (row count
+  and sha256), checked, then dropped. Run it from cron:
+
+    python audit_partitions.py ensure
+    python audit_partitions.py archive [--dry-run]
+
+Other databases (e.g. SQLite in local development) keep a plain table and
+every function here is a no-op.
+"""
+
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+from datetime import date, datetime, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+
+import database
+
+AUDIT_PARTITION_MONTHS_AHEAD = int(os.getenv("AUDIT_PARTITION_MONTHS_AHEAD", "3"))
+AUDIT_PARTITION_CHECK_HOURS = float(os.getenv("AUDIT_PARTITION_CHECK_HOURS", "12"))
+AUDIT_RETENTION_MONTHS = int(os.getenv("AUDIT_RETENTION_MONTHS", "24"))
+AUDIT_ARCHIVE_DIR = os.getenv(
+    "AUDIT_ARCHIVE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "audit_archive")
+)
+
+PARENT_TABLE = "audit_logs"
+DEFAULT_PARTITION = "audit_logs_default"
+# Serializes partition DDL between workers starting at the same time
+ADVISORY_LOCK_KEY = 7_420_181
+
+
+def month_start(day: date) -> date:
+    return date(day.year, day.month, 1)
+
+
+def add_months(day: date, months: int) -> date:
+    index = day.year * 12 + (day.month - 1) + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT_TABLE}_y{month.year:04d}m{month.month:02d}"
+
+
+def parse_partition_name(name: str) -> Optional[date]:
+    """audit_logs_y2026m01 -> date(2026, 1, 1); None for other tables"""
+    prefix = f"{PARENT_TABLE}_y"
+    if not name.startswith(prefix) or len(name) != len(prefix) + 7 or name[len(prefix) + 4] != "m":
+        return None
+    try:
+        return date(int(name[len(prefix):len(prefix) + 4]), int(name[-2:]), 1)
+    except ValueError:
+        return None
+
+
+async def is_partitioned(conn) -> bool:
+    if conn.dialect.name != "postgresql":
+        return False
+    result = await conn.execute(text(
+        "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+        "WHERE c.relname = :table AND c.relnamespace = to_regnamespace(current_schema())::oid"
+    ), {"table": PARENT_TABLE})
+    return result.first() is not None
+
+
+async def list_partitions(conn) -> List[str]:
+    result = await conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = :table ORDER BY c.relname"
+    ), {"table": PARENT_TABLE})
+    return list(result.scalars().all())
+
+
+async def ensure_partitions(conn, months_ahead: int = AUDIT_PARTITION_MONTHS_AHEAD, today: Optional[date] = None) -> List[str]:
+    """Create missing month partitions from this month to months_ahead; returns the new ones"""
+    if not await is_partitioned(conn):
+        return []
+
+    await conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": ADVISORY_LOCK_KEY})
+    existing = set(await list_partitions(conn))
+    created = []
+
+    if DEFAULT_PARTITION not in existing:
+        await conn.execute(text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {PARENT_TABLE} DEFAULT"))
+        created.append(DEFAULT_PARTITION)
+
+    first = month_start(today or datetime.now(timezone.utc).date())
+    for offset in range(months_ahead + 1):
+        month = add_months(first, offset)
+        name = partition_name(month)
+        if name in existing:
+            continue
+        await conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {PARENT_TABLE} "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+        ))
+        created.append(name)
+
+    if created:
+        print(f"[AuditPartitions] Created {', '.join(created)}")
+    return created
+
+
+async def ensure_partitions_now():
+    """Own connection + transaction; errors are logged, never raised"""
+    try:
+        async with database.engine.begin() as conn:
+            await ensure_partitions(conn)
+    except Exception as e:
+        print(f"[AuditPartitions] Partition check failed: {e}")
+
+
+async def maintenance_loop():
+    """Startup task: keep future partitions in place for as long as the app runs"""
+    while True:
+        await asyncio.sleep(AUDIT_PARTITION_CHECK_HOURS * 3600)
+        await ensure_partitions_now()
+
+
+async def list_detached(conn) -> List[str]:
+    """Month tables left detached by an interrupted archive run"""
+    result = await conn.execute(text(
+        "SELECT relname FROM pg_class "
+        "WHERE relkind = 'r' AND NOT relispartition AND relname ~ :pattern "
+        "AND relnamespace = to_regnamespace(current_schema())::oid ORDER BY relname"
+    ), {"pattern": f"^{PARENT_TABLE}_y[0-9]{{4}}m[0-9]{{2}}$"})
+    return list(result.scalars().all())
+
+
+def archive_candidates(partitions: List[str], retention_months: int, today: date) -> List[Tuple[str, date]]:
+    """Month partitions whose whole range is older than the retention window"""
+    cutoff = add_months(month_start(today), -retention_months)
+    candidates = []
+    for name in partitions:
+        month = parse_partition_name(name)
+        if month is not None and add_months(month, 1) <= cutoff:
+            candidates.append((name, month))
+    return sorted(candidates, key=lambda item: item[1])
+
+
+async def _export_partition(raw_conn, name: str, archive_dir: str) -> dict:
+    """COPY a (detached) partition to gzip CSV; returns the manifest"""
+    os.makedirs(archive_dir, exist_ok=True)
+    path = os.path.join(archive_dir, f"{name}.csv.gz")
+    tmp_path = path + ".tmp"
+    digest = hashlib.sha256()
+
+    with gzip.open(tmp_path, "wb") as out:
+        async def write(chunk: bytes):
+            out.write(chunk)
+            digest.update(chunk)
+
+        await raw_conn.copy_from_table(name, output=write, format="csv", header=True)
+
+    rows = await raw_conn.fetchval(f"SELECT count(*) FROM {name}")
+    os.replace(tmp_path, path)
+    manifest = {
+        "partition": name,
+        "file": os.path.basename(path),
+        "format": "csv.gz",
+        "rows": rows,
+        "sha256_uncompressed": digest.hexdigest(),
+        "archived_at": datetime.now(timezone.utc).isoformat(),
+    }
+    with open(os.path.join(archive_dir, f"{name}.manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def _count_csv_rows(path: str) -> int:
+    """Data rows in an exported file (header excluded; quoted newlines handled)"""
+    import csv
+    with gzip.open(path, "rt", newline="") as f:
+        return sum(1 for _ in csv.reader(f)) - 1
+
+
+async def archive_partitions(
+    retention_months: int = AUDIT_RETENTION_MONTHS,
+    archive_dir: str = AUDIT_ARCHIVE_DIR,
+    dry_run: bool = False,
+    today: Optional[date] = None
+) -> List[dict]:
+    """Detach, export, verify and drop month partitions past retention"""
+    today = today or datetime.now(timezone.utc).date()
+    archived = []
+
+    async with database.engine.connect() as conn:
+        if not await is_partitioned(conn):
+            print("[AuditPartitions] audit_logs is not partitioned - nothing to archive")
+            return []
+        attached = archive_candidates(await list_partitions(conn), retention_months, today)
+        # Retry tables a previous run detached but did not finish archiving
+        leftover = archive_candidates(await list_detached(conn), retention_months, today)
+        await conn.rollback()
+
+    detached = {name for name, _ in leftover}
+    for name, month in sorted(attached + leftover, key=lambda item: item[1]):
+        if dry_run:
+            print(f"[AuditPartitions] Would archive {name} ({month:%Y-%m})")
+            continue
+
+        if name not in detached:
+            async with database.engine.begin() as conn:
+                await conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": ADVISORY_LOCK_KEY})
+                await conn.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+
+        # Detached: invisible to the app, still on disk until exported + verified
+        async with database.engine.connect() as conn:
+            raw = await conn.get_raw_connection()
+            manifest = await _export_partition(raw.driver_connection, name, archive_dir)
+            await conn.rollback()
+
+        exported = _count_csv_rows(os.path.join(archive_dir, manifest["file"]))
+        if exported != manifest["rows"]:
+            print(f"[AuditPartitions] {name}: exported {exported} of {manifest['rows']} rows - keeping the detached table")
+            continue
+
+        async with database.engine.begin() as conn:
+            await conn.execute(text(f"DROP TABLE {name}"))
+        print(f"[AuditPartitions] Archived {name}: {manifest['rows']} rows -> {manifest['file']}")
+        archived.append(manifest)
+
+    return archived
+
+
+async def _main():
+    parser = argparse.ArgumentParser(description="audit_logs partition maintenance")
+    parser.add_argument("command", choices=["ensure", "archive", "list"])
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--retention-months", type=int, default=AUDIT_RETENTION_MONTHS)
+    parser.add_argument("--archive-dir", default=AUDIT_ARCHIVE_DIR)
+    args = parser.parse_args()
+
+    if args.command == "ensure":
+        async with database.engine.begin() as conn:
+            created = await ensure_partitions(conn)
+        print(f"Done! {len(created)} partition(s) created")
+    elif args.command == "list":
+        async with database.engine.connect() as conn:
+            for name in await list_partitions(conn):
+                print(f"  {name}")
+    else:
+        archived = await archive_partitions(args.retention_months, args.archive_dir, args.dry_run)
+        print(f"Done! {len(archived)} partition(s) archived")
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -0,0 +1,409 @@
+"""
+Audit Pipeline - writes audit events in batches, off the request path.
+
+log_audit() only captures the raw event (user agent, client IP, action...)
+and enqueues it. A background task turns queued events into audit_logs
+rows (user agent parsing, IP hashing/masking, location lookup) and writes
+them with one multi-row INSERT per batch. A batch is flushed once
+AUDIT_BATCH_SIZE events are waiting (default 200) or AUDIT_FLUSH_INTERVAL
+seconds (default 1.0) after the first one was queued. Logins and payments
+no longer wait on audit writes.
+
+Events are written independently of the request's transaction. They get
+their id and created_at when they are enqueued, so the timeline order is
+unchanged, but an event can appear in /activity up to one flush interval
+late.
+
+Durability:
+- If the database is unavailable, the batch is appended to a JSONL spool
+  file in AUDIT_SPOOL_DIR (one file per process). Spooled events are
+  replayed into the database once writes succeed again. Spool files left
+  by processes that are no longer running are replayed as well.
+- A row the database rejects (e.g. its user was deleted) is moved to
+  audit_rejected.<pid>.jsonl, so one bad event cannot block its batch.
+- If the queue is full (AUDIT_QUEUE_SIZE, default 20000), new events go
+  straight to the spool file.
+- On shutdown, stop() drains the queue. Anything it cannot write within
+  AUDIT_DRAIN_TIMEOUT seconds (default 10) is spooled.
+"""
+
+import asyncio
+import glob
+import json
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.exc import DataError, IntegrityError
+
+import database
+import models
+
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "200"))
+AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", "1.0"))
+AUDIT_QUEUE_SIZE = int(os.getenv("AUDIT_QUEUE_SIZE", "20000"))
+AUDIT_DRAIN_TIMEOUT = float(os.getenv("AUDIT_DRAIN_TIMEOUT", "10"))
+AUDIT_REPLAY_INTERVAL = float(os.getenv("AUDIT_REPLAY_INTERVAL", "30"))
+AUDIT_SPOOL_DIR = os.getenv(
+    "AUDIT_SPOOL_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "audit_spool")
+)
+
+UUID_FIELDS = ("id", "user_id", "entity_id", "session_id")
+
+
+def capture_event(
+    user_id,
+    action: str,
+    entity_type: str = None,
+    entity_id=None,
+    description: str = None,
+    metadata: dict = None,
+    request=None,
+    session_id=None
+) -> Dict[str, Any]:
+    """Everything needed to build the audit row later; cheap enough for the request path"""
+    user_agent = None
+    ip = None
+    if request:
+        import device_utils
+        user_agent = request.headers.get("User-Agent", "")
+        ip = device_utils.get_client_ip(request)
+
+    return {
+        "id": uuid.uuid4(),
+        "created_at": datetime.now(timezone.utc),
+        "user_id": user_id,
+        "action": action,
+        "entity_type": entity_type,
+        "entity_id": entity_id,
+        "description": description,
+        "metadata": metadata,
+        "session_id": session_id,
+        "user_agent": user_agent,
+        "ip": ip,
+    }
+
+
+def build_row(event: Dict[str, Any]) -> Dict[str, Any]:
+    """Captured event -> audit_logs row (device, IP and location enrichment happens here)"""
+    import device_utils
+
+    row = {
+        "id": event["id"],
+        "created_at": event["created_at"],
+        "user_id": event["user_id"],
+        "action": event["action"],
+        "event_category": models.AuditAction.get_category(event["action"]),
+        "severity": models.AuditAction.get_severity(event["action"]),
+        "entity_type": event["entity_type"],
+        "entity_id": event["entity_id"],
+        "description": event["description"],
+        "extra_data": event["metadata"],
+        "session_id": event["session_id"],
+        "device_type": None,
+        "browser": None,
+        "os": None,
+        "ip_hash": None,
+        "ip_address": None,
+        "location_city": None,
+        "location_country": None,
+        "user_agent": event["user_agent"],
+    }
+
+    if event["user_agent"] is not None or event["ip"] is not None:
+        device_info = device_utils.parse_user_agent(event["user_agent"] or "")
+        location = device_utils.get_location_from_ip(event["ip"])
+        row.update(
+            device_type=device_info.get("device_type"),
+            browser=device_info.get("browser"),
+            os=device_info.get("os"),
+            ip_hash=device_utils.hash_ip(event["ip"]),
+            ip_address=device_utils.mask_ip(event["ip"]),
+            location_city=location.get("city"),
+            location_country=location.get("country"),
+        )
+        if not row["description"]:
+            row["description"] = device_utils.format_event_description(event["action"], event["metadata"])
+
+    if not row["description"]:
+        row["description"] = event["action"]
+    return row
+
+
+def _dump_row(row: Dict[str, Any]) -> str:
+    return json.dumps(row, default=str, separators=(",", ":"))
+
+
+def _load_row(line: str) -> Dict[str, Any]:
+    row = json.loads(line)
+    for field in UUID_FIELDS:
+        if row.get(field) is not None:
+            row[field] = uuid.UUID(row[field])
+    row["created_at"] = datetime.fromisoformat(row["created_at"])
+    return row
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class AuditPipeline:
+    """In-process queue of audit events with a single batching writer task"""
+
+    def __init__(
+        self,
+        engine=None,
+        batch_size: int = AUDIT_BATCH_SIZE,
+        flush_interval: float = AUDIT_FLUSH_INTERVAL,
+        max_queue: int = AUDIT_QUEUE_SIZE,
+        spool_dir: str = AUDIT_SPOOL_DIR,
+        on_written=None
+    ):
+        self.engine = engine
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.spool_dir = spool_dir
+        # Called with the user ids of every written batch (cache invalidation)
+        self.on_written = on_written
+
+        self._queue: List[Dict[str, Any]] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._next_replay = 0.0
+
+        self.enqueued = 0
+        self.written = 0
+        self.batches = 0
+        self.spooled = 0
+        self.replayed = 0
+        self.rejected = 0
+
+    @property
+    def spool_path(self) -> str:
+        return os.path.join(self.spool_dir, f"audit_spool.{os.getpid()}.jsonl")
+
+    @property
+    def rejected_path(self) -> str:
+        return os.path.join(self.spool_dir, f"audit_rejected.{os.getpid()}.jsonl")
+
+    def _engine(self):
+        return self.engine or database.engine
+
+    def enqueue(self, event: Dict[str, Any]):
+        """Non-blocking; never raises into the caller"""
+        self.enqueued += 1
+        if len(self._queue) >= self.max_queue:
+            self._spool([build_row(event)])
+            return
+        self._queue.append(event)
+        # Wake the writer for the first event (starts the interval) and for a full batch
+        if self._wakeup is not None and (len(self._queue) == 1 or len(self._queue) >= self.batch_size):
+            self._wakeup.set()
+
+    def start(self):
+        """Start the writer task on the running event loop"""
+        if self._task is not None and not self._task.done():
+            return
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        print(f"[AuditPipeline] Started (batch={self.batch_size}, interval={self.flush_interval}s)")
+
+    async def stop(self, timeout: float = AUDIT_DRAIN_TIMEOUT):
+        """Drain queued events; whatever cannot be written in time is spooled"""
+        self._stopping = True
+        if self._task is not None:
+            self._wakeup.set()
+            try:
+                await asyncio.wait_for(asyncio.shield(self._task), timeout)
+            except asyncio.TimeoutError:
+                print(f"[AuditPipeline] Drain timed out after {timeout}s")
+                self._task.cancel()
+        if self._queue:
+            pending, self._queue = self._queue, []
+            self._spool([build_row(event) for event in pending])
+        self._task = None
+
+    async def flush(self):
+        """Write everything queued so far (used by stop() and tests)"""
+        while self._queue:
+            batch, self._queue = self._queue[:self.batch_size], self._queue[self.batch_size:]
+            rows = [build_row(event) for event in batch]
+            try:
+                await self._write_batch(rows)
+            except asyncio.CancelledError:
+                # Drain timed out mid-write; the insert may or may not have landed
+                self._spool(rows)
+                raise
+
+    async def _run(self):
+        await self._replay_spool()
+        while True:
+            if not self._queue and not self._stopping:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+            if self._stopping:
+                await self.flush()
+                return
+
+            # Give a partial batch until the interval to fill up
+            if len(self._queue) < self.batch_size:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+            batch, self._queue = self._queue[:self.batch_size], self._queue[self.batch_size:]
+            rows = [build_row(event) for event in batch]
+            try:
+                if await self._write_batch(rows):
+                    await self._replay_spool()
+            except asyncio.CancelledError:
+                self._spool(rows)
+                raise
+            except Exception as e:
+                # Keep the writer alive whatever happens to one batch
+                print(f"[AuditPipeline] Unexpected error: {e}")
+
+    async def _insert(self, rows: List[Dict[str, Any]]):
+        async with self._engine().begin() as conn:
+            await conn.execute(insert(models.AuditLog).values(rows))
+
+    async def _write_batch(self, rows: List[Dict[str, Any]]) -> bool:
+        """One multi-row INSERT; True when the database accepted the batch"""
+        if not rows:
+            return True
+        try:
+            await self._insert(rows)
+            written = rows
+        except (IntegrityError, DataError):
+            # Find the offending rows one by one
+            written = []
+            for row in rows:
+                try:
+                    await self._insert([row])
+                    written.append(row)
+                except (IntegrityError, DataError) as e:
+                    self.rejected += 1
+                    self._append(self.rejected_path, [row])
+                    print(f"[AuditPipeline] Rejected {row['action']} for {row['user_id']}: {e.orig}")
+        except Exception as e:
+            print(f"[AuditPipeline] Database unavailable, spooling {len(rows)} events: {getattr(e, 'orig', None) or e}")
+            self._spool(rows)
+            return False
+
+        self.written += len(written)
+        self.batches += 1
+        if self.on_written is not None and written:
+            self.on_written({row["user_id"] for row in written})
+        return True
+
+    def _append(self, path: str, rows: List[Dict[str, Any]]):
+        os.makedirs(self.spool_dir, exist_ok=True)
+        with open(path, "a") as f:
+            f.write("".join(_dump_row(row) + "\n" for row in rows))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _spool(self, rows: List[Dict[str, Any]]):
+        try:
+            self._append(self.spool_path, rows)
+            self.spooled += len(rows)
+        except Exception as e:
+            # Last resort: the events only reach the process log
+            print(f"[AuditPipeline] Could not spool {len(rows)} events: {e}")
+            for row in rows:
+                print(f"[AuditPipeline] LOST {_dump_row(row)}")
+
+    def _replayable_files(self) -> List[str]:
+        """This process's spool file plus those of processes that have exited"""
+        files = []
+        for path in sorted(glob.glob(os.path.join(self.spool_dir, "audit_spool.*.jsonl"))):
+            try:
+                pid = int(os.path.basename(path).split(".")[1])
+            except ValueError:
+                continue
+            if pid == os.getpid() or not _pid_alive(pid):
+                files.append(path)
+        return files
+
+    async def _replay_spool(self, force: bool = False):
+        """Re-insert spooled events; rate limited to AUDIT_REPLAY_INTERVAL"""
+        if not force and time.monotonic() < self._next_replay:
+            return
+        self._next_replay = time.monotonic() + AUDIT_REPLAY_INTERVAL
+        if not os.path.isdir(self.spool_dir):
+            return
+
+        for path in self._replayable_files():
+            # Claim the file so new spool writes (and other workers) start a fresh one.
+            # The claimed name carries our pid, so a crash mid-replay leaves it replayable.
+            claimed = os.path.join(self.spool_dir, f"audit_spool.{os.getpid()}.replay-{uuid.uuid4().hex[:8]}.jsonl")
+            try:
+                os.rename(path, claimed)
+            except OSError:
+                continue
+            rows = []
+            with open(claimed) as f:
+                for line in f:
+                    try:
+                        rows.append(_load_row(line))
+                    except ValueError:
+                        # Torn write from a crash; nothing to recover
+                        if line.strip():
+                            print(f"[AuditPipeline] Skipping unreadable spool line in {os.path.basename(path)}")
+
+            for start in range(0, len(rows), self.batch_size):
+                batch = rows[start:start + self.batch_size]
+                if not await self._write_batch(batch):
+                    # Still down: _write_batch spooled this batch, the rest follows it.
+                    # These events were counted when first spooled.
+                    self._spool(rows[start + self.batch_size:])
+                    self.spooled -= len(rows) - start
+                    os.remove(claimed)
+                    return
+                self.replayed += len(batch)
+            os.remove(claimed)
+            print(f"[AuditPipeline] Replayed {len(rows)} spooled events from {os.path.basename(path)}")
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "queued": len(self._queue),
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "batches": self.batches,
+            "spooled": self.spooled,
+            "replayed": self.replayed,
+            "rejected": self.rejected,
+        }
+
+
+# Singleton instance
+_pipeline = None
+
+
+def get_audit_pipeline() -> AuditPipeline:
+    """Get or create the audit pipeline"""
+    global _pipeline
+    if _pipeline is None:
+        from activity_cache import get_activity_cache
+
+        def invalidate(user_ids):
+            cache = get_activity_cache()
+            for user_id in user_ids:
+                cache.invalidate(user_id)
+
+        _pipeline = AuditPipeline(on_written=invalidate)
+    return _pipeline
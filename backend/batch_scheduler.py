@@ -0,0 +1,130 @@
+"""
+Micro-batching scheduler for single-applicant LoanAdvisor requests.
+
+Concurrent /loan-advisor and /loan-application calls are collected for a
+short window (INFERENCE_BATCH_WINDOW_MS, default 3 ms) or until
+INFERENCE_BATCH_MAX_ROWS rows are waiting. They are then scored together
+through LoanAdvisor.analyze_batch: one predict_proba and one SHAP matrix
+call. Each awaiting coroutine gets back its own result, or its own
+exception.
+
+The coalesced batch runs on the bounded inference executor as a single
+task, so a burst of N requests takes one executor slot instead of N.
+"""
+
+import asyncio
+import os
+from typing import Any, Dict, List, Tuple
+
+import inference_executor
+from inference_executor import get_inference_executor
+
+INFERENCE_BATCHING = os.getenv("INFERENCE_BATCHING", "true").lower() != "false"
+INFERENCE_BATCH_WINDOW_MS = float(os.getenv("INFERENCE_BATCH_WINDOW_MS", "3"))
+INFERENCE_BATCH_MAX_ROWS = int(os.getenv("INFERENCE_BATCH_MAX_ROWS", "32"))
+
+
+class MicroBatcher:
+    """Coalesce concurrent analyze() calls into analyze_batch() calls"""
+
+    def __init__(self, window_ms: float = INFERENCE_BATCH_WINDOW_MS, max_rows: int = INFERENCE_BATCH_MAX_ROWS):
+        self.window = max(0.0, window_ms) / 1000
+        self.max_rows = max(1, max_rows)
+        self._pending: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._timer = None
+
+        self.batches = 0
+        self.rows = 0
+        self.largest_batch = 0
+        self.isolated_retries = 0
+
+    async def submit(self, user_input: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue one applicant for the next batch and wait for its result"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((user_input, future))
+
+        if len(self._pending) >= self.max_rows:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        items, self._pending = self._pending, []
+        if items:
+            asyncio.get_running_loop().create_task(self._run_batch(items))
+
+    async def _run_batch(self, items: List[Tuple[Dict[str, Any], asyncio.Future]]):
+        self.batches += 1
+        self.rows += len(items)
+        self.largest_batch = max(self.largest_batch, len(items))
+
+        try:
+            results = await get_inference_executor().run(
+                inference_executor.analyze_batch, [user_input for user_input, _ in items]
+            )
+        except inference_executor.ExecutorSaturated as e:
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        except Exception as e:
+            if len(items) == 1:
+                if not items[0][1].done():
+                    items[0][1].set_exception(e)
+                return
+            # One bad row must not fail its neighbours: score each on its own
+            print(f"[MicroBatcher] Batch of {len(items)} failed ({e}), retrying rows individually")
+            self.isolated_retries += 1
+            await asyncio.gather(*(self._run_single(user_input, future) for user_input, future in items))
+            return
+
+        for (_, future), result in zip(items, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def _run_single(self, user_input: Dict[str, Any], future: asyncio.Future):
+        try:
+            results = await get_inference_executor().run(inference_executor.analyze_batch, [user_input])
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            return
+        if not future.done():
+            future.set_result(results[0])
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "enabled": INFERENCE_BATCHING,
+            "window_ms": self.window * 1000,
+            "max_rows": self.max_rows,
+            "batches": self.batches,
+            "rows": self.rows,
+            "avg_batch_size": round(self.rows / self.batches, 2) if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+            "isolated_retries": self.isolated_retries,
+        }
+
+
+# Singleton instance
+_batcher = None
+
+
+def get_batcher() -> MicroBatcher:
+    """Get or create the micro-batcher"""
+    global _batcher
+    if _batcher is None:
+        _batcher = MicroBatcher()
+    return _batcher
+
+
+async def analyze(user_input: Dict[str, Any]) -> Dict[str, Any]:
+    """Score one applicant, coalesced with concurrent callers when batching is enabled"""
+    if not INFERENCE_BATCHING:
+        return await get_inference_executor().run(inference_executor.analyze, user_input)
+    return await get_batcher().submit(user_input)
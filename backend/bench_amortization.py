@@ -0,0 +1,60 @@
+"""
+Micro-benchmark: portfolio schedule regeneration, Python loop vs amortization engine
+
+Usage: python bench_amortization.py [loans]
+"""
+import sys
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+import amortization
+
+
+def loop_schedule(loan_amount, interest_rate, tenure_months, start_date):
+    """The per-loan Python loop the repayments endpoint used before"""
+    monthly_rate = interest_rate / 100 / 12
+    if monthly_rate > 0:
+        emi = loan_amount * monthly_rate * pow(1 + monthly_rate, tenure_months) / (pow(1 + monthly_rate, tenure_months) - 1)
+    else:
+        emi = loan_amount / tenure_months
+    schedule = []
+    outstanding = loan_amount
+    for i in range(1, tenure_months + 1):
+        interest_component = outstanding * monthly_rate
+        principal_component = emi - interest_component
+        outstanding -= principal_component
+        schedule.append((i, start_date + timedelta(days=30 * i), round(emi, 2),
+                         round(principal_component, 2), round(interest_component, 2), max(0, round(outstanding, 2))))
+    return schedule
+
+
+def main():
+    loans = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    rng = np.random.default_rng(0)
+    principal = rng.uniform(10000, 5000000, loans).round(0)
+    rate = rng.choice([10.5, 11.5, 12.5, 13.75, 15.4, 18.0], loans)
+    tenure = rng.choice([12, 24, 36, 60, 84, 120, 240], loans)
+    start = date(2025, 1, 15)
+
+    print("=" * 60)
+    print(f"AMORTIZATION BENCHMARK ({loans:,} loans, {tenure.sum():,} installments)")
+    print("=" * 60)
+
+    sample = min(loans, 5000)
+    began = time.perf_counter()
+    for idx in range(sample):
+        loop_schedule(float(principal[idx]), float(rate[idx]), int(tenure[idx]), start)
+    loop_seconds = (time.perf_counter() - began) * loans / sample
+    print(f"{'python loop (extrapolated)':<36} {loop_seconds:>9.2f} s")
+
+    began = time.perf_counter()
+    plan = amortization.portfolio_schedule(principal, rate, tenure, start)
+    engine_seconds = time.perf_counter() - began
+    print(f"{'amortization.portfolio_schedule':<36} {engine_seconds:>9.2f} s  ({len(plan):,} rows)")
+    print(f"{'speedup':<36} {loop_seconds / engine_seconds:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Micro-benchmark: SHAP explanations, per-row shap vs batched native pred_contribs
+
+Usage: python bench_explanations.py
+"""
+import timeit
+
+from explanation_engine import ExplanationEngine
+from model_registry import get_model_bundle
+from test_feature_encoder import random_rows
+
+
+def bench(label, fn, number):
+    seconds = min(timeit.repeat(fn, number=number, repeat=3)) / number
+    print(f"{label:<36} {seconds * 1e3:>9.2f} ms/call")
+    return seconds
+
+
+def main():
+    bundle = get_model_bundle()
+    native = ExplanationEngine(bundle, backend="native")
+    shap_engine = ExplanationEngine(bundle, backend="shap")
+
+    rows = random_rows(64)
+    features = bundle.encoder.encode_rows(rows)
+    single = features[:1]
+
+    print("=" * 60)
+    print("EXPLANATION BENCHMARK")
+    print("=" * 60)
+
+    bench("predict_proba, 1 row", lambda: bundle.model.predict_proba(single), 50)
+    old = bench("shap, 1 row", lambda: shap_engine.explain_rows(single, rows[:1]), 20)
+    new = bench("native, 1 row", lambda: native.explain_rows(single, rows[:1]), 50)
+    print(f"{'speedup':<36} {old / new:>9.1f}x\n")
+
+    old = bench("shap, 64 rows one at a time",
+                lambda: [shap_engine.explain_rows(features[i:i + 1], rows[i:i + 1]) for i in range(64)], 2)
+    new = bench("native, 64 rows batched", lambda: native.explain_rows(features, rows), 10)
+    print(f"{'speedup':<36} {old / new:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Micro-benchmark: pandas preprocessing vs precompiled FeatureEncoder
+
+Usage: python bench_feature_encoder.py
+"""
+import timeit
+
+import numpy as np
+
+from feature_encoder import FeatureEncoder
+from test_feature_encoder import _load_artifacts, pandas_encode, random_rows
+
+
+def bench(label, fn, number):
+    seconds = min(timeit.repeat(fn, number=number, repeat=5)) / number
+    print(f"{label:<28} {seconds * 1e6:>10.1f} us/call")
+    return seconds
+
+
+def main():
+    model_data, encoder_data = _load_artifacts()
+    feature_names = model_data['feature_names']
+    encoder = FeatureEncoder.from_artifacts(encoder_data, feature_names)
+
+    single = random_rows(1)
+    batch = random_rows(256)
+    buffer = np.empty((len(batch), encoder.n_features), dtype=np.float32)
+
+    print("=" * 60)
+    print("FEATURE ENCODING BENCHMARK")
+    print("=" * 60)
+
+    old_single = bench("pandas, 1 row", lambda: pandas_encode(single, encoder_data, feature_names), 200)
+    new_single = bench("FeatureEncoder, 1 row", lambda: encoder.encode_rows(single), 2000)
+    print(f"{'speedup':<28} {old_single / new_single:>10.1f}x\n")
+
+    old_batch = bench("pandas, 256 rows", lambda: pandas_encode(batch, encoder_data, feature_names), 50)
+    new_batch = bench("FeatureEncoder, 256 rows", lambda: encoder.encode_rows(batch, out=buffer), 200)
+    print(f"{'speedup':<28} {old_batch / new_batch:>10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Benchmark: loan report render time and PDF size, vector charts vs matplotlib PNGs
+
+Usage: python bench_report_charts.py [reports]
+"""
+import sys
+import time
+
+import report_charts
+import report_generator
+from report_service import build_report_inputs
+from test_report_service import _application
+
+
+def run(backend, reports, context, analysis):
+    report_charts.REPORT_CHART_BACKEND = backend
+    report_generator.generate_loan_report_pdf(context, analysis)  # Imports, font metrics, gauge PNG cache
+    began = time.perf_counter()
+    for _ in range(reports):
+        pdf = report_generator.generate_loan_report_pdf(context, analysis)
+    return (time.perf_counter() - began) / reports, len(pdf)
+
+
+def main():
+    reports = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    context, analysis = build_report_inputs(_application())
+
+    print("=" * 60)
+    print(f"REPORT CHART BENCHMARK ({reports} reports per backend)")
+    print("=" * 60)
+
+    results = {}
+    for backend in ("png", "vector"):
+        if backend == "png" and report_charts._pyplot() is None:
+            print(f"{'png (matplotlib)':<24} skipped, matplotlib not installed")
+            continue
+        results[backend] = run(backend, reports, context, analysis)
+        seconds, size = results[backend]
+        print(f"{backend:<24} {seconds * 1000:>9.1f} ms/report  {size / 1024:>8.1f} KB")
+
+    if len(results) == 2:
+        print(f"{'speedup':<24} {results['png'][0] / results['vector'][0]:>9.1f}x")
+        print(f"{'size reduction':<24} {results['png'][1] / results['vector'][1]:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
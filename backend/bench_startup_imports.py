@@ -0,0 +1,79 @@
+"""
+Startup benchmark: time to `import main`, measured with python -X importtime
+
+Fails (exit 1) when the import takes longer than the budget, or when one of
+the modules the API loads lazily (LAZY_MODULES) is back on the import path.
+
+Usage: python bench_startup_imports.py [runs]
+  STARTUP_IMPORT_BUDGET_MS  budget for the fastest run (default 2500)
+"""
+import os
+import re
+import subprocess
+import sys
+
+STARTUP_IMPORT_BUDGET_MS = float(os.getenv("STARTUP_IMPORT_BUDGET_MS", "2500"))
+
+# Loaded on first use or by warmup.warm_up(), never by `import main`
+LAZY_MODULES = (
+    "pandas", "sklearn", "scipy", "numpy", "joblib", "xgboost", "shap",
+    "matplotlib", "fpdf", "qrcode", "PIL",
+    "loan_advisor", "loan_predictor", "report_generator", "report_charts", "amortization",
+)
+
+LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def measure(module: str = "main"):
+    """One cold interpreter: (total ms, {module: cumulative ms}, [(ms, direct import)])"""
+    env = dict(os.environ, MODEL_WARMUP="false")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=os.path.dirname(os.path.abspath(__file__)), env=env,
+        capture_output=True, text=True, check=True
+    )
+    modules, direct, total = {}, [], 0.0
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if not match:
+            continue
+        cumulative_ms = int(match.group(2)) / 1000
+        depth, name = len(match.group(3)), match.group(4)
+        modules[name] = cumulative_ms
+        if name == module and depth == 1:
+            total = cumulative_ms
+        elif depth == 3:
+            direct.append((cumulative_ms, name))
+    return total, modules, sorted(direct, reverse=True)
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    measure()  # Compile bytecode, warm the page cache
+
+    results = [measure() for _ in range(runs)]
+    total, modules, direct = min(results, key=lambda result: result[0])
+
+    print("=" * 60)
+    print(f"STARTUP IMPORT BENCHMARK (best of {runs})")
+    print("=" * 60)
+    for cumulative_ms, name in direct[:10]:
+        print(f"{name:<36} {cumulative_ms:>9.1f} ms")
+    print("-" * 60)
+    print(f"{'import main':<36} {total:>9.1f} ms  (budget {STARTUP_IMPORT_BUDGET_MS:.0f} ms)")
+
+    failures = []
+    eager = [name for name in LAZY_MODULES if name in modules]
+    if eager:
+        failures.append(f"imported at startup, should be lazy: {', '.join(eager)}")
+    if total > STARTUP_IMPORT_BUDGET_MS:
+        failures.append(f"import main took {total:.0f} ms, budget is {STARTUP_IMPORT_BUDGET_MS:.0f} ms")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print("PASS")
+
+
+if __name__ == "__main__":
+    main()
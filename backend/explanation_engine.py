@@ -0,0 +1,151 @@
+"""
+Explanation Engine - fast TreeSHAP feature contributions for the advisor.
+
+Contributions come from one of two backends (EXPLANATION_BACKEND):
+- "native" (default): XGBoost's own TreeSHAP via
+  booster.predict(..., pred_contribs=True). It does not import shap, and
+  its values are identical to shap.TreeExplainer for this model.
+- "shap": the prebuilt TreeExplainer shared through the model registry.
+
+Contributions are computed for a whole matrix at once. Per-row formatting
+only touches the top-k features, which are picked with np.argpartition.
+Display names and description templates are built once per feature
+instead of on every request.
+"""
+
+import os
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+EXPLANATION_BACKEND = os.getenv("EXPLANATION_BACKEND", "native").lower()
+TOP_K = 8
+FALLBACK_K = 5
+SIGNIFICANCE_THRESHOLD = 0.0001
+
+# (substring in feature name, template, raw input key) - first match wins
+DESCRIPTION_TEMPLATES = [
+    ("person_income", "Annual income of Rs. {value:,.0f} {impact} repayment capacity assessment.", "person_income"),
+    ("loan_amnt", "Requested loan of Rs. {value:,.0f} {impact} debt-to-ratio stress level.", "loan_amnt"),
+    ("credit_score", "Credit Score of {value} {impact} creditworthiness confidence.", "credit_score"),
+    ("person_emp_exp", "Employment vintage of {value} years {impact} career stability index.", "person_emp_exp"),
+    ("loan_percent_income", "EMI-to-Income impact {impact} debt serviceability.", None),
+    ("cb_person_cred_hist_length", "Credit history record of {value:.1f} years {impact} reliability rating.", "cb_person_cred_hist_length"),
+    ("previous_loan_defaults", "Past repayment behavior {impact} integrity assessment.", None),
+]
+
+
+class FeatureMeta:
+    """Display metadata for one model feature, computed once"""
+
+    __slots__ = ("name", "display_name", "template", "raw_key")
+
+    def __init__(self, name: str):
+        self.name = name
+
+        # Clean up feature name for display
+        display_name = name.replace('_', ' ').replace('  ', ' ')
+        if '_' in name:
+            parts = name.split('_')
+            display_name = f"{parts[0]}: {'_'.join(parts[1:])}"
+        self.display_name = display_name
+
+        generic = name.replace('_', ' ').replace('{', '{{').replace('}', '}}')
+        self.template = f"Financial parameter '{generic}' {{impact}} risk-weightage."
+        self.raw_key = None
+        for needle, template, raw_key in DESCRIPTION_TEMPLATES:
+            if needle in name:
+                self.template = template
+                self.raw_key = raw_key
+                break
+
+    def describe(self, contribution: float, raw_input: Dict[str, Any]) -> str:
+        impact = "increases" if contribution > 0 else "decreases"
+        if self.raw_key is None:
+            return self.template.format(impact=impact)
+        return self.template.format(value=raw_input.get(self.raw_key, 0), impact=impact)
+
+
+class ExplanationEngine:
+    """Batch feature contributions + top-k explanation factors"""
+
+    def __init__(self, bundle, backend: str = EXPLANATION_BACKEND, top_k: int = TOP_K):
+        self.bundle = bundle
+        self.top_k = top_k
+        self.feature_names = list(bundle.feature_names)
+        self._meta = [FeatureMeta(name) for name in self.feature_names]
+
+        self._booster = None
+        if backend != "shap" and bundle.model is not None and hasattr(bundle.model, "get_booster"):
+            self._booster = bundle.model.get_booster()
+        self.backend = "native" if self._booster is not None else "shap"
+
+    @property
+    def available(self) -> bool:
+        if self._booster is not None:
+            return True
+        return self.bundle.shap_explainer is not None
+
+    def contributions(self, features: np.ndarray) -> np.ndarray:
+        """Per-feature contributions (positive class) for every row of the feature matrix"""
+        if self._booster is not None:
+            import xgboost as xgb
+            contribs = self._booster.predict(
+                xgb.DMatrix(features, feature_names=self._booster.feature_names),
+                pred_contribs=True
+            )
+            if contribs.ndim == 3:
+                contribs = contribs[:, 1, :]  # Multi-class: positive class
+            return contribs[:, :-1]  # Drop the bias column
+
+        shap_values = self.bundle.shap_explainer.shap_values(features)
+        # For binary classification, use the positive class SHAP values
+        if isinstance(shap_values, list):
+            return shap_values[1]  # Class 1 (Approved)
+        return shap_values
+
+    def _top_indices(self, magnitudes: np.ndarray, candidates: np.ndarray, k: int) -> np.ndarray:
+        """
+        Indices of the k largest magnitudes among candidates, largest first.
+        Ties keep feature order, matching a stable descending sort.
+        """
+        if candidates.size > k:
+            values = magnitudes[candidates]
+            kth = values[np.argpartition(-values, k - 1)[k - 1]]
+            candidates = candidates[values >= kth]
+        order = np.lexsort((candidates, -magnitudes[candidates]))
+        return candidates[order][:k]
+
+    def explain(self, contributions: np.ndarray, raw_input: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Turn one row of contributions into the top explanation factors"""
+        magnitudes = np.abs(contributions)
+        significant = np.flatnonzero(magnitudes > SIGNIFICANCE_THRESHOLD)
+
+        result = []
+        if significant.size:
+            for idx in self._top_indices(magnitudes, significant, self.top_k):
+                meta = self._meta[idx]
+                value = contributions[idx]
+                result.append({
+                    "factor": meta.display_name,
+                    "impact": "positive" if value > 0 else "negative",
+                    "description": meta.describe(value, raw_input),
+                    "shap_value": float(round(abs(value), 6))  # Convert numpy float to Python float
+                })
+        else:
+            # Nothing passed threshold (rare): take top 5 anyway based on raw magnitude
+            everything = np.arange(magnitudes.size)
+            for idx in self._top_indices(magnitudes, everything, FALLBACK_K):
+                value = contributions[idx]
+                result.append({
+                    "factor": self.feature_names[idx],
+                    "impact": "positive" if value > 0 else "negative",
+                    "description": "Contributing factor",
+                    "shap_value": float(round(abs(value), 6))
+                })
+        return result
+
+    def explain_rows(self, features: np.ndarray, raw_inputs: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """Contributions for the whole matrix in one call, then top-k per row"""
+        contributions = self.contributions(features)
+        return [self.explain(contributions[row], raw) for row, raw in enumerate(raw_inputs)]
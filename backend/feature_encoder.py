@@ -0,0 +1,99 @@
+"""
+Precompiled Feature Encoder for the XGBoost loan model.
+
+Replaces the per-request pandas path (DataFrame -> ohe.transform ->
+get_feature_names_out -> pd.concat -> column reorder) with lookup tables
+built once from loan_encoders.joblib:
+
+- category -> output column index maps for every one-hot encoded column
+- StandardScaler mean/scale as NumPy arrays for the numerical columns
+
+Rows are written straight into a preallocated float32 matrix in the
+model's feature order. Scaling is done in float64 exactly like
+StandardScaler.transform, so the float32 values the model sees are
+bit-identical to the old path.
+"""
+
+import numpy as np
+from typing import Dict, Any, List, Optional, Sequence
+
+
+class FeatureEncoder:
+    """Encode raw dataset rows into the model's float32 feature matrix"""
+
+    def __init__(self, ohe, scaler, cat_columns: Sequence[str], num_columns: Sequence[str], feature_names: Sequence[str]):
+        self.feature_names = list(feature_names)
+        self.n_features = len(self.feature_names)
+        self.cat_columns = list(cat_columns)
+        self.num_columns = list(num_columns)
+
+        column_index = {name: idx for idx, name in enumerate(self.feature_names)}
+
+        # One-hot: per categorical column, map category value -> output column.
+        # Unknown categories (handle_unknown='ignore') and dropped categories
+        # have no entry and simply stay 0.
+        output_names = set(ohe.get_feature_names_out(self.cat_columns))
+        self._category_index: List[Dict[Any, int]] = []
+        for col, categories in zip(self.cat_columns, ohe.categories_):
+            mapping = {}
+            for category in categories:
+                name = f"{col}_{category}"
+                if name in output_names and name in column_index:
+                    mapping[category] = column_index[name]
+            self._category_index.append(mapping)
+
+        # Numerical: scaler parameters and destination columns
+        n_num = len(self.num_columns)
+        mean = scaler.mean_ if getattr(scaler, 'with_mean', True) and scaler.mean_ is not None else np.zeros(n_num)
+        scale = scaler.scale_ if getattr(scaler, 'with_std', True) and scaler.scale_ is not None else np.ones(n_num)
+        self._mean = np.asarray(mean, dtype=np.float64)
+        self._scale = np.asarray(scale, dtype=np.float64)
+
+        num_targets = [column_index.get(col, -1) for col in self.num_columns]
+        self._num_keep = np.array([idx >= 0 for idx in num_targets], dtype=bool)
+        self._num_index = np.array([idx for idx in num_targets if idx >= 0], dtype=np.intp)
+
+    @classmethod
+    def from_artifacts(cls, encoder_data: Dict[str, Any], feature_names: Sequence[str]) -> "FeatureEncoder":
+        """Build from the dict stored in loan_encoders.joblib"""
+        return cls(
+            encoder_data['ohe'],
+            encoder_data['scaler'],
+            encoder_data['cat_columns'],
+            encoder_data['num_columns'],
+            feature_names
+        )
+
+    def encode_row(self, raw: Dict[str, Any], out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Encode a single raw row into a (1, n_features) float32 matrix"""
+        return self.encode_rows([raw], out)
+
+    def encode_rows(self, raws: List[Dict[str, Any]], out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Encode raw rows into a (len(raws), n_features) float32 matrix.
+
+        `out` may be a preallocated float32 array of that shape; it is
+        zeroed and filled in place.
+        """
+        n_rows = len(raws)
+        if out is None:
+            out = np.zeros((n_rows, self.n_features), dtype=np.float32)
+        else:
+            if out.shape != (n_rows, self.n_features) or out.dtype != np.float32:
+                raise ValueError(f"out must be float32 with shape ({n_rows}, {self.n_features})")
+            out.fill(0)
+
+        for row, raw in enumerate(raws):
+            for col, mapping in zip(self.cat_columns, self._category_index):
+                idx = mapping.get(raw[col])
+                if idx is not None:
+                    out[row, idx] = 1.0
+
+        if n_rows and self.num_columns:
+            values = np.array([[raw[col] for col in self.num_columns] for raw in raws], dtype=np.float64)
+            # Same operations and precision as StandardScaler.transform
+            values -= self._mean
+            values /= self._scale
+            out[:, self._num_index] = values[:, self._num_keep]
+
+        return out
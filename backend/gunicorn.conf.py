@@ -0,0 +1,22 @@
+"""
+Gunicorn config for production.
+
+    gunicorn main:app -c gunicorn.conf.py
+
+The app and the ML artifacts are loaded once in the master process and
+workers are forked from it, so the XGBoost booster, encoders and SHAP
+explainer are shared copy-on-write instead of being loaded per worker.
+"""
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+
+
+def on_starting(server):
+    """Runs in the master before any worker is forked"""
+    import model_registry
+    model_registry.preload()
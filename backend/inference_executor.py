@@ -0,0 +1,176 @@
+"""
+Bounded executor for CPU-bound ML inference.
+
+XGBoost + SHAP calls are pushed off the asyncio event loop onto a thread
+or process pool so DB-bound requests keep flowing while a model runs.
+Admission is bounded: once `workers + max_queue` calls are in flight new
+calls are rejected with ExecutorSaturated (the API turns this into 503)
+instead of piling up unbounded latency.
+
+Configuration (env):
+- INFERENCE_EXECUTOR: "thread" (default) or "process"
+- INFERENCE_WORKERS: pool size (default 2)
+- INFERENCE_MAX_QUEUE: calls allowed to wait for a free worker (default 32)
+
+In process mode the pool is created lazily, so its workers are forked
+from a process that already holds the (preloaded / warmed-up) model bundle.
+
+Metrics separate time spent waiting for a worker (queue wait) from time
+spent running the model (compute).
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+INFERENCE_EXECUTOR = os.getenv("INFERENCE_EXECUTOR", "thread").lower()
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "2"))
+INFERENCE_MAX_QUEUE = int(os.getenv("INFERENCE_MAX_QUEUE", "32"))
+METRICS_WINDOW = 1000
+
+
+class ExecutorSaturated(Exception):
+    """Raised when the inference queue is full"""
+
+
+# ----------------------------------------------------------------------------
+# Task functions (module-level so they can be pickled into a process pool)
+# ----------------------------------------------------------------------------
+
+def analyze(user_input: Dict[str, Any]) -> Dict[str, Any]:
+    from loan_advisor import get_advisor
+    return get_advisor().analyze(user_input)
+
+
+def analyze_batch(user_inputs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    from loan_advisor import get_advisor
+    return get_advisor().analyze_batch(user_inputs)
+
+
+def max_eligible(user_input: Dict[str, Any], tenures: Optional[List[int]] = None) -> Dict[str, Any]:
+    from loan_advisor import get_advisor
+    return get_advisor().max_eligible_amount(user_input, tenures)
+
+
+def what_if(user_input: Dict[str, Any], axes: List[Tuple[str, List[float]]]) -> Dict[str, Any]:
+    from loan_advisor import get_advisor
+    return get_advisor().what_if(user_input, axes)
+
+
+def predict(loan_data: Dict[str, Any]) -> Dict[str, Any]:
+    from loan_predictor import get_predictor
+    return get_predictor().predict(loan_data)
+
+
+def _timed_call(fn: Callable, submitted_at: float, *args):
+    """Runs inside the pool; time.monotonic is system-wide so this also works across processes"""
+    started_at = time.monotonic()
+    result = fn(*args)
+    return result, started_at - submitted_at, time.monotonic() - started_at
+
+
+def _summary(samples) -> Dict[str, float]:
+    if not samples:
+        return {"avg_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+    ordered = sorted(samples)
+    count = len(ordered)
+    return {
+        "avg_ms": round(sum(ordered) / count * 1000, 2),
+        "p50_ms": round(ordered[count // 2] * 1000, 2),
+        "p95_ms": round(ordered[min(count - 1, int(count * 0.95))] * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2),
+    }
+
+
+class InferenceExecutor:
+    """Thread/process pool with bounded admission and latency metrics"""
+
+    def __init__(self, kind: str = INFERENCE_EXECUTOR, workers: int = INFERENCE_WORKERS, max_queue: int = INFERENCE_MAX_QUEUE):
+        self.kind = "process" if kind == "process" else "thread"
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self._pool = None
+        self._inflight = 0
+        self._lock = threading.Lock()
+
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self._queue_wait = deque(maxlen=METRICS_WINDOW)
+        self._compute = deque(maxlen=METRICS_WINDOW)
+
+    def _get_pool(self):
+        if self._pool is None:
+            if self.kind == "process":
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="inference")
+        return self._pool
+
+    async def run(self, fn: Callable, *args) -> Any:
+        """Run fn(*args) on the pool, or raise ExecutorSaturated if the queue is full"""
+        with self._lock:
+            if self._inflight >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise ExecutorSaturated(
+                    f"Inference queue is full ({self._inflight} requests in flight)"
+                )
+            self._inflight += 1
+            self.submitted += 1
+
+        loop = asyncio.get_running_loop()
+        try:
+            result, queue_wait, compute = await loop.run_in_executor(
+                self._get_pool(), _timed_call, fn, time.monotonic(), *args
+            )
+        except Exception:
+            with self._lock:
+                self.failed += 1
+            raise
+        finally:
+            with self._lock:
+                self._inflight -= 1
+
+        with self._lock:
+            self.completed += 1
+            self._queue_wait.append(queue_wait)
+            self._compute.append(compute)
+        return result
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "executor": self.kind,
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "in_flight": self._inflight,
+                "queued": max(0, self._inflight - self.workers),
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "queue_wait": _summary(list(self._queue_wait)),
+                "compute": _summary(list(self._compute)),
+            }
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+
+
+# Singleton instance
+_executor = None
+
+
+def get_inference_executor() -> InferenceExecutor:
+    """Get or create the inference executor"""
+    global _executor
+    if _executor is None:
+        _executor = InferenceExecutor()
+    return _executor
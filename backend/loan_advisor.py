@@ -10,14 +10,17 @@ Features:
 - Decision engine (ML + bank rules)
 """
 
-import joblib
+import hashlib
 import numpy as np
-import pandas as pd
-from typing import Dict, Any, List, Tuple, Optional
+from typing import Dict, Any, List, Tuple, Optional, NamedTuple
 from datetime import datetime
 import os
-from sklearn.compose import ColumnTransformer
-from sklearn.preprocessing import StandardScaler, OneHotEncoder
+import random
+import itertools
+import threading
+from model_registry import get_model_bundle, on_reload
+import amortization
+from explanation_engine import ExplanationEngine
 
 # Paths - Using XGBoost model from PR_Dset folder (new dataset)
 BASE_DIR = os.path.dirname(__file__)
@@ -26,6 +29,11 @@ MODEL_PATH = os.path.join(PR_DSET_DIR, "finalModel.json")
 DATASET_PATH = os.path.join(PR_DSET_DIR, "loan_dataS.csv")
 
 
+def _stable_seed(text: str) -> int:
+    """RNG seed from sha256: hash() is salted per process, so workers would disagree"""
+    return int.from_bytes(hashlib.sha256(text.encode()).digest()[:8], "big")
+
+
 class CreditScoreEstimator:
     """
     Estimates credit score band based on financial profile.
@@ -229,9 +237,9 @@ class CreditScoreEstimator:
         score = CreditScoreEstimator.MIN_SCORE + total_points
         
         # Add small variability for realism (±10 points)
-        import random
-        random.seed(hash(f"{monthly_income}{dti}{age}{job_tenure}"))
-        variability = random.randint(-10, 10)
+        # Local generator: seeding the global one is not thread-safe
+        rng = random.Random(_stable_seed(f"{monthly_income}{dti}{age}{job_tenure}"))
+        variability = rng.randint(-10, 10)
         score = score + variability
         
         # Clamp to valid CIBIL range
@@ -355,7 +363,7 @@ class InterestRateCalculator:
 
 
 class EMICalculator:
-    """Standard banking EMI calculation"""
+    """Standard banking EMI calculation (paise-exact, see amortization.py)"""
     
     @staticmethod
     def calculate(
@@ -369,30 +377,28 @@ class EMICalculator:
         Returns:
         - emi: Monthly EMI amount
         - total_interest: Total interest payable
-        - total_repayment: Total amount to be repaid
+        - total_repayment: Total amount to be repaid (final EMI clears the balance)
         """
-        # Convert annual rate to monthly
-        monthly_rate = annual_rate / (12 * 100)
-        
-        # Calculate EMI
-        if monthly_rate == 0:
-            emi = principal / duration_months
-        else:
-            factor = (1 + monthly_rate) ** duration_months
-            emi = (principal * monthly_rate * factor) / (factor - 1)
-        
-        total_repayment = emi * duration_months
-        total_interest = total_repayment - principal
+        result = amortization.totals(principal, annual_rate, duration_months)
         
         return {
-            'emi': round(emi, 2),
-            'total_interest': round(total_interest, 2),
-            'total_repayment': round(total_repayment, 2),
+            'emi': float(result['emi']),
+            'total_interest': float(result['total_interest']),
+            'total_repayment': float(result['total_repayment']),
             'principal': principal,
             'duration_months': duration_months,
             'annual_rate': annual_rate
         }
 
+    @staticmethod
+    def calculate_many(
+        principal: np.ndarray,
+        annual_rate: np.ndarray,
+        duration_months: np.ndarray
+    ) -> Dict[str, np.ndarray]:
+        """Same as calculate() over whole arrays of loans at once"""
+        return amortization.totals(principal, annual_rate, duration_months)
+
 
 class CoApplicantEvaluator:
     """Determines if co-applicant is needed and processes co-applicant data"""
@@ -636,15 +642,31 @@ class SHAPExplainer:
         return factors[:6]  # Return top 6 factors
 
 
+class AdvisorModelState(NamedTuple):
+    """Model bundle + SHAP engine a LoanAdvisor scores with, swapped as one"""
+    bundle: Any
+    explanations: ExplanationEngine
+
+
 class LoanAdvisor:
     """Main loan advisor combining all components"""
     
+    # Max-eligible-amount solver settings
+    ELIGIBILITY_TENURES = [12, 24, 36, 48, 60, 84, 120]
+    ELIGIBILITY_MIN_AMOUNT = 10000
+    ELIGIBILITY_GRID_POINTS = 32
+    ELIGIBILITY_REFINE_POINTS = 16
+    ELIGIBILITY_ROUNDING = 1000
+    
+    # What-if sensitivity grid settings
+    WHAT_IF_FIELDS = ('loan_amount', 'loan_duration', 'cibil_score', 'monthly_debt_payments', 'monthly_income', 'coapplicant_income')
+    WHAT_IF_INTEGER_FIELDS = ('loan_duration', 'cibil_score')
+    WHAT_IF_MAX_CELLS = int(os.getenv("WHAT_IF_MAX_CELLS", "2500"))
+    
     def __init__(self):
-        self.model = None
         self.preprocessor = None
-        self.feature_names = None
         self.df_reference = None
-        self.shap_explainer = None
+        self.state = None
         self._load_model()
         
         self.credit_estimator = CreditScoreEstimator()
@@ -655,41 +677,38 @@ class LoanAdvisor:
         self.explainer = SHAPExplainer()
     
     def _load_model(self):
-        """Load the high-accuracy XGBoost model (v3.0) and encoders"""
-        try:
-            # Using the new high-accuracy model files I just created
-            MODEL_JOB_PATH = os.path.join(BASE_DIR, "loan_model.joblib")
-            ENCODER_JOB_PATH = os.path.join(BASE_DIR, "loan_encoders.joblib")
-            
-            if os.path.exists(MODEL_JOB_PATH):
-                model_data = joblib.load(MODEL_JOB_PATH)
-                self.model = model_data['model']
-                self.feature_names = model_data.get('feature_names', [])
-                print(f"DEBUG: Real-Bank Model (XGBoost v3.0) loaded successfully")
-            
-            if os.path.exists(ENCODER_JOB_PATH):
-                encoder_data = joblib.load(ENCODER_JOB_PATH)
-                self.ohe = encoder_data['ohe']
-                self.scaler = encoder_data['scaler']
-                self.cat_cols = encoder_data['cat_columns']
-                self.num_cols = encoder_data['num_columns']
-                print(f"DEBUG: Banking Data Encoders loaded")
-            
-            # Setup SHAP if available
-            try:
-                import shap
-                self.shap_explainer = shap.TreeExplainer(self.model)
-                print("DEBUG: Centralized Risk Explainer (SHAP) Active")
-            except:
-                print("⚠ SHAP fallback active")
-        except Exception as e:
-            print(f"Error loading real-bank model: {e}")
-            self.model = None
-                
-        except Exception as e:
-            print(f"Warning: Could not load model - {e}")
-            import traceback
-            traceback.print_exc()
+        """Attach the shared XGBoost model (v3.0), encoders and SHAP explainer"""
+        bundle = get_model_bundle()
+        explanations = ExplanationEngine(bundle)
+        # One reference swap: a batch in flight keeps the state it started with
+        self.state = AdvisorModelState(bundle, explanations)
+        if not explanations.available:
+            print("⚠ SHAP fallback active")
+    
+    # Read-only views of the current model state
+    @property
+    def bundle(self):
+        return self.state.bundle
+    
+    @property
+    def explanations(self) -> ExplanationEngine:
+        return self.state.explanations
+    
+    @property
+    def model(self):
+        return self.state.bundle.model
+    
+    @property
+    def encoder(self):
+        return self.state.bundle.encoder
+    
+    @property
+    def feature_names(self):
+        return self.state.bundle.feature_names
+    
+    @property
+    def scaler(self):
+        return self.state.bundle.scaler
     
     def analyze(self, user_input: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -704,19 +723,218 @@ class LoanAdvisor:
         Optional:
         - coapplicant_income, coapplicant_employment, coapplicant_relationship
         """
-        
-        # 1. System-derived calculations
+
+        # Single applicant = batch of one. All per-request state (profile,
+        # feature row, SHAP values) flows through locals, so one shared
+        # advisor is safe to call from many threads.
+        return self.analyze_batch([user_input])[0]
+
+    def analyze_batch(self, user_inputs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Batch analysis for many applicants at once.
+
+        Preprocesses the whole batch as one matrix and makes a single
+        predict_proba call and a single SHAP call. Returns one result dict
+        per applicant, in input order.
+        """
+        if not user_inputs:
+            return []
+
+        application_date = datetime.now().isoformat()
+        profiles = [self._build_profile(user_input) for user_input in user_inputs]
+        state = self.state  # the whole batch is scored and explained by one model
+
+        # 3. ML prediction for the whole batch
+        probabilities, shap_rows, raw_rows = self._predict_batch(profiles, state=state)
+
+        results = []
+        for idx, user_input in enumerate(user_inputs):
+            shap_vals = shap_rows[idx]
+            raw_input = raw_rows[idx]
+            if shap_vals is not None:
+                explain = lambda profile, s=shap_vals, r=raw_input: state.explanations.explain(s, r)
+            else:
+                explain = lambda profile: self.explainer.explain(profile, 0.5)  # Fallback to rule-based
+
+            results.append(self._assemble_result(
+                user_input,
+                profiles[idx],
+                probabilities[idx],
+                explain,
+                application_date,
+                state.bundle.version
+            ))
+
+        return results
+
+    def max_eligible_amount(
+        self,
+        user_input: Dict[str, Any],
+        tenures: Optional[List[int]] = None,
+        upper_amount: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Largest loan amount (and the tenure that allows it) that still comes
+        out APPROVED under both the model and DecisionEngine.decide.
+
+        Every amount considered is a multiple of ELIGIBILITY_ROUNDING, and
+        each pass is a single batched predict_proba call without SHAP:
+        1. a geometric grid of amounts x tenures
+        2. narrowing passes: ELIGIBILITY_REFINE_POINTS evenly spaced amounts
+           between each tenure's largest approved amount and the next
+           amount above it that was not approved, until the two are one
+           rounding step apart (or the top of the grid is approved)
+        """
+        if tenures is None:
+            tenures = self.ELIGIBILITY_TENURES
+        tenures = sorted({int(t) for t in tenures if int(t) > 0})
+        monthly_income = float(user_input.get('monthly_income', 0))
+        if upper_amount is None:
+            upper_amount = max(float(user_input.get('loan_amount', 0)) * 3, monthly_income * 120)
+        upper_amount = max(upper_amount, self.ELIGIBILITY_MIN_AMOUNT * 2)
+
+        # Work in whole rounding steps so the answer is an amount that was actually scored
+        step = self.ELIGIBILITY_ROUNDING
+        grid = np.unique(np.floor(
+            np.geomspace(self.ELIGIBILITY_MIN_AMOUNT, upper_amount, self.ELIGIBILITY_GRID_POINTS) / step
+        ).astype(np.int64))
+        candidates = [(tenure, float(units * step)) for tenure in tenures for units in grid]
+        approved = self._approved_mask(user_input, candidates)
+        evaluated = len(candidates)
+
+        # Per tenure: (largest approved units, smallest units above it not approved)
+        brackets = {}
+        best_units = {tenure: 0 for tenure in tenures}
+        for t_idx, tenure in enumerate(tenures):
+            row = approved[t_idx * len(grid):(t_idx + 1) * len(grid)]
+            hits = np.flatnonzero(row)
+            if hits.size == 0:
+                continue
+            last = hits[-1]
+            best_units[tenure] = int(grid[last])
+            if last + 1 < len(grid):
+                brackets[tenure] = (int(grid[last]), int(grid[last + 1]))
+
+        while brackets:
+            refine = []
+            for tenure, (low, high) in brackets.items():
+                points = np.unique(np.linspace(low, high, self.ELIGIBILITY_REFINE_POINTS + 2).astype(np.int64))
+                refine.extend((tenure, int(units)) for units in points if low < units < high)
+            if not refine:
+                break
+            refined = self._approved_mask(user_input, [(tenure, float(units * step)) for tenure, units in refine])
+            evaluated += len(refine)
+
+            outcomes = {}
+            for (tenure, units), ok in zip(refine, refined):
+                outcomes.setdefault(tenure, []).append((units, bool(ok)))
+            for tenure, scored in outcomes.items():
+                low, high = brackets[tenure]
+                low = max([low] + [units for units, ok in scored if ok])
+                high = min([high] + [units for units, ok in scored if not ok and units > low])
+                best_units[tenure] = low
+                brackets[tenure] = (low, high)
+            brackets = {tenure: (low, high) for tenure, (low, high) in brackets.items() if high - low > 1}
+
+        by_tenure = [
+            {"tenure_months": tenure, "max_amount": float(best_units[tenure] * step)}
+            for tenure in tenures
+        ]
+        # Largest amount wins; on ties the shorter tenure (less interest)
+        best = max(by_tenure, key=lambda item: (item["max_amount"], -item["tenure_months"]), default=None)
+        if best is None or best["max_amount"] <= 0:
+            return {
+                "max_eligible_amount": 0.0,
+                "recommended_tenure": None,
+                "by_tenure": by_tenure,
+                "candidates_evaluated": evaluated
+            }
+
+        return {
+            "max_eligible_amount": best["max_amount"],
+            "recommended_tenure": best["tenure_months"],
+            "by_tenure": by_tenure,
+            "candidates_evaluated": evaluated
+        }
+
+    def what_if(self, user_input: Dict[str, Any], axes: List[Tuple[str, List[float]]]) -> Dict[str, Any]:
+        """
+        Sensitivity grid: every combination of the axis values applied to
+        the base applicant. The whole grid is scored with one predict_proba
+        call (no SHAP) and one vectorized EMI call.
+
+        axes: [(field, values), ...] with fields from WHAT_IF_FIELDS.
+        Cells are returned in row-major order of the axes.
+        """
+        fields = [field for field, _ in axes]
+        for field in fields:
+            if field not in self.WHAT_IF_FIELDS:
+                raise ValueError(f"Unsupported what-if field '{field}'. Allowed: {', '.join(self.WHAT_IF_FIELDS)}")
+        if len(set(fields)) != len(fields):
+            raise ValueError("Each what-if field may only appear once")
+
+        axis_values = []
+        for field, values in axes:
+            cast = int if field in self.WHAT_IF_INTEGER_FIELDS else float
+            values = [cast(value) for value in values]
+            if not values:
+                raise ValueError(f"What-if axis '{field}' has no values")
+            axis_values.append(values)
+
+        cells = int(np.prod([len(values) for values in axis_values])) if axis_values else 1
+        if cells > self.WHAT_IF_MAX_CELLS:
+            raise ValueError(f"What-if grid has {cells} cells; maximum is {self.WHAT_IF_MAX_CELLS}")
+
+        combos = list(itertools.product(*axis_values))
+        variants = [{**user_input, **dict(zip(fields, combo))} for combo in combos]
+        profiles = [self._build_profile(variant) for variant in variants]
+        probabilities, _, _ = self._predict_batch(profiles, explain=False)
+        outcomes = self._decide_batch(variants, profiles, probabilities)
+
+        grid = []
+        for combo, outcome in zip(combos, outcomes):
+            grid.append({
+                "inputs": dict(zip(fields, combo)),
+                "decision": outcome['decision'],
+                "approval_probability": round(outcome['approval_probability'] * 100, 1),
+                "interest_rate": round(outcome['interest_rate'], 2),
+                "emi": round(outcome['emi_details']['emi'], 0),
+                "total_interest": round(outcome['emi_details']['total_interest'], 0),
+                "emi_to_income_ratio": round(outcome['emi_to_income'] * 100, 1),
+                "credit_rating": outcome['credit'][2]
+            })
+
+        return {
+            "axes": [{"field": field, "values": values} for field, values in zip(fields, axis_values)],
+            "count": len(grid),
+            "cells": grid
+        }
+
+    def _approved_mask(self, user_input: Dict[str, Any], candidates: List[Tuple[int, float]]) -> np.ndarray:
+        """APPROVED flag for each (tenure, amount) variant of user_input, scored in one batch"""
+        profiles = [
+            self._build_profile({**user_input, 'loan_amount': amount, 'loan_duration': tenure})
+            for tenure, amount in candidates
+        ]
+        probabilities, _, _ = self._predict_batch(profiles, explain=False)
+        outcomes = self._decide_batch([user_input] * len(profiles), profiles, probabilities)
+        return np.array([outcome['decision'] == "APPROVED" for outcome in outcomes], dtype=bool)
+
+    @staticmethod
+    def _build_profile(user_input: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build the normalized applicant profile from raw user input.
+        The analysis result depends only on this profile (and the model).
+        """
         monthly_income = float(user_input.get('monthly_income', 0))
         monthly_debt = float(user_input.get('monthly_debt_payments', 0))
         loan_amount = float(user_input.get('loan_amount', 0))
         loan_duration = int(user_input.get('loan_duration', 60))
-        
+
         annual_income = monthly_income * 12
         debt_to_income = monthly_debt / monthly_income if monthly_income > 0 else 1
-        application_date = datetime.now().isoformat()
-        
-        # Build profile
-        profile = {
+
+        return {
             'gender': user_input.get('gender', 'Male'),
             'age': user_input.get('age', 30),
             'employment_status': user_input.get('employment_status', 'Employed'),
@@ -737,61 +955,42 @@ class LoanAdvisor:
             'coapplicant_income': user_input.get('coapplicant_income', 0),
             'cibil_score': user_input.get('cibil_score'),  # Manual CIBIL score
         }
-        
-        # 2. Credit score estimation
-        credit_min, credit_max, credit_rating = self.credit_estimator.estimate(profile)
-        
-        # 3. ML prediction (approval probability)
-        approval_probability = self._predict(profile)
-        
-        # 4. Interest rate calculation
-        interest_rate = self.interest_calc.calculate(
-            approval_probability,
-            (credit_min, credit_max, credit_rating),
-            profile['employment_status'],
-            loan_duration
-        )
-        
-        # 5. EMI calculation
-        emi_details = self.emi_calc.calculate(loan_amount, interest_rate, loan_duration)
-        emi_to_income = emi_details['emi'] / monthly_income if monthly_income > 0 else 1
-        
-        # 6. Co-applicant evaluation
-        needs_coapplicant, coapplicant_reason = self.coapplicant_eval.needs_coapplicant(
-            approval_probability,
-            emi_details['emi'],
-            monthly_income,
-            loan_amount,
-            annual_income
-        )
-        
-        # Handle co-applicant if provided
-        coapplicant_income = float(user_input.get('coapplicant_income', 0))
-        if coapplicant_income > 0:
-            effective_income = self.coapplicant_eval.calculate_effective_income(
-                monthly_income, coapplicant_income
-            )
-            emi_to_income = emi_details['emi'] / effective_income if effective_income > 0 else 1
-            # Recalculate with combined income
-            profile['monthly_income'] = effective_income
-            profile['annual_income'] = effective_income * 12
-            approval_probability = min(approval_probability * 1.15, 0.95)  # Boost with co-applicant
-        
-        # 7. Final decision
-        # Calculate loan-to-income ratio for decision
-        loan_to_income_ratio = loan_amount / annual_income if annual_income > 0 else 10
-        
-        decision, decision_reason = self.decision_engine.decide(
-            approval_probability,
-            emi_to_income,
-            credit_rating,
-            loan_duration,
-            loan_to_income_ratio,
-            profile  # Pass profile for employment/tenure checks
-        )
+
+    def _assemble_result(
+        self,
+        user_input: Dict[str, Any],
+        profile: Dict[str, Any],
+        approval_probability: float,
+        explain,
+        application_date: str,
+        model_version: str
+    ) -> Dict[str, Any]:
+        """
+        Apply pricing, co-applicant and decision rules to a scored profile
+        and build the response dict. `explain` is called with the final
+        profile to produce the explanation factors.
+        """
+        monthly_income = profile['monthly_income']
+        annual_income = profile['annual_income']
+        debt_to_income = profile['debt_to_income_ratio']
+        loan_amount = profile['loan_amount']
+        loan_duration = profile['loan_duration']
+
+        # 2-7. Pricing, co-applicant and decision rules
+        outcome = self._decide(user_input, profile, approval_probability)
+        credit_min, credit_max, credit_rating = outcome['credit']
+        interest_rate = outcome['interest_rate']
+        emi_details = outcome['emi_details']
+        emi_to_income = outcome['emi_to_income']
+        needs_coapplicant = outcome['needs_coapplicant']
+        coapplicant_reason = outcome['coapplicant_reason']
+        coapplicant_income = outcome['coapplicant_income']
+        approval_probability = outcome['approval_probability']
+        decision = outcome['decision']
+        decision_reason = outcome['decision_reason']
         
         # 8. SHAP explanations (REAL from TreeExplainer)
-        explanations = self._get_real_shap_explanations(profile)
+        explanations = explain(profile)
         
         # Build response
         # Calculate approval score with VARIABLE values (not fixed buckets)
@@ -803,9 +1002,8 @@ class LoanAdvisor:
         base_score = raw_prob * 100
         
         # Add variability based on profile factors (±3 points for granular "real" look)
-        import random
-        random.seed(hash(f"{monthly_income}{loan_amount}{profile.get('age', 30)}"))
-        variability = random.uniform(-1.5, 1.5)
+        rng = random.Random(_stable_seed(f"{monthly_income}{loan_amount}{profile.get('age', 30)}"))
+        variability = rng.uniform(-1.5, 1.5)
         
         # Profile-based adjustments
         if profile.get('employment_status') == 'Employed' and profile.get('job_tenure', 0) >= 3:
@@ -826,6 +1024,7 @@ class LoanAdvisor:
 
         return {
             "application_date": application_date,
+            "model_version": model_version,
             "decision": decision,
             "decision_reason": decision_reason,
             "approval_probability": display_score,  # Granular score (e.g. 56.4, 78.2)
@@ -866,168 +1065,212 @@ class LoanAdvisor:
             "next_steps": self._get_next_steps(decision)
         }
     
-    def _predict(self, profile: Dict[str, Any]) -> float:
+    def _decide(self, user_input: Dict[str, Any], profile: Dict[str, Any], approval_probability: float) -> Dict[str, Any]:
         """
-        Get approval probability using the XGBoost model (v3.0).
-        Uses OHE and StandardScaler for banking precision.
+        Credit band, pricing, EMI, co-applicant and decision rules for a
+        scored profile (no explanations, no response formatting).
+        With co-applicant income the profile is updated to the combined income.
         """
-        if self.model is None or self.ohe is None:
-            return self._rule_based_score(profile)
-        
-        try:
-            # Value mappings matching training data
-            edu_map = {'High School': 'High School', 'Bachelor': 'Bachelor', 'Master': 'Master', 'PhD': 'PhD', 'Associate': 'Associate'}
-            home_map = {'Own': 'OWN', 'Rent': 'RENT', 'Mortgage': 'MORTGAGE', 'Other': 'OTHER'}
-            intent_map = {'Personal': 'PERSONAL', 'Education': 'EDUCATION', 'Medical': 'MEDICAL', 'Venture': 'VENTURE', 'Home Improvement': 'HOMEIMPROVEMENT', 'Debt Consolidation': 'DEBTCONSOLIDATION'}
-            defaults_map = {'Yes': 'Yes', 'No': 'No'}
-
-            # Preprocess inputs
-            person_age = float(profile.get('age', 30))
-            person_income = float(profile.get('monthly_income', 0)) * 12
-            person_emp_exp = int(profile.get('experience', 0))
-            loan_amnt = float(profile.get('loan_amount', 0))
-            credit_score = int(profile.get('cibil_score', 650))
-            
-            raw_data = pd.DataFrame([{
-                'person_education': edu_map.get(profile.get('education_level', 'Bachelor'), 'Bachelor'),
-                'person_home_ownership': home_map.get(profile.get('home_ownership_status', 'Rent'), 'RENT'),
-                'loan_intent': intent_map.get(profile.get('loan_purpose', 'PERSONAL'), 'PERSONAL'),
-                'previous_loan_defaults_on_file': defaults_map.get(str(profile.get('previous_loan_defaults', 'No')), 'No'),
-                'person_age': person_age,
-                'person_income': person_income,
-                'person_emp_exp': person_emp_exp,
-                'loan_amnt': loan_amnt,
-                'loan_percent_income': (loan_amnt / person_income) if person_income > 0 else 0.5,
-                'cb_person_cred_hist_length': max(0, person_age - 21),
-                'credit_score': credit_score
-            }])
-
-            # Apply OneHotEncoding
-            encoded = self.ohe.transform(raw_data[self.cat_cols])
-            df_ohe = pd.DataFrame(encoded, columns=self.ohe.get_feature_names_out(self.cat_cols))
-            
-            # Apply Scaling
-            df_num_scaled = pd.DataFrame(self.scaler.transform(raw_data[self.num_cols]), columns=self.num_cols)
-            
-            # Combine and reorder
-            input_df = pd.concat([df_ohe, df_num_scaled], axis=1)
-            for col in self.feature_names:
-                if col not in input_df.columns: input_df[col] = 0
-            input_df = input_df[self.feature_names]
+        credit, interest_rate = self._price(profile, approval_probability)
 
-            self._last_processed_input = input_df
-            self._last_raw_input = raw_data.to_dict('records')[0]
-            
-            # Get probability (Class 0 = Approved, Class 1 = Rejected)
-            proba = self.model.predict_proba(input_df)[0]
-            return float(proba[0]) 
-            
-        except Exception as e:
-            print(f"Prediction Error: {e}")
-            return self._rule_based_score(profile)
-    
-    def _get_real_shap_explanations(self, profile: Dict[str, Any]) -> List[Dict[str, Any]]:
+        # 5. EMI calculation
+        emi_details = self.emi_calc.calculate(profile['loan_amount'], interest_rate, profile['loan_duration'])
+
+        return self._apply_rules(user_input, profile, approval_probability, credit, interest_rate, emi_details)
+
+    def _decide_batch(
+        self,
+        user_inputs: List[Dict[str, Any]],
+        profiles: List[Dict[str, Any]],
+        probabilities: List[float]
+    ) -> List[Dict[str, Any]]:
+        """_decide for many scored profiles, with the EMI math done as one vectorized call"""
+        priced = [self._price(profile, probability) for profile, probability in zip(profiles, probabilities)]
+        emis = self.emi_calc.calculate_many(
+            [profile['loan_amount'] for profile in profiles],
+            [interest_rate for _, interest_rate in priced],
+            [profile['loan_duration'] for profile in profiles]
+        )
+
+        outcomes = []
+        for idx, profile in enumerate(profiles):
+            credit, interest_rate = priced[idx]
+            emi_details = {
+                'emi': float(emis['emi'][idx]),
+                'total_interest': float(emis['total_interest'][idx]),
+                'total_repayment': float(emis['total_repayment'][idx]),
+                'principal': profile['loan_amount'],
+                'duration_months': profile['loan_duration'],
+                'annual_rate': interest_rate
+            }
+            outcomes.append(self._apply_rules(
+                user_inputs[idx], profile, probabilities[idx], credit, interest_rate, emi_details
+            ))
+        return outcomes
+
+    def _price(self, profile: Dict[str, Any], approval_probability: float) -> Tuple[Tuple[int, int, str], float]:
+        """Credit band and interest rate for a scored profile"""
+        # 2. Credit score estimation
+        credit_min, credit_max, credit_rating = self.credit_estimator.estimate(profile)
+
+        # 4. Interest rate calculation
+        interest_rate = self.interest_calc.calculate(
+            approval_probability,
+            (credit_min, credit_max, credit_rating),
+            profile['employment_status'],
+            profile['loan_duration']
+        )
+        return (credit_min, credit_max, credit_rating), interest_rate
+
+    def _apply_rules(
+        self,
+        user_input: Dict[str, Any],
+        profile: Dict[str, Any],
+        approval_probability: float,
+        credit: Tuple[int, int, str],
+        interest_rate: float,
+        emi_details: Dict[str, float]
+    ) -> Dict[str, Any]:
+        """Co-applicant evaluation and final decision for a priced profile"""
+        monthly_income = profile['monthly_income']
+        annual_income = profile['annual_income']
+        loan_amount = profile['loan_amount']
+        loan_duration = profile['loan_duration']
+        credit_rating = credit[2]
+
+        emi_to_income = emi_details['emi'] / monthly_income if monthly_income > 0 else 1
+        
+        # 6. Co-applicant evaluation
+        needs_coapplicant, coapplicant_reason = self.coapplicant_eval.needs_coapplicant(
+            approval_probability,
+            emi_details['emi'],
+            monthly_income,
+            loan_amount,
+            annual_income
+        )
+        
+        # Handle co-applicant if provided
+        coapplicant_income = float(user_input.get('coapplicant_income', 0))
+        if coapplicant_income > 0:
+            effective_income = self.coapplicant_eval.calculate_effective_income(
+                monthly_income, coapplicant_income
+            )
+            emi_to_income = emi_details['emi'] / effective_income if effective_income > 0 else 1
+            # Recalculate with combined income
+            profile['monthly_income'] = effective_income
+            profile['annual_income'] = effective_income * 12
+            approval_probability = min(approval_probability * 1.15, 0.95)  # Boost with co-applicant
+        
+        # 7. Final decision
+        # Calculate loan-to-income ratio for decision
+        loan_to_income_ratio = loan_amount / annual_income if annual_income > 0 else 10
+        
+        decision, decision_reason = self.decision_engine.decide(
+            approval_probability,
+            emi_to_income,
+            credit_rating,
+            loan_duration,
+            loan_to_income_ratio,
+            profile  # Pass profile for employment/tenure checks
+        )
+
+        return {
+            'credit': credit,
+            'interest_rate': interest_rate,
+            'emi_details': emi_details,
+            'emi_to_income': emi_to_income,
+            'needs_coapplicant': needs_coapplicant,
+            'coapplicant_reason': coapplicant_reason,
+            'coapplicant_income': coapplicant_income,
+            'approval_probability': approval_probability,
+            'decision': decision,
+            'decision_reason': decision_reason,
+        }
+
+    def _predict_batch(self, profiles: List[Dict[str, Any]], explain: bool = True, state: "Optional[AdvisorModelState]" = None) -> Tuple[List[float], List[Optional[np.ndarray]], List[Optional[Dict[str, Any]]]]:
         """
-        Get REAL SHAP-based explanations for the prediction.
-        Uses TreeExplainer to compute actual feature importance.
+        Approval probabilities + SHAP values for a list of profiles.
+
+        Builds one feature matrix for every row the model can score and runs
+        a single predict_proba and a single SHAP call over it. Rows that
+        cannot be encoded fall back to the rule-based score (and rule-based
+        explanations, signalled by a None SHAP row). explain=False skips SHAP.
+        state is the model snapshot to use (defaults to the current one).
+
+        Returns: (probabilities, shap_rows, raw_rows) aligned with profiles
         """
-        try:
-            if self.shap_explainer is None or not hasattr(self, '_last_processed_input'):
-                return self.explainer.explain(profile, 0.5)  # Fallback to rule-based
-            
-            import shap
-            
-            # Compute SHAP values
-            shap_values = self.shap_explainer.shap_values(self._last_processed_input)
-            
-            # For binary classification, use the positive class SHAP values
-            if isinstance(shap_values, list):
-                shap_vals = shap_values[1][0]  # Class 1 (Approved)
-            else:
-                shap_vals = shap_values[0]
-            
-            # Build feature importance list
-            feature_importance = []
-            for idx, feat_name in enumerate(self.feature_names):
-                shap_val = shap_vals[idx]
-                
-                # Check for significance (relaxed threshold)
-                is_significant = abs(shap_val) > 0.0001
-                
-                if is_significant:
-                    # Clean up feature name for display
-                    display_name = feat_name.replace('_', ' ').replace('  ', ' ')
-                    if '_' in feat_name:
-                        parts = feat_name.split('_')
-                        category = parts[0]
-                        value = '_'.join(parts[1:])
-                        display_name = f"{category}: {value}"
-                    
-                    feature_importance.append({
-                        "factor": display_name,
-                        "impact": "positive" if shap_val > 0 else "negative",
-                        "description": self._get_shap_description(feat_name, shap_val, self._last_raw_input),
-                        "_shap_value": shap_val  # Internal use only for sorting
-                    })
-            
-            # Sort by absolute SHAP value (most important first)
-            feature_importance.sort(key=lambda x: abs(x['_shap_value']), reverse=True)
-            
-            # If nothing passed threshold (rare), take top 5 anyway based on raw magnitude
-            if not feature_importance:
-                top_indices = sorted(range(len(shap_vals)), key=lambda i: abs(shap_vals[i]), reverse=True)[:5]
-                for idx in top_indices:
-                     feature_importance.append({
-                        "factor": self.feature_names[idx],
-                        "impact": "positive" if shap_vals[idx] > 0 else "negative",
-                        "description": "Contributing factor",
-                        "_shap_value": shap_vals[idx]
-                    })
+        state = state or self.state
+        model, encoder, explanations = state.bundle.model, state.bundle.encoder, state.explanations
+        count = len(profiles)
+        probabilities = [None] * count
+        shap_rows = [None] * count
+        raw_rows = [None] * count
+
+        if model is not None and encoder is not None:
+            for idx, profile in enumerate(profiles):
+                try:
+                    raw_rows[idx] = self._raw_features(profile)
+                except Exception as e:
+                    print(f"Prediction Error: {e}")
+
+            scored = [idx for idx in range(count) if raw_rows[idx] is not None]
+            if scored:
+                try:
+                    input_df = encoder.encode_rows([raw_rows[idx] for idx in scored])
+
+                    # Get probability (Class 0 = Approved, Class 1 = Rejected)
+                    proba = model.predict_proba(input_df)
+                    for pos, idx in enumerate(scored):
+                        probabilities[idx] = float(proba[pos][0])
+
+                    if explain and explanations.available:
+                        try:
+                            shap_matrix = explanations.contributions(input_df)
+                            for pos, idx in enumerate(scored):
+                                shap_rows[idx] = shap_matrix[pos]
+                        except Exception as e:
+                            print(f"SHAP Explanation error: {e}")
+                except Exception as e:
+                    print(f"Prediction Error: {e}")
+                    for idx in scored:
+                        probabilities[idx] = None
+
+        for idx, profile in enumerate(profiles):
+            if probabilities[idx] is None:
+                probabilities[idx] = self._rule_based_score(profile)
+                shap_rows[idx] = None
+
+        return probabilities, shap_rows, raw_rows
+
+    def _raw_features(self, profile: Dict[str, Any]) -> Dict[str, Any]:
+        """Map a profile to the raw dataset columns the encoders were fitted on"""
+        # Value mappings matching training data
+        edu_map = {'High School': 'High School', 'Bachelor': 'Bachelor', 'Master': 'Master', 'PhD': 'PhD', 'Associate': 'Associate'}
+        home_map = {'Own': 'OWN', 'Rent': 'RENT', 'Mortgage': 'MORTGAGE', 'Other': 'OTHER'}
+        intent_map = {'Personal': 'PERSONAL', 'Education': 'EDUCATION', 'Medical': 'MEDICAL', 'Venture': 'VENTURE', 'Home Improvement': 'HOMEIMPROVEMENT', 'Debt Consolidation': 'DEBTCONSOLIDATION'}
+        defaults_map = {'Yes': 'Yes', 'No': 'No'}
+
+        # Preprocess inputs
+        person_age = float(profile.get('age', 30))
+        person_income = float(profile.get('monthly_income', 0)) * 12
+        person_emp_exp = int(profile.get('experience', 0))
+        loan_amnt = float(profile.get('loan_amount', 0))
+        credit_score = int(profile.get('cibil_score', 650))
+
+        return {
+            'person_education': edu_map.get(profile.get('education_level', 'Bachelor'), 'Bachelor'),
+            'person_home_ownership': home_map.get(profile.get('home_ownership_status', 'Rent'), 'RENT'),
+            'loan_intent': intent_map.get(profile.get('loan_purpose', 'PERSONAL'), 'PERSONAL'),
+            'previous_loan_defaults_on_file': defaults_map.get(str(profile.get('previous_loan_defaults', 'No')), 'No'),
+            'person_age': person_age,
+            'person_income': person_income,
+            'person_emp_exp': person_emp_exp,
+            'loan_amnt': loan_amnt,
+            'loan_percent_income': (loan_amnt / person_income) if person_income > 0 else 0.5,
+            'cb_person_cred_hist_length': max(0, person_age - 21),
+            'credit_score': credit_score
+        }
 
-            
-            # Skip detailed print for production stability
-            pass
-            
-            # Include SHAP value for frontend chart visualization
-            result = []
-            for feat in feature_importance[:8]:
-                result.append({
-                    "factor": feat["factor"],
-                    "impact": feat["impact"],
-                    "description": feat["description"],
-                    "shap_value": float(round(abs(feat["_shap_value"]), 6))  # Convert numpy float to Python float
-                })
-            
-            return result  # Top 6 factors with SHAP values
-            
-        except Exception as e:
-            print(f"SHAP Explanation error: {e}")
-            import traceback
-            traceback.print_exc()
-            return self.explainer.explain(profile, 0.5)
-    
-    def _get_shap_description(self, feature_name: str, shap_value: float, user_input: Dict) -> str:
-        """Generate human-readable description for SHAP feature"""
-        impact = "increases" if shap_value > 0 else "decreases"
-        
-        # Map feature to description
-        if "person_income" in feature_name:
-            return f"Annual income of Rs. {user_input.get('person_income', 0):,.0f} {impact} repayment capacity assessment."
-        elif "loan_amnt" in feature_name:
-            return f"Requested loan of Rs. {user_input.get('loan_amnt', 0):,.0f} {impact} debt-to-ratio stress level."
-        elif "credit_score" in feature_name:
-            return f"Credit Score of {user_input.get('credit_score', 0)} {impact} creditworthiness confidence."
-        elif "person_emp_exp" in feature_name:
-            return f"Employment vintage of {user_input.get('person_emp_exp', 0)} years {impact} career stability index."
-        elif "loan_percent_income" in feature_name:
-            return f"EMI-to-Income impact {impact} debt serviceability."
-        elif "cb_person_cred_hist_length" in feature_name:
-            return f"Credit history record of {user_input.get('cb_person_cred_hist_length', 0):.1f} years {impact} reliability rating."
-        elif "previous_loan_defaults" in feature_name:
-            return f"Past repayment behavior {impact} integrity assessment."
-        else:
-            return f"Financial parameter '{feature_name.replace('_', ' ')}' {impact} risk-weightage."
-    
     def _rule_based_score(self, profile: Dict[str, Any]) -> float:
         """Fallback rule-based approval scoring - more realistic"""
         score = 0.65  # Higher base score for typical applicants
@@ -1110,8 +1353,10 @@ class LoanAdvisor:
         
         return max(0.1, min(0.98, score))
     
-    def _prepare_features(self, profile: Dict[str, Any]) -> pd.DataFrame:
+    def _prepare_features(self, profile: Dict[str, Any]) -> "pd.DataFrame":
         """Prepare features for ML model"""
+        import pandas as pd  # Only this legacy DataFrame path needs pandas
+
         # Map profile to model features
         features = {
             'Age': profile['age'],
@@ -1205,10 +1450,17 @@ class LoanAdvisor:
 
 # Singleton instance
 _advisor = None
+_advisor_lock = threading.Lock()
 
 def get_advisor() -> LoanAdvisor:
     """Get or create loan advisor instance"""
     global _advisor
     if _advisor is None:
-        _advisor = LoanAdvisor()
+        # Executor threads can race here on the first requests
+        with _advisor_lock:
+            if _advisor is None:
+                advisor = LoanAdvisor()
+                # Re-attach to the new artifacts when the registry reloads
+                on_reload(lambda bundle: advisor._load_model())
+                _advisor = advisor
     return _advisor
@@ -4,16 +4,10 @@ Uses SMOTE + OneHotEncoding trained XGBoost model.
 Based on extra/Xgboost.ipynb approach.
 """
 
-import joblib
+import threading
 import numpy as np
-import pandas as pd
 from typing import Dict, Any
-import os
-
-# Paths
-BASE_DIR = os.path.dirname(__file__)
-MODEL_PATH = os.path.join(BASE_DIR, "loan_model.joblib")
-ENCODER_PATH = os.path.join(BASE_DIR, "loan_encoders.joblib")
+from model_registry import get_model_bundle, on_reload
 
 # Value mappings for categorical fields (matching dataset values)
 EDUCATION_MAP = {
@@ -76,38 +70,56 @@ class LoanPredictor:
     """Loan eligibility prediction using SMOTE + OneHotEncoded XGBoost model"""
     
     def __init__(self):
-        self.model = None
-        self.ohe = None
-        self.scaler = None
-        self.cat_columns = None
-        self.num_columns = None
-        self.feature_names = None
+        # The registry bundle this predictor scores with. It is swapped as a
+        # single reference on reload, and predict() reads it once, so a
+        # request never mixes the old model with the new encoder.
+        self.bundle = None
         self._load_model()
     
+    # Read-only views of the current bundle
+    @property
+    def model(self):
+        return self.bundle.model if self.bundle is not None else None
+    
+    @property
+    def feature_names(self):
+        return self.bundle.feature_names if self.bundle is not None else None
+    
+    @property
+    def ohe(self):
+        return self.bundle.ohe if self.bundle is not None else None
+    
+    @property
+    def scaler(self):
+        return self.bundle.scaler if self.bundle is not None else None
+    
+    @property
+    def cat_columns(self):
+        return self.bundle.cat_columns if self.bundle is not None else None
+    
+    @property
+    def num_columns(self):
+        return self.bundle.num_columns if self.bundle is not None else None
+    
+    @property
+    def encoder(self):
+        return self.bundle.encoder if self.bundle is not None else None
+    
     def _load_model(self):
-        """Load the trained model and preprocessors"""
-        try:
-            # Load model
-            model_data = joblib.load(MODEL_PATH)
-            self.model = model_data['model']
-            self.feature_names = model_data.get('feature_names', [])
-            
-            # Load encoders
-            encoder_data = joblib.load(ENCODER_PATH)
-            self.ohe = encoder_data['ohe']
-            self.scaler = encoder_data['scaler']
-            self.cat_columns = encoder_data['cat_columns']
-            self.num_columns = encoder_data['num_columns']
-            
+        """Attach the trained model and preprocessors from the shared registry"""
+        bundle = get_model_bundle()
+        
+        if bundle.ready:
+            self.bundle = bundle
             print(f"[LoanPredictor] Model loaded successfully (v3.0 - SMOTE+OHE)")
-            print(f"[LoanPredictor] Categorical columns: {self.cat_columns}")
-            print(f"[LoanPredictor] Numerical columns: {self.num_columns}")
-            print(f"[LoanPredictor] Total features: {len(self.feature_names)}")
-        except Exception as e:
-            print(f"[LoanPredictor] Error loading model: {e}")
-            self.model = None
+            print(f"[LoanPredictor] Categorical columns: {bundle.cat_columns}")
+            print(f"[LoanPredictor] Numerical columns: {bundle.num_columns}")
+            print(f"[LoanPredictor] Total features: {len(bundle.feature_names)}")
+        else:
+            print(f"[LoanPredictor] Error loading model: artifacts unavailable")
+            self.bundle = None
     
-    def preprocess_input(self, loan_data: Dict[str, Any]) -> pd.DataFrame:
+    def preprocess_input(self, loan_data: Dict[str, Any], bundle=None) -> np.ndarray:
         """
         Convert raw loan application data to model input format.
         Uses OneHotEncoding for categorical and StandardScaler for numerical.
@@ -122,7 +134,10 @@ class LoanPredictor:
         - loan_purpose: Purpose of loan
         - cibil_score: Credit score (300-900)
         - previous_loan_defaults: Yes/No
+        
+        bundle is the snapshot to encode with (defaults to the current one).
         """
+        bundle = bundle or self.bundle
         try:
             # Extract values from form
             age = float(loan_data.get('age', 30))
@@ -155,7 +170,7 @@ class LoanPredictor:
             # person_home_ownership, loan_amnt, loan_intent, loan_percent_income,
             # cb_person_cred_hist_length, credit_score, previous_loan_defaults_on_file
             
-            raw_data = pd.DataFrame([{
+            raw_data = {
                 'person_education': education,
                 'person_home_ownership': home_ownership,
                 'loan_intent': loan_intent,
@@ -167,30 +182,10 @@ class LoanPredictor:
                 'loan_percent_income': loan_percent_income,
                 'cb_person_cred_hist_length': cred_hist_length,
                 'credit_score': credit_score
-            }])
-            
-            # OneHotEncode categorical columns
-            cat_data = raw_data[self.cat_columns]
-            encoded = self.ohe.transform(cat_data)
-            df_ohe = pd.DataFrame(encoded, columns=self.ohe.get_feature_names_out(self.cat_columns))
-            
-            # Scale numerical columns
-            num_data = raw_data[self.num_columns]
-            df_num_scaled = pd.DataFrame(
-                self.scaler.transform(num_data), 
-                columns=self.num_columns
-            )
-            
-            # Combine
-            input_data = pd.concat([df_ohe, df_num_scaled], axis=1)
-            
-            # Ensure column order matches training
-            # Add missing columns with 0 (for unseen categories)
-            for col in self.feature_names:
-                if col not in input_data.columns:
-                    input_data[col] = 0
+            }
             
-            input_data = input_data[self.feature_names]
+            # OneHotEncode + scale straight into the model's feature order
+            input_data = bundle.encoder.encode_row(raw_data)
             
             return input_data
             
@@ -210,7 +205,8 @@ class LoanPredictor:
         - decision_factors: Key factors influencing the decision
         - recommendation: Recommendation message
         """
-        if self.model is None:
+        bundle = self.bundle
+        if bundle is None:
             return {
                 'status': 'PENDING_REVIEW',
                 'confidence': 50.0,
@@ -220,10 +216,10 @@ class LoanPredictor:
         
         try:
             # Preprocess input
-            X = self.preprocess_input(loan_data)
+            X = self.preprocess_input(loan_data, bundle)
             
             # Get prediction probability
-            proba = self.model.predict_proba(X)[0]
+            proba = bundle.model.predict_proba(X)[0]
             approval_prob = proba[1] * 100  # Probability of approval (class 1)
             
             # Determine status based on probability (Granular thresholds)
@@ -322,10 +318,17 @@ class LoanPredictor:
 
 # Singleton instance
 _predictor = None
+_predictor_lock = threading.Lock()
 
 def get_predictor() -> LoanPredictor:
     """Get or create the loan predictor instance"""
     global _predictor
     if _predictor is None:
-        _predictor = LoanPredictor()
+        # Executor threads can race here on the first requests
+        with _predictor_lock:
+            if _predictor is None:
+                predictor = LoanPredictor()
+                # Re-attach to the new artifacts when the registry reloads
+                on_reload(lambda bundle: predictor._load_model())
+                _predictor = predictor
     return _predictor
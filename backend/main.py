@@ -1,5 +1,5 @@
 import os
-from fastapi import FastAPI, Depends, HTTPException, status, Request, Response
+from fastapi import FastAPI, Depends, HTTPException, status, Request, Response, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
@@ -11,7 +11,25 @@ import models
 import schemas
 import database
 import auth
-import report_generator
+import report_service
+from report_service import get_report_service
+import report_cache
+from report_cache import get_report_cache
+import repayment_service
+import pagination
+import audit_partitions
+import audit_pipeline
+from audit_pipeline import get_audit_pipeline
+import share_tokens
+from share_tokens import get_share_token_store
+from repayment_service import generate_emi_schedule
+import warmup
+import asyncio
+import inference_executor
+from inference_executor import get_inference_executor, ExecutorSaturated
+import batch_scheduler
+from prediction_cache import get_prediction_cache
+from activity_cache import get_activity_cache
 
 app = FastAPI(title="Loan Advisor API", version="1.0.0")
 
@@ -82,6 +100,8 @@ async def http_exception_handler(request: Request, exc: HTTPException):
         status_code=exc.status_code,
         content={"detail": exc.detail},
         headers={
+            # Keep the exception's own headers (Retry-After, WWW-Authenticate, ...)
+            **(exc.headers or {}),
             "Access-Control-Allow-Origin": cors_origin,
             "Access-Control-Allow-Credentials": "true",
             "Access-Control-Allow-Methods": "*",
@@ -110,6 +130,31 @@ async def startup():
     async with database.engine.begin() as conn:
         await conn.run_sync(models.Base.metadata.create_all)
 
+    # Monthly audit_logs partitions (Postgres only): create upcoming months now and keep checking
+    await audit_partitions.ensure_partitions_now()
+    asyncio.get_running_loop().create_task(audit_partitions.maintenance_loop())
+
+    # Batched audit writer; also replays events spooled while the DB was down
+    get_audit_pipeline().start()
+
+    # Periodically delete expired QR share tokens
+    asyncio.get_running_loop().create_task(share_tokens.sweep_loop())
+
+    # Warm up ML models in the background (retrying on failure); /ready flips once done
+    if warmup.MODEL_WARMUP:
+        asyncio.get_running_loop().run_in_executor(None, warmup.warm_up_with_retry)
+    else:
+        warmup.skip()
+
+@app.on_event("shutdown")
+async def shutdown():
+    # Stop a warm-up still retrying, so its executor thread doesn't hold up exit
+    warmup.stop()
+    # Drain queued audit events before the process exits
+    await get_audit_pipeline().stop()
+    get_inference_executor().shutdown()
+    get_report_service().shutdown()
+
 def generate_customer_id() -> str:
     """Generate a unique customer ID like LA20250001"""
     year = datetime.now().year
@@ -389,6 +434,55 @@ def read_root():
 def health_check():
     return {"status": "healthy"}
 
+@app.api_route("/ready", methods=["GET", "HEAD"])
+def readiness_check():
+    """Readiness probe: 503 until the ML models are loaded and warmed up (or warm-up is disabled)"""
+    state = warmup.get_status()
+    if not state["ready"]:
+        status = "warmup_failed" if state["error"] else "warming_up"
+        return JSONResponse(status_code=503, content={"status": status, **state})
+    return {"status": "skipped" if state["skipped"] else "ready", **state}
+
+@app.get("/metrics/inference")
+def inference_metrics():
+    """Inference executor load: in-flight/queued calls, rejections, queue wait vs compute time"""
+    metrics = get_inference_executor().metrics()
+    metrics["batching"] = batch_scheduler.get_batcher().metrics()
+    metrics["prediction_cache"] = get_prediction_cache().metrics()
+    return metrics
+
+@app.get("/metrics/audit")
+def audit_metrics():
+    """Audit pipeline: queued/written/spooled/replayed/rejected event counts"""
+    return get_audit_pipeline().metrics()
+
+@app.get("/metrics/reports")
+def report_metrics():
+    """Report worker pool (queue depth, in-flight renders, timeouts), artifact cache and share tokens"""
+    metrics = get_report_service().metrics()
+    metrics["cache"] = get_report_cache().metrics()
+    metrics["share_tokens"] = get_share_token_store().metrics()
+    return metrics
+
+@app.get("/model-info")
+def model_info():
+    """Version metadata of the loaded ML model artifacts"""
+    from model_registry import get_model_bundle
+    return get_model_bundle().metadata()
+
+@app.post("/model-reload")
+async def reload_model(current_user: models.User = Depends(auth.require_officer)):
+    """
+    Re-read the model artifacts from disk in this worker.
+    Services re-attach and the prediction cache is cleared.
+    With INFERENCE_EXECUTOR=process the pool processes keep their copy;
+    restart the workers instead.
+    Role: bank_officer only
+    """
+    from model_registry import reload_model_bundle
+    bundle = await asyncio.get_running_loop().run_in_executor(None, reload_model_bundle)
+    return bundle.metadata()
+
 @app.post("/predict-loan", response_model=LoanPredictionResponse)
 async def predict_loan_eligibility(application: LoanApplicationRequest):
     """
@@ -400,10 +494,6 @@ async def predict_loan_eligibility(application: LoanApplicationRequest):
     - PENDING_REVIEW: Confidence 40-70%
     """
     try:
-        from loan_predictor import get_predictor
-        
-        predictor = get_predictor()
-        
         # Convert request to dict for prediction
         loan_data = {
             'applicant_income': application.applicant_income,
@@ -419,8 +509,8 @@ async def predict_loan_eligibility(application: LoanApplicationRequest):
             'property_area': application.property_area,
         }
         
-        # Get prediction from trained model
-        result = predictor.predict(loan_data)
+        # Get prediction from trained model (off the event loop)
+        result = await get_inference_executor().run(inference_executor.predict, loan_data)
         
         return LoanPredictionResponse(
             status=result['status'],
@@ -429,6 +519,8 @@ async def predict_loan_eligibility(application: LoanApplicationRequest):
             recommendation=result['recommendation']
         )
         
+    except ExecutorSaturated as e:
+        raise _inference_busy(e)
     except FileNotFoundError as e:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
@@ -474,6 +566,9 @@ class LoanAdvisorRequest(BaseModel):
     coapplicant_income: Optional[float] = 0
     coapplicant_employment: Optional[str] = None
     coapplicant_relationship: Optional[str] = None
+    
+    # Optional manual CIBIL score (300-900)
+    cibil_score: Optional[int] = None
 
 
 class CreditScoreResponse(BaseModel):
@@ -536,6 +631,164 @@ class LoanAdvisorResponse(BaseModel):
     next_steps: List[str]
 
 
+# Applicants per /loan-advisor/batch call. One batch holds one inference
+# executor slot for its whole run, so the cap bounds how long a single caller
+# can keep a worker busy. Score thousands of leads as consecutive chunks of
+# this size, or raise it where latency for other callers matters less.
+MAX_ADVISOR_BATCH_SIZE = int(os.getenv("MAX_ADVISOR_BATCH_SIZE", "100"))
+
+
+class LoanAdvisorBatchRequest(BaseModel):
+    """Several applicants scored in one call"""
+    applicants: List[LoanAdvisorRequest]
+
+
+class LoanAdvisorBatchResponse(BaseModel):
+    count: int
+    results: List[LoanAdvisorResponse]
+
+
+class MaxEligibleRequest(LoanAdvisorRequest):
+    """Applicant profile; loan_amount/loan_duration are only the starting point"""
+    optimize_tenure: bool = True  # False = keep loan_duration fixed
+
+
+class TenureEligibility(BaseModel):
+    tenure_months: int
+    max_amount: float
+
+
+class MaxEligibleResponse(BaseModel):
+    max_eligible_amount: float
+    recommended_tenure: Optional[int] = None
+    by_tenure: List[TenureEligibility]
+    candidates_evaluated: int
+
+
+class WhatIfAxis(BaseModel):
+    """One swept field: explicit values, or `steps` evenly spaced points from start to stop"""
+    field: str  # loan_amount, loan_duration, cibil_score, monthly_debt_payments, monthly_income, coapplicant_income
+    values: Optional[List[float]] = None
+    start: Optional[float] = None
+    stop: Optional[float] = None
+    steps: int = 10
+
+
+class WhatIfRequest(BaseModel):
+    profile: LoanAdvisorRequest
+    axes: List[WhatIfAxis]
+
+
+class WhatIfCell(BaseModel):
+    inputs: Dict[str, float]
+    decision: str
+    approval_probability: float
+    interest_rate: float
+    emi: float
+    total_interest: float
+    emi_to_income_ratio: float
+    credit_rating: str
+
+
+class WhatIfResponse(BaseModel):
+    axes: List[Dict[str, Any]]
+    count: int
+    cells: List[WhatIfCell]
+
+
+def _inference_busy(exc: ExecutorSaturated) -> HTTPException:
+    """503 with Retry-After when the inference executor is saturated"""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=f"Inference capacity exhausted, please retry shortly. {exc}",
+        headers={"Retry-After": "1"}
+    )
+
+
+async def _report_response(request: Request, application: models.LoanApplication, headers: Dict[str, str]) -> Response:
+    """Report PDF for an application (user + prediction loaded) via the artifact cache"""
+    app_context, analysis_result = report_service.build_report_inputs(application)
+    key = report_cache.report_key(app_context, analysis_result)
+    cache_headers = {"ETag": report_cache.etag_for(key), "Cache-Control": "private, no-cache"}
+    
+    if report_cache.etag_matches(request.headers.get("If-None-Match"), key):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers)
+    
+    pdf_bytes = await get_report_cache().get_or_render(
+        application.user_id, key,
+        lambda: get_report_service().render(app_context, analysis_result, report_cache.report_id(key))
+    )
+    return Response(
+        content=pdf_bytes,
+        media_type="application/pdf",
+        headers={**headers, **cache_headers}
+    )
+
+
+def _report_busy(exc: ExecutorSaturated) -> HTTPException:
+    """503 with Retry-After when every report worker is busy and the queue is full"""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=f"Report rendering capacity exhausted, please retry shortly. {exc}",
+        headers={"Retry-After": "2"}
+    )
+
+
+async def _analyze_applicant(user_input: Dict[str, Any]) -> Dict[str, Any]:
+    """LoanAdvisor analysis via the prediction cache, falling back to the micro-batcher"""
+    cache = get_prediction_cache()
+    key = cache.make_key(user_input)
+    result = cache.get(key)
+    if result is None:
+        result = await batch_scheduler.analyze(user_input)
+        cache.put(key, result)
+    return result
+
+
+def _advisor_input(request: LoanAdvisorRequest) -> Dict[str, Any]:
+    """Convert a LoanAdvisorRequest into the dict LoanAdvisor expects"""
+    return {
+        'gender': request.gender,
+        'age': request.age,
+        'employment_status': request.employment_status,
+        'education_level': request.education_level,
+        'experience': request.experience,
+        'job_tenure': request.job_tenure,
+        'monthly_income': request.monthly_income,
+        'monthly_debt_payments': request.monthly_debt_payments,
+        'loan_amount': request.loan_amount,
+        'loan_duration': request.loan_duration,
+        'loan_purpose': request.loan_purpose,
+        'marital_status': request.marital_status,
+        'number_of_dependents': request.number_of_dependents,
+        'home_ownership_status': request.home_ownership_status,
+        'property_area': request.property_area,
+        'coapplicant_income': request.coapplicant_income or 0,
+        'coapplicant_employment': request.coapplicant_employment,
+        'coapplicant_relationship': request.coapplicant_relationship,
+        'cibil_score': request.cibil_score,
+    }
+
+
+def _advisor_response(result: Dict[str, Any]) -> LoanAdvisorResponse:
+    """Build the API response model from a LoanAdvisor result dict"""
+    return LoanAdvisorResponse(
+        application_date=result['application_date'],
+        decision=result['decision'],
+        decision_reason=result['decision_reason'],
+        approval_probability=result['approval_probability'],
+        credit_score=CreditScoreResponse(**result['credit_score']),
+        interest_rate=InterestRateResponse(**result['interest_rate']),
+        emi=EMIResponse(**result['emi']),
+        loan_details=LoanDetailsResponse(**result['loan_details']),
+        income_analysis=IncomeAnalysisResponse(**result['income_analysis']),
+        coapplicant=CoApplicantResponse(**result['coapplicant']),
+        explanations=result['explanations'],
+        kyc_required=result['kyc_required'],
+        next_steps=result['next_steps']
+    )
+
+
 @app.post("/loan-advisor", response_model=LoanAdvisorResponse)
 async def comprehensive_loan_analysis(request: LoanAdvisorRequest):
     """
@@ -559,51 +812,16 @@ async def comprehensive_loan_analysis(request: LoanAdvisorRequest):
     - High risk + long tenure
     """
     try:
-        from loan_advisor import get_advisor
-        
-        advisor = get_advisor()
-        
         # Convert request to dict
-        user_input = {
-            'gender': request.gender,
-            'age': request.age,
-            'employment_status': request.employment_status,
-            'education_level': request.education_level,
-            'experience': request.experience,
-            'job_tenure': request.job_tenure,
-            'monthly_income': request.monthly_income,
-            'monthly_debt_payments': request.monthly_debt_payments,
-            'loan_amount': request.loan_amount,
-            'loan_duration': request.loan_duration,
-            'loan_purpose': request.loan_purpose,
-            'marital_status': request.marital_status,
-            'number_of_dependents': request.number_of_dependents,
-            'home_ownership_status': request.home_ownership_status,
-            'property_area': request.property_area,
-            'coapplicant_income': request.coapplicant_income or 0,
-            'coapplicant_employment': request.coapplicant_employment,
-            'coapplicant_relationship': request.coapplicant_relationship,
-        }
+        user_input = _advisor_input(request)
         
-        # Get comprehensive analysis
-        result = advisor.analyze(user_input)
+        # Get comprehensive analysis (micro-batched, off the event loop)
+        result = await _analyze_applicant(user_input)
         
-        return LoanAdvisorResponse(
-            application_date=result['application_date'],
-            decision=result['decision'],
-            decision_reason=result['decision_reason'],
-            approval_probability=result['approval_probability'],
-            credit_score=CreditScoreResponse(**result['credit_score']),
-            interest_rate=InterestRateResponse(**result['interest_rate']),
-            emi=EMIResponse(**result['emi']),
-            loan_details=LoanDetailsResponse(**result['loan_details']),
-            income_analysis=IncomeAnalysisResponse(**result['income_analysis']),
-            coapplicant=CoApplicantResponse(**result['coapplicant']),
-            explanations=result['explanations'],
-            kyc_required=result['kyc_required'],
-            next_steps=result['next_steps']
-        )
+        return _advisor_response(result)
         
+    except ExecutorSaturated as e:
+        raise _inference_busy(e)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -611,6 +829,106 @@ async def comprehensive_loan_analysis(request: LoanAdvisorRequest):
         )
 
 
+@app.post("/loan-advisor/batch", response_model=LoanAdvisorBatchResponse)
+async def batch_loan_analysis(request: LoanAdvisorBatchRequest):
+    """
+    Score several applicants in one request.
+
+    Same analysis as /loan-advisor, but the model and SHAP explainer run
+    once over the whole batch instead of once per applicant. Results are
+    returned in the order the applicants were sent.
+    """
+    if not request.applicants:
+        raise HTTPException(status_code=400, detail="At least one applicant is required")
+    if len(request.applicants) > MAX_ADVISOR_BATCH_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch size exceeds limit of {MAX_ADVISOR_BATCH_SIZE} applicants"
+        )
+
+    try:
+        results = await get_inference_executor().run(
+            inference_executor.analyze_batch,
+            [_advisor_input(a) for a in request.applicants]
+        )
+
+        return LoanAdvisorBatchResponse(
+            count=len(results),
+            results=[_advisor_response(r) for r in results]
+        )
+
+    except ExecutorSaturated as e:
+        raise _inference_busy(e)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Loan analysis error: {str(e)}"
+        )
+
+
+@app.post("/loan-advisor/max-eligible", response_model=MaxEligibleResponse)
+async def max_eligible_loan(request: MaxEligibleRequest):
+    """
+    Largest loan amount (and the tenure allowing it) that is still APPROVED
+    by both the ML model and the decision rules.
+    All candidate amounts are scored in two batched model calls.
+    """
+    try:
+        user_input = _advisor_input(request)
+        tenures = None if request.optimize_tenure else [request.loan_duration]
+        result = await get_inference_executor().run(inference_executor.max_eligible, user_input, tenures)
+        return MaxEligibleResponse(**result)
+
+    except ExecutorSaturated as e:
+        raise _inference_busy(e)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Eligibility solver error: {str(e)}"
+        )
+
+
+def _what_if_values(axis: WhatIfAxis) -> List[float]:
+    if axis.values is not None:
+        return axis.values
+    if axis.start is None or axis.stop is None:
+        raise ValueError(f"What-if axis '{axis.field}' needs either values or start/stop")
+    if axis.steps < 1:
+        raise ValueError(f"What-if axis '{axis.field}' needs at least one step")
+    if axis.steps == 1:
+        return [axis.start]
+    step = (axis.stop - axis.start) / (axis.steps - 1)
+    return [axis.start + i * step for i in range(axis.steps)]
+
+
+@app.post("/loan-advisor/what-if", response_model=WhatIfResponse)
+async def loan_what_if(request: WhatIfRequest):
+    """
+    Sensitivity sweep for heatmaps: decision, probability, rate and EMI for
+    every combination of the requested field values around a base profile.
+    The whole grid is scored in one batched model call.
+    """
+    try:
+        axes = [(axis.field, _what_if_values(axis)) for axis in request.axes]
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    try:
+        user_input = _advisor_input(request.profile)
+        result = await get_inference_executor().run(inference_executor.what_if, user_input, axes)
+        return WhatIfResponse(**result)
+
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except ExecutorSaturated as e:
+        raise _inference_busy(e)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"What-if analysis error: {str(e)}"
+        )
+
+
 # =====================================================
 # ML-ALIGNED LOAN APPLICATION ENDPOINTS (WITH DB PERSISTENCE)
 # =====================================================
@@ -618,6 +936,7 @@ async def comprehensive_loan_analysis(request: LoanAdvisorRequest):
 @app.post("/loan-application", response_model=schemas.LoanApplicationResponse)
 async def submit_loan_application(
     application: schemas.LoanApplicationCreate,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(database.get_db),
     current_user: Optional[models.User] = Depends(auth.get_optional_user)
 ):
@@ -640,8 +959,6 @@ async def submit_loan_application(
         )
     
     try:
-        from loan_advisor import get_advisor
-        
         # Build features dict for ML model
         features = {
             'gender': application.gender,
@@ -664,6 +981,9 @@ async def submit_loan_application(
             'previous_loan_defaults': application.previous_loan_defaults,  # Yes/No
         }
         
+        # Run ML inference off the event loop before touching the DB session
+        result = await _analyze_applicant(features)
+        
         # 1. Store ML input features (loan_applications table)
         db_application = models.LoanApplication(
             user_id=current_user.id,
@@ -688,11 +1008,7 @@ async def submit_loan_application(
         db.add(db_application)
         await db.flush()  # Get the ID without committing
         
-        # 2. Run ML inference
-        advisor = get_advisor()
-        result = advisor.analyze(features)
-        
-        # 3. Store ML outputs (loan_predictions table) - IMMUTABLE
+        # 2. Store ML outputs (loan_predictions table) - IMMUTABLE
         db_prediction = models.LoanPrediction(
             application_id=db_application.id,
             approval_probability=result['approval_probability'],
@@ -706,16 +1022,20 @@ async def submit_loan_application(
             credit_score_band=result['credit_score']['display'],
             credit_rating=result['credit_score']['rating'],
             shap_summary=result['explanations'],
-            model_version="xgboost_v1.0"
+            model_version=result['model_version']
         )
         db.add(db_prediction)
         
-        # 4. Commit both records
+        # 3. Commit both records
         await db.commit()
         await db.refresh(db_application)
         await db.refresh(db_prediction)
         
-        # 5. Return response
+        # Approved loans get their EMI schedule right away, off the request path
+        if result['decision'] == "APPROVED":
+            background_tasks.add_task(repayment_service.ensure_schedule_in_background, db_application.id)
+        
+        # 4. Return response
         return schemas.LoanApplicationResponse(
             id=db_application.id,
             created_at=db_application.created_at,
@@ -733,6 +1053,8 @@ async def submit_loan_application(
             kyc_required=result['kyc_required']
         )
         
+    except ExecutorSaturated as e:
+        raise _inference_busy(e)
     except Exception as e:
         await db.rollback()
         raise HTTPException(
@@ -741,14 +1063,54 @@ async def submit_loan_application(
         )
 
 
+def _application_list_query():
+    """
+    Lightweight projection for application listings: the list columns plus
+    customer and prediction via outer joins and the review as EXISTS,
+    in one statement (features_json is never loaded).
+    """
+    App = models.LoanApplication
+    return (
+        select(
+            App.id, App.user_id, App.loan_amount, App.loan_purpose, App.created_at,
+            models.User.id.label("customer_found"),
+            models.User.first_name, models.User.last_name, models.User.customer_id,
+            models.LoanPrediction.decision, models.LoanPrediction.approval_probability,
+            App.officer_review.has().label("reviewed")
+        )
+        .outerjoin(App.user)
+        .outerjoin(App.prediction)
+    )
+
+
+def _application_list_item(row) -> schemas.ApplicationListItem:
+    return schemas.ApplicationListItem(
+        id=row.id,
+        user_id=row.user_id,
+        customer_name=f"{row.first_name or ''} {row.last_name or ''}".strip() if row.customer_found else None,
+        customer_id=row.customer_id,
+        loan_amount=row.loan_amount,
+        loan_purpose=row.loan_purpose,
+        decision=row.decision or "PENDING",
+        approval_probability=row.approval_probability or 0,
+        created_at=row.created_at,
+        reviewed=bool(row.reviewed)
+    )
+
+
 @app.get("/my-applications", response_model=List[schemas.ApplicationListItem])
 async def get_my_applications(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
     current_user: Optional[models.User] = Depends(auth.get_optional_user),
     db: AsyncSession = Depends(database.get_db)
 ):
     """
-    Get all loan applications for the current customer.
+    Get the current customer's loan applications, newest first.
     Returns empty list if not logged in.
+    Keyset paginated: X-Has-More says whether another page exists and
+    X-Next-Cursor is the `cursor` for it (no COUNT query).
     """
     if current_user is None:
         return []  # Return empty if not logged in
@@ -759,96 +1121,67 @@ async def get_my_applications(
             detail="Only customers can view their applications"
         )
     
-    query = select(models.LoanApplication).where(
-        models.LoanApplication.user_id == current_user.id
-    ).order_by(models.LoanApplication.created_at.desc())
+    App = models.LoanApplication
+    limit = pagination.page_size(limit)
+    query = _application_list_query().where(App.user_id == current_user.id)
+    query = pagination.after_cursor(query, App.created_at, App.id, cursor)
     
-    result = await db.execute(query)
-    applications = result.scalars().all()
-    
-    response = []
-    for app in applications:
-        # Get prediction for this application
-        pred_query = select(models.LoanPrediction).where(
-            models.LoanPrediction.application_id == app.id
-        )
-        pred_result = await db.execute(pred_query)
-        prediction = pred_result.scalars().first()
-        
-        # Check if reviewed
-        review_query = select(models.OfficerReview).where(
-            models.OfficerReview.application_id == app.id
-        )
-        review_result = await db.execute(review_query)
-        review = review_result.scalars().first()
-        
-        response.append(schemas.ApplicationListItem(
-            id=app.id,
-            user_id=app.user_id,
-            customer_name=f"{current_user.first_name or ''} {current_user.last_name or ''}".strip() or None,
-            customer_id=current_user.customer_id,
-            loan_amount=app.loan_amount,
-            loan_purpose=app.loan_purpose,
-            decision=prediction.decision if prediction else "PENDING",
-            approval_probability=prediction.approval_probability if prediction else 0,
-            created_at=app.created_at,
-            reviewed=review is not None
-        ))
+    result = await db.execute(pagination.newest_first(query, App.created_at, App.id, limit))
+    rows = pagination.finish_page(result.all(), limit, response)
     
-    return response
+    return [_application_list_item(row) for row in rows]
 
 
 @app.get("/applications", response_model=List[schemas.ApplicationListItem])
 async def get_all_applications(
+    response: Response,
+    decision: Optional[str] = None,
+    reviewed: Optional[bool] = None,
+    created_from: Optional[date] = None,
+    created_to: Optional[date] = None,
+    min_amount: Optional[float] = None,
+    max_amount: Optional[float] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
     current_user: models.User = Depends(auth.require_officer),
     db: AsyncSession = Depends(database.get_db)
 ):
     """
-    Get all loan applications (for bank officers).
+    Get loan applications, newest first (for bank officers).
     Role: bank_officer only
-    """
-    query = select(models.LoanApplication).order_by(
-        models.LoanApplication.created_at.desc()
-    )
-    
-    result = await db.execute(query)
-    applications = result.scalars().all()
-    
-    response = []
-    for app in applications:
-        # Get user info
-        user_query = select(models.User).where(models.User.id == app.user_id)
-        user_result = await db.execute(user_query)
-        user = user_result.scalars().first()
-        
-        # Get prediction
-        pred_query = select(models.LoanPrediction).where(
-            models.LoanPrediction.application_id == app.id
-        )
-        pred_result = await db.execute(pred_query)
-        prediction = pred_result.scalars().first()
-        
-        # Check if reviewed
-        review_query = select(models.OfficerReview).where(
-            models.OfficerReview.application_id == app.id
-        )
-        review_result = await db.execute(review_query)
-        review = review_result.scalars().first()
-        
-        response.append(schemas.ApplicationListItem(
-            id=app.id,
-            user_id=app.user_id,
-            customer_name=f"{user.first_name or ''} {user.last_name or ''}".strip() if user else None,
-            customer_id=user.customer_id if user else None,
-            loan_amount=app.loan_amount,
-            loan_purpose=app.loan_purpose,
-            decision=prediction.decision if prediction else "PENDING",
-            approval_probability=prediction.approval_probability if prediction else 0,
-            created_at=app.created_at,
-            reviewed=review is not None
-        ))
     
-    return response
+    Filters: decision (APPROVED, REJECTED, PENDING_REVIEW, or PENDING for
+    no prediction), reviewed, created_from/created_to (inclusive dates),
+    min_amount/max_amount.
+    Keyset paginated: pass the X-Next-Cursor response header back as `cursor`.
+    """
+    App = models.LoanApplication
+    Prediction = models.LoanPrediction
+    limit = pagination.page_size(limit)
+    
+    # One round trip: user and prediction joined, review as EXISTS
+    is_reviewed = App.officer_review.has()
+    query = _application_list_query()
+    
+    if decision:
+        decision = decision.upper()
+        query = query.where(Prediction.id.is_(None) if decision == "PENDING" else Prediction.decision == decision)
+    if reviewed is not None:
+        query = query.where(is_reviewed if reviewed else ~is_reviewed)
+    if created_from:
+        query = query.where(App.created_at >= datetime.combine(created_from, datetime.min.time()))
+    if created_to:
+        query = query.where(App.created_at < datetime.combine(created_to + timedelta(days=1), datetime.min.time()))
+    if min_amount is not None:
+        query = query.where(App.loan_amount >= min_amount)
+    if max_amount is not None:
+        query = query.where(App.loan_amount <= max_amount)
+    
+    query = pagination.after_cursor(query, App.created_at, App.id, cursor)
+    result = await db.execute(pagination.newest_first(query, App.created_at, App.id, limit))
+    rows = pagination.finish_page(result.all(), limit, response)
+    
+    return [_application_list_item(row) for row in rows]
 
 
 @app.get("/application/{application_id}", response_model=schemas.ApplicationDetailResponse)
@@ -1021,66 +1354,26 @@ async def log_audit(
     request = None,
     session_id = None
 ):
+    """
+    Record an audit event. The event is queued and written in the background
+    by the audit pipeline, outside the caller's transaction, so `db` is
+    not touched (kept for the existing call sites).
+    """
     try:
-        import device_utils
-        
-        # Get device info from request if provided
-        device_type = None
-        browser = None
-        os_name = None
-        ip_hash = None
-        ip_address = None
-        location_city = None
-        location_country = None
-        user_agent = None
-        
-        if request:
-            user_agent = request.headers.get("User-Agent", "")
-            ip = device_utils.get_client_ip(request)
-            
-            device_info = device_utils.parse_user_agent(user_agent)
-            device_type = device_info.get("device_type")
-            browser = device_info.get("browser")
-            os_name = device_info.get("os")
-            
-            ip_hash = device_utils.hash_ip(ip)
-            ip_address = device_utils.mask_ip(ip)
-            
-            location = device_utils.get_location_from_ip(ip)
-            location_city = location.get("city")
-            location_country = location.get("country")
-        
-        event_category = models.AuditAction.get_category(action)
-        severity = models.AuditAction.get_severity(action)
-        
-        if not description:
-            description = device_utils.format_event_description(action, metadata) if request else action
-        
-        audit_entry = models.AuditLog(
-            user_id=user_id,
-            action=action,
-            event_category=event_category,
-            severity=severity,
+        get_audit_pipeline().enqueue(audit_pipeline.capture_event(
+            user_id, action,
             entity_type=entity_type,
             entity_id=entity_id,
             description=description,
-            extra_data=metadata,
-            session_id=session_id,
-            device_type=device_type,
-            browser=browser,
-            os=os_name,
-            ip_hash=ip_hash,
-            ip_address=ip_address,
-            location_city=location_city,
-            location_country=location_country,
-            user_agent=user_agent
-        )
-        db.add(audit_entry)
-        # We don't commit here, it's the caller's responsibility
+            metadata=metadata,
+            request=request,
+            session_id=session_id
+        ))
+        # The pipeline invalidates again once the event is written
+        get_activity_cache().invalidate(user_id)
     except Exception as e:
         print(f"Error in log_audit: {e}")
         # Audit logging should never crash the main application
-    # Don't commit here - let the calling function handle transaction
 
 
 # =====================================================
@@ -1193,14 +1486,27 @@ async def get_eligibility(
     # Calculate income to EMI ratio
     income_to_emi = (prediction.emi / application.monthly_income * 100) if application.monthly_income > 0 else 0
     
+    # Solve for the largest amount the model + decision rules still approve
+    max_eligible_amount = application.loan_amount
+    recommended_tenure = None
+    try:
+        solved = await get_inference_executor().run(
+            inference_executor.max_eligible, dict(application.features_json or {})
+        )
+        max_eligible_amount = solved['max_eligible_amount']
+        recommended_tenure = solved['recommended_tenure']
+    except Exception as e:
+        print(f"[Eligibility] Solver unavailable, using requested amount: {e}")
+    
     return schemas.EligibilityResponse(
         has_application=True,
         pre_approved_amount=application.loan_amount if prediction.decision == "APPROVED" else None,
-        max_eligible_amount=application.loan_amount * 1.5 if prediction.decision == "APPROVED" else application.loan_amount,
+        max_eligible_amount=max_eligible_amount,
         eligible_products=["Personal Loan", "Home Loan", "Vehicle Loan"] if prediction.decision == "APPROVED" else ["Personal Loan"],
         approval_probability=prediction.approval_probability,
         credit_rating=prediction.credit_rating,
-        income_to_emi_ratio=round(income_to_emi, 2)
+        income_to_emi_ratio=round(income_to_emi, 2),
+        recommended_tenure=recommended_tenure
     )
 
 
@@ -1208,43 +1514,6 @@ async def get_eligibility(
 # REPAYMENTS & EMI ENDPOINTS
 # =====================================================
 
-def generate_emi_schedule(
-    loan_amount: float,
-    interest_rate: float,
-    tenure_months: int,
-    start_date: date
-) -> List[dict]:
-    """Generate complete EMI schedule with amortization"""
-    monthly_rate = interest_rate / 100 / 12
-    
-    # EMI formula: EMI = P * r * (1+r)^n / ((1+r)^n - 1)
-    if monthly_rate > 0:
-        emi = loan_amount * monthly_rate * pow(1 + monthly_rate, tenure_months) / (pow(1 + monthly_rate, tenure_months) - 1)
-    else:
-        emi = loan_amount / tenure_months
-    
-    schedule = []
-    outstanding = loan_amount
-    
-    for i in range(1, tenure_months + 1):
-        interest_component = outstanding * monthly_rate
-        principal_component = emi - interest_component
-        outstanding -= principal_component
-        
-        due_date = start_date + timedelta(days=30 * i)
-        
-        schedule.append({
-            "emi_number": i,
-            "due_date": due_date,
-            "emi_amount": round(emi, 2),
-            "principal_component": round(principal_component, 2),
-            "interest_component": round(interest_component, 2),
-            "outstanding_principal": max(0, round(outstanding, 2))
-        })
-    
-    return schedule
-
-
 @app.get("/repayments/{application_id}", response_model=schemas.EMIScheduleResponse)
 async def get_emi_schedule(
     application_id: str,
@@ -1283,42 +1552,8 @@ async def get_emi_schedule(
     if not prediction or prediction.decision != "APPROVED":
         raise HTTPException(status_code=400, detail="EMI schedule only available for approved loans")
     
-    # Check if repayments exist, if not generate them
-    rep_query = select(models.Repayment).where(
-        models.Repayment.application_id == app_uuid
-    ).order_by(models.Repayment.emi_number)
-    
-    rep_result = await db.execute(rep_query)
-    repayments = rep_result.scalars().all()
-    
-    if not repayments:
-        # Generate and save EMI schedule
-        from datetime import timedelta
-        schedule = generate_emi_schedule(
-            application.loan_amount,
-            prediction.interest_rate,
-            application.loan_duration,
-            application.created_at.date()
-        )
-        
-        for emi_data in schedule:
-            repayment = models.Repayment(
-                application_id=app_uuid,
-                emi_number=emi_data["emi_number"],
-                due_date=emi_data["due_date"],
-                emi_amount=emi_data["emi_amount"],
-                principal_component=emi_data["principal_component"],
-                interest_component=emi_data["interest_component"],
-                outstanding_principal=emi_data["outstanding_principal"],
-                payment_status="DUE"
-            )
-            db.add(repayment)
-        
-        await db.commit()
-        
-        # Re-fetch
-        rep_result = await db.execute(rep_query)
-        repayments = rep_result.scalars().all()
+    # Normally created at approval time; otherwise one bulk insert now
+    repayments = await repayment_service.ensure_schedule(db, application, prediction.interest_rate)
     
     # Build response
     paid_count = sum(1 for r in repayments if r.payment_status == "PAID")
@@ -1599,33 +1834,6 @@ async def verify_document(
     return schemas.KYCDocumentResponse.model_validate(document)
 
 
-# =====================================================
-# ACTIVITY & AUDIT LOG ENDPOINTS
-# =====================================================
-
-@app.get("/activity", response_model=schemas.ActivityTimelineResponse)
-async def get_activity_log(
-    limit: int = 50,
-    current_user: Optional[models.User] = Depends(auth.get_optional_user),
-    db: AsyncSession = Depends(database.get_db)
-):
-    """Get user's activity log - returns empty if not logged in"""
-    if current_user is None:
-        return schemas.ActivityTimelineResponse(total_events=0, events=[])
-    
-    query = select(models.AuditLog).where(
-        models.AuditLog.user_id == current_user.id
-    ).order_by(models.AuditLog.created_at.desc()).limit(limit)
-    
-    result = await db.execute(query)
-    logs = result.scalars().all()
-    
-    return schemas.ActivityTimelineResponse(
-        total_events=len(logs),
-        events=[schemas.AuditLogResponse.model_validate(log) for log in logs]
-    )
-
-
 # =====================================================
 # SECURITY & PROFILE ENDPOINTS
 # =====================================================
@@ -1692,6 +1900,8 @@ async def update_profile(
     
     await db.commit()
     await db.refresh(current_user)
+    # Reports embed profile fields; their cached PDFs can no longer be served
+    get_report_cache().invalidate_user(current_user.id)
     
     return current_user
 
@@ -1778,35 +1988,78 @@ async def change_pin(
 # ACTIVITY & AUDIT LOG ENDPOINTS - BANKING GRADE
 # =====================================================
 
+ACTIVITY_MAX_PAGE_SIZE = int(os.getenv("ACTIVITY_MAX_PAGE_SIZE", "100"))
+# Event totals count at most this many events; beyond it the total is a lower bound
+ACTIVITY_TOTAL_CAP = int(os.getenv("ACTIVITY_TOTAL_CAP", "1000"))
+
+
+async def _activity_page(
+    db: AsyncSession,
+    user_id,
+    response: Response,
+    cursor: Optional[str],
+    limit: Optional[int],
+    default_limit: int,
+    category: Optional[str] = None
+) -> List[models.AuditLog]:
+    """
+    One newest-first page of a user's audit events, keyset paginated on
+    (created_at, id). Sets X-Has-More / X-Next-Cursor like the other lists.
+    """
+    Log = models.AuditLog
+    limit = pagination.page_size(limit, default=default_limit, maximum=ACTIVITY_MAX_PAGE_SIZE)
+    query = select(Log).where(Log.user_id == user_id)
+    if category is not None:
+        query = query.where(Log.event_category == category)
+    query = pagination.after_cursor(query, Log.created_at, Log.id, cursor)
+
+    result = await db.execute(pagination.newest_first(query, Log.created_at, Log.id, limit))
+    return pagination.finish_page(list(result.scalars().all()), limit, response)
+
+
+async def _activity_total(db: AsyncSession, user_id, category: Optional[str] = None) -> Dict[str, Any]:
+    """Event count capped at ACTIVITY_TOTAL_CAP so heavy users cost a bounded index scan"""
+    Log = models.AuditLog
+    capped = select(Log.id).where(Log.user_id == user_id)
+    if category is not None:
+        capped = capped.where(Log.event_category == category)
+    capped = capped.limit(ACTIVITY_TOTAL_CAP + 1).subquery()
+    count = (await db.execute(select(func.count()).select_from(capped))).scalar()
+    return {
+        "total_events": min(count, ACTIVITY_TOTAL_CAP),
+        "total_is_estimate": count > ACTIVITY_TOTAL_CAP,
+    }
+
+
+def _activity_feed(category_label: str, events: list, total: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    feed = {"category": category_label, "events": events}
+    if total is not None:
+        feed.update(total)
+    return feed
+
+
 @app.get("/activity")
 async def get_activity_all(
-    limit: int = 50,
-    offset: int = 0,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
     current_user: Optional[models.User] = Depends(auth.get_optional_user),
     db: AsyncSession = Depends(database.get_db)
 ):
     """
     Get all activity for current user.
     Returns categorized events with device info.
+    Keyset paginated (X-Has-More / X-Next-Cursor headers, `cursor` param),
+    at most ACTIVITY_MAX_PAGE_SIZE events per page. total_events counts
+    every event, capped at ACTIVITY_TOTAL_CAP (total_is_estimate past it).
     """
     if current_user is None:
-        return {"total_events": 0, "events": []}
-    query = select(models.AuditLog).where(
-        models.AuditLog.user_id == current_user.id
-    ).order_by(models.AuditLog.created_at.desc()).limit(limit).offset(offset)
-    
-    result = await db.execute(query)
-    logs = result.scalars().all()
-    
-    # Count total
-    count_query = select(func.count(models.AuditLog.id)).where(
-        models.AuditLog.user_id == current_user.id
-    )
-    count_result = await db.execute(count_query)
-    total = count_result.scalar()
+        return {"total_events": 0, "total_is_estimate": False, "events": []}
+    logs = await _activity_page(db, current_user.id, response, cursor, limit, default_limit=50)
+    total = await _activity_total(db, current_user.id)
     
     return {
-        "total_events": total,
+        **total,
         "events": [
             {
                 "id": str(log.id),
@@ -1827,171 +2080,151 @@ async def get_activity_all(
 
 @app.get("/activity/security")
 async def get_security_activity(
-    limit: int = 20,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    include_total: bool = False,
     current_user: Optional[models.User] = Depends(auth.get_optional_user),
     db: AsyncSession = Depends(database.get_db)
 ):
     """Get security-related activity (logins, password changes, sessions)"""
     if current_user is None:
         return {"category": "Security", "events": []}
-    query = select(models.AuditLog).where(
-        models.AuditLog.user_id == current_user.id,
-        models.AuditLog.event_category == models.EventCategory.SECURITY
-    ).order_by(models.AuditLog.created_at.desc()).limit(limit)
-    
-    result = await db.execute(query)
-    logs = result.scalars().all()
-    
-    return {
-        "category": "Security",
-        "events": [
-            {
-                "id": str(log.id),
-                "action": log.action,
-                "severity": log.severity,
-                "description": log.description,
-                "timestamp": log.created_at.isoformat(),
-                "device": f"{log.device_type or 'Unknown'} - {log.browser or 'Unknown'} on {log.os or 'Unknown'}",
-                "location": f"{log.location_city or 'Unknown'}, {log.location_country or 'Unknown'}",
-                "ip": log.ip_address or "Unknown"
-            }
-            for log in logs
-        ]
-    }
+    category = models.EventCategory.SECURITY
+    logs = await _activity_page(db, current_user.id, response, cursor, limit, default_limit=20, category=category)
+    total = await _activity_total(db, current_user.id, category) if include_total else None
+    
+    return _activity_feed("Security", [
+        {
+            "id": str(log.id),
+            "action": log.action,
+            "severity": log.severity,
+            "description": log.description,
+            "timestamp": log.created_at.isoformat(),
+            "device": f"{log.device_type or 'Unknown'} - {log.browser or 'Unknown'} on {log.os or 'Unknown'}",
+            "location": f"{log.location_city or 'Unknown'}, {log.location_country or 'Unknown'}",
+            "ip": log.ip_address or "Unknown"
+        }
+        for log in logs
+    ], total)
 
 
 @app.get("/activity/loans")
 async def get_loan_activity(
-    limit: int = 20,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    include_total: bool = False,
     current_user: Optional[models.User] = Depends(auth.get_optional_user),
     db: AsyncSession = Depends(database.get_db)
 ):
     """Get loan-related activity (applications, decisions, reviews)"""
     if current_user is None:
         return {"category": "Loan Applications", "events": []}
-    query = select(models.AuditLog).where(
-        models.AuditLog.user_id == current_user.id,
-        models.AuditLog.event_category == models.EventCategory.LOAN
-    ).order_by(models.AuditLog.created_at.desc()).limit(limit)
-    
-    result = await db.execute(query)
-    logs = result.scalars().all()
-    
-    return {
-        "category": "Loan Applications",
-        "events": [
-            {
-                "id": str(log.id),
-                "action": log.action,
-                "severity": log.severity,
-                "description": log.description,
-                "timestamp": log.created_at.isoformat(),
-                "application_id": str(log.entity_id) if log.entity_id else None,
-                "extra": log.extra_data
-            }
-            for log in logs
-        ]
-    }
+    category = models.EventCategory.LOAN
+    logs = await _activity_page(db, current_user.id, response, cursor, limit, default_limit=20, category=category)
+    total = await _activity_total(db, current_user.id, category) if include_total else None
+    
+    return _activity_feed("Loan Applications", [
+        {
+            "id": str(log.id),
+            "action": log.action,
+            "severity": log.severity,
+            "description": log.description,
+            "timestamp": log.created_at.isoformat(),
+            "application_id": str(log.entity_id) if log.entity_id else None,
+            "extra": log.extra_data
+        }
+        for log in logs
+    ], total)
 
 
 @app.get("/activity/kyc")
 async def get_kyc_activity(
-    limit: int = 20,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    include_total: bool = False,
     current_user: Optional[models.User] = Depends(auth.get_optional_user),
     db: AsyncSession = Depends(database.get_db)
 ):
     """Get KYC-related activity (document uploads, verifications)"""
     if current_user is None:
         return {"category": "KYC & Documents", "events": []}
-    query = select(models.AuditLog).where(
-        models.AuditLog.user_id == current_user.id,
-        models.AuditLog.event_category == models.EventCategory.KYC
-    ).order_by(models.AuditLog.created_at.desc()).limit(limit)
-    
-    result = await db.execute(query)
-    logs = result.scalars().all()
-    
-    return {
-        "category": "KYC & Documents",
-        "events": [
-            {
-                "id": str(log.id),
-                "action": log.action,
-                "severity": log.severity,
-                "description": log.description,
-                "timestamp": log.created_at.isoformat(),
-                "document_id": str(log.entity_id) if log.entity_id else None,
-                "document_type": log.extra_data.get("document_type") if log.extra_data else None
-            }
-            for log in logs
-        ]
-    }
+    category = models.EventCategory.KYC
+    logs = await _activity_page(db, current_user.id, response, cursor, limit, default_limit=20, category=category)
+    total = await _activity_total(db, current_user.id, category) if include_total else None
+    
+    return _activity_feed("KYC & Documents", [
+        {
+            "id": str(log.id),
+            "action": log.action,
+            "severity": log.severity,
+            "description": log.description,
+            "timestamp": log.created_at.isoformat(),
+            "document_id": str(log.entity_id) if log.entity_id else None,
+            "document_type": log.extra_data.get("document_type") if log.extra_data else None
+        }
+        for log in logs
+    ], total)
 
 
 @app.get("/activity/payments")
 async def get_payment_activity(
-    limit: int = 20,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    include_total: bool = False,
     current_user: Optional[models.User] = Depends(auth.get_optional_user),
     db: AsyncSession = Depends(database.get_db)
 ):
     """Get payment-related activity (EMI payments, schedules)"""
     if current_user is None:
         return {"category": "Payments & EMI", "events": []}
-    query = select(models.AuditLog).where(
-        models.AuditLog.user_id == current_user.id,
-        models.AuditLog.event_category == models.EventCategory.PAYMENT
-    ).order_by(models.AuditLog.created_at.desc()).limit(limit)
-    
-    result = await db.execute(query)
-    logs = result.scalars().all()
-    
-    return {
-        "category": "Payments & EMI",
-        "events": [
-            {
-                "id": str(log.id),
-                "action": log.action,
-                "severity": log.severity,
-                "description": log.description,
-                "timestamp": log.created_at.isoformat(),
-                "amount": log.extra_data.get("amount") if log.extra_data else None,
-                "emi_number": log.extra_data.get("emi_number") if log.extra_data else None
-            }
-            for log in logs
-        ]
-    }
+    category = models.EventCategory.PAYMENT
+    logs = await _activity_page(db, current_user.id, response, cursor, limit, default_limit=20, category=category)
+    total = await _activity_total(db, current_user.id, category) if include_total else None
+    
+    return _activity_feed("Payments & EMI", [
+        {
+            "id": str(log.id),
+            "action": log.action,
+            "severity": log.severity,
+            "description": log.description,
+            "timestamp": log.created_at.isoformat(),
+            "amount": log.extra_data.get("amount") if log.extra_data else None,
+            "emi_number": log.extra_data.get("emi_number") if log.extra_data else None
+        }
+        for log in logs
+    ], total)
 
 
 @app.get("/activity/profile")
 async def get_profile_activity(
-    limit: int = 20,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    include_total: bool = False,
     current_user: Optional[models.User] = Depends(auth.get_optional_user),
     db: AsyncSession = Depends(database.get_db)
 ):
     """Get profile-related activity (updates, preferences, consents)"""
     if current_user is None:
         return {"category": "Profile & Settings", "events": []}
-    query = select(models.AuditLog).where(
-        models.AuditLog.user_id == current_user.id,
-        models.AuditLog.event_category == models.EventCategory.PROFILE
-    ).order_by(models.AuditLog.created_at.desc()).limit(limit)
-    
-    result = await db.execute(query)
-    logs = result.scalars().all()
-    
-    return {
-        "category": "Profile & Settings",
-        "events": [
-            {
-                "id": str(log.id),
-                "action": log.action,
-                "severity": log.severity,
-                "description": log.description,
-                "timestamp": log.created_at.isoformat()
-            }
-            for log in logs
-        ]
-    }
+    category = models.EventCategory.PROFILE
+    logs = await _activity_page(db, current_user.id, response, cursor, limit, default_limit=20, category=category)
+    total = await _activity_total(db, current_user.id, category) if include_total else None
+    
+    return _activity_feed("Profile & Settings", [
+        {
+            "id": str(log.id),
+            "action": log.action,
+            "severity": log.severity,
+            "description": log.description,
+            "timestamp": log.created_at.isoformat()
+        }
+        for log in logs
+    ], total)
 
 
 @app.get("/activity/dashboard")
@@ -2005,6 +2238,12 @@ async def get_activity_dashboard(
     """
     if current_user is None:
         return []
+    
+    cache = get_activity_cache()
+    cached = cache.get(current_user.id)
+    if cached is not None:
+        return cached
+    
     categories = [
         models.EventCategory.SECURITY,
         models.EventCategory.LOAN,
@@ -2012,63 +2251,70 @@ async def get_activity_dashboard(
         models.EventCategory.PAYMENT,
         models.EventCategory.PROFILE
     ]
+    Log = models.AuditLog
+    
+    # Whole dashboard in one round trip: per-category rank + total via
+    # window functions, the latest login ranked within its action, and
+    # the active session count joined in
+    ranked = select(
+        Log.event_category, Log.action, Log.description, Log.severity, Log.created_at,
+        Log.location_city, Log.location_country,
+        func.row_number().over(
+            partition_by=Log.event_category,
+            order_by=(Log.created_at.desc(), Log.id.desc())
+        ).label("category_rank"),
+        func.count().over(partition_by=Log.event_category).label("category_total"),
+        func.row_number().over(
+            partition_by=Log.action,
+            order_by=(Log.created_at.desc(), Log.id.desc())
+        ).label("action_rank")
+    ).where(
+        Log.user_id == current_user.id,
+        Log.event_category.in_(categories)
+    ).subquery()
     
-    dashboard = {}
-    
-    for category in categories:
-        query = select(models.AuditLog).where(
-            models.AuditLog.user_id == current_user.id,
-            models.AuditLog.event_category == category
-        ).order_by(models.AuditLog.created_at.desc()).limit(5)
-        
-        result = await db.execute(query)
-        logs = result.scalars().all()
-        
-        # Count total for this category
-        count_query = select(func.count(models.AuditLog.id)).where(
-            models.AuditLog.user_id == current_user.id,
-            models.AuditLog.event_category == category
-        )
-        count_result = await db.execute(count_query)
-        total = count_result.scalar()
-        
-        dashboard[category.lower()] = {
-            "total": total,
-            "recent": [
-                {
-                    "action": log.action,
-                    "description": log.description,
-                    "severity": log.severity,
-                    "timestamp": log.created_at.isoformat()
-                }
-                for log in logs
-            ]
-        }
-    
-    # Get last login
-    last_login_query = select(models.AuditLog).where(
-        models.AuditLog.user_id == current_user.id,
-        models.AuditLog.action == models.AuditAction.LOGIN_SUCCESS
-    ).order_by(models.AuditLog.created_at.desc()).limit(1)
-    
-    last_login_result = await db.execute(last_login_query)
-    last_login = last_login_result.scalars().first()
-    
-    # Get active sessions count
-    session_query = select(func.count(models.UserSession.id)).where(
+    sessions = select(func.count(models.UserSession.id).label("active_sessions")).where(
         models.UserSession.user_id == current_user.id,
         models.UserSession.is_active == True
-    )
-    session_result = await db.execute(session_query)
-    active_sessions = session_result.scalar() or 0
+    ).subquery()
     
-    return {
+    # Sessions LEFT JOIN events, so a user without events still gets one row
+    wanted = (ranked.c.category_rank <= 5) | (
+        (ranked.c.action == models.AuditAction.LOGIN_SUCCESS) & (ranked.c.action_rank == 1)
+    )
+    query = select(sessions.c.active_sessions, ranked).select_from(
+        sessions.outerjoin(ranked, wanted)
+    ).order_by(ranked.c.event_category, ranked.c.category_rank)
+    
+    rows = (await db.execute(query)).all()
+    
+    dashboard = {category.lower(): {"total": 0, "recent": []} for category in categories}
+    last_login = None
+    active_sessions = rows[0].active_sessions if rows else 0
+    for row in rows:
+        if row.event_category is None:
+            continue  # No audit events yet
+        if row.action == models.AuditAction.LOGIN_SUCCESS and row.action_rank == 1:
+            last_login = row
+        if row.category_rank <= 5:
+            entry = dashboard[row.event_category.lower()]
+            entry["total"] = row.category_total
+            entry["recent"].append({
+                "action": row.action,
+                "description": row.description,
+                "severity": row.severity,
+                "timestamp": row.created_at.isoformat()
+            })
+    
+    response = {
         "user_id": str(current_user.id),
         "last_login": last_login.created_at.isoformat() if last_login else None,
         "last_login_location": f"{last_login.location_city}, {last_login.location_country}" if last_login else None,
-        "active_sessions": active_sessions,
+        "active_sessions": active_sessions or 0,
         "categories": dashboard
     }
+    cache.put(current_user.id, response)
+    return response
 
 
 # =====================================================
@@ -2481,11 +2727,12 @@ async def get_loan_agreement(
         interest_rate = prediction.recommended_interest_rate or 12.0
         tenure_months = application.features_json.get("loan_duration", 60)
         
-        # Calculate EMI: P * r * (1+r)^n / ((1+r)^n - 1)
-        monthly_rate = interest_rate / 12 / 100
-        emi = loan_amount * monthly_rate * ((1 + monthly_rate) ** tenure_months) / (((1 + monthly_rate) ** tenure_months) - 1)
+        # EMI and total payable from the same schedule the repayments use
+        import amortization  # numpy; loaded on first use
+        plan = amortization.schedule(loan_amount, interest_rate, tenure_months)
+        emi = float(plan.emi_amount[0])
         processing_fee = loan_amount * 0.02  # 2% processing fee
-        total_payable = emi * tenure_months
+        total_payable = plan.total_payable
         
         agreement_text = f"""
 LOAN AGREEMENT
@@ -2688,8 +2935,12 @@ async def complete_kyc(
     }
 
 @app.get("/loan-application/{application_id}/report")
-async def get_loan_report(application_id: str, db: AsyncSession = Depends(database.get_db)):
-    """Generate and download PDF report for a loan application"""
+async def get_loan_report(application_id: str, request: Request, db: AsyncSession = Depends(database.get_db)):
+    """
+    Generate and download PDF report for a loan application.
+    Served from the report cache when the inputs are unchanged; supports
+    ETag / If-None-Match (304).
+    """
     try:
         # Fetch Application with User details
         query = select(models.LoanApplication).where(models.LoanApplication.id == application_id)
@@ -2715,103 +2966,17 @@ async def get_loan_report(application_id: str, db: AsyncSession = Depends(databa
         if not application.prediction:
             raise HTTPException(status_code=400, detail="Loan analysis not yet completed for this application")
 
-        # Map Prediction DB object to the dictionary format expected by generator
-        # The generator expects: loan_details, decision, approval_probability, interest_rate, emi, explanations
-        
-        pred = application.prediction
-        
-        # Calculate total interest
-        total_interest = (pred.total_repayment or 0) - (application.loan_amount or 0)
-        
-        # Calculate income ratios from real application data
-        monthly_income = application.monthly_income or 50000
-        monthly_debt = application.monthly_debt_payments or 0
-        emi_to_income = (pred.emi / monthly_income * 100) if monthly_income > 0 and pred.emi else 0
-        debt_to_income = ((monthly_debt + (pred.emi or 0)) / monthly_income * 100) if monthly_income > 0 else 0
-        
-        # Calculate credit score using CIBIL-standard weighted factors
-        # This matches the CreditScoreEstimator in loan_advisor.py
-        from loan_advisor import CreditScoreEstimator
-        
-        # Build profile for credit score calculation
-        credit_profile = {
-            'monthly_income': monthly_income,
-            'debt_to_income_ratio': monthly_debt / monthly_income if monthly_income > 0 else 0.5,
-            'employment_status': application.employment_status or 'Employed',
-            'job_tenure': application.job_tenure or 2,
-            'experience': application.experience or 5,
-            'age': application.age or 30,
-            'home_ownership_status': application.home_ownership_status or 'Rent',
-            'education_level': application.education_level or 'Bachelor',
-        }
-        
-        credit_min, credit_max, credit_rating = CreditScoreEstimator.estimate(credit_profile)
-        credit_score = (credit_min + credit_max) // 2  # Use midpoint for display
-        
-        # Helper to safely get nested dicts if stored as such, or reconstruct
-        analysis_result = {
-            "decision": pred.decision,
-            "decision_reason": pred.decision_reason,
-            "approval_probability": pred.approval_probability,
-            "loan_details": {
-                "amount": application.loan_amount,
-                "duration_years": application.loan_duration // 12 if application.loan_duration else 0
-            },
-            "loan_purpose": application.loan_purpose,
-            "interest_rate": {"annual": pred.interest_rate},
-            "emi": {
-                "monthly": pred.emi,
-                "total_repayment": pred.total_repayment,
-                "total_interest": total_interest,
-            },
-            "income_analysis": {
-                "monthly_income": monthly_income,
-                "emi_to_income_ratio": emi_to_income,
-                "debt_to_income_ratio": debt_to_income,
-            },
-            "credit_score": {
-                "score": credit_score,
-                "rating": credit_rating,
-            },
-            "explanations": pred.shap_summary if pred.shap_summary else []
-        }
-        
-        # Create a helper object for User details since generator expects 'application.full_name' etc
-        class AppContext:
-            def __init__(self, app_obj):
-                u = app_obj.user
-                self.full_name = f"{u.first_name} {u.last_name}" if u.first_name else "Valued Customer"
-                self.email = u.email
-                self.mobile_number = u.mobile_number
-                self.id = str(app_obj.id)
-                self.loan_amount = app_obj.loan_amount
-                self.monthly_income = app_obj.monthly_income
-                self.loan_purpose = app_obj.loan_purpose
-                self.employment_status = app_obj.employment_status
-                self.loan_duration = app_obj.loan_duration
-                self.date_of_birth = u.date_of_birth
-                self.gender = u.gender or app_obj.gender
-                self.age = app_obj.age
-                self.address = f"{u.address_line1 or ''}, {u.city or ''}, {u.state or ''} - {u.pincode or ''}" if u.address_line1 else None
-                self.pan_number = u.pan_number
-                self.customer_id = u.customer_id
-                self.kyc_verified = u.kyc_verified
-
-        app_context = AppContext(application)
-        
-        # Generate PDF
-        pdf_bytes = report_generator.generate_loan_report_pdf(app_context, analysis_result)
-        
-        # Return as downloadable file
-        return Response(
-            # Using bytes directly.
-            content=bytes(pdf_bytes),
-            media_type="application/pdf",
-            headers={
-                "Content-Disposition": f"attachment; filename=Loan_Report_{application.user.customer_id}.pdf"
-            }
-        )
+        # Cached artifact, or rendered off the event loop in the report worker pool
+        return await _report_response(request, application, {
+            "Content-Disposition": f"attachment; filename=Loan_Report_{application.user.customer_id}.pdf"
+        })
 
+    except ExecutorSaturated as e:
+        raise _report_busy(e)
+    except report_service.ReportTimeout as e:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Report Generation Error: {e}")
         # traceback
@@ -2824,14 +2989,9 @@ async def get_loan_report(application_id: str, db: AsyncSession = Depends(databa
 # QR CODE & SHAREABLE REPORT ENDPOINTS
 # ============================================================================
 
-import qrcode
 from io import BytesIO
-import secrets
 import hashlib
 
-# Store temporary tokens (in production, use Redis or database)
-report_tokens = {}
-
 @app.get("/loan-application/{application_id}/report-qr")
 async def get_report_qr_code(application_id: str, db: AsyncSession = Depends(database.get_db)):
     """Generate QR code for mobile report download"""
@@ -2844,15 +3004,9 @@ async def get_report_qr_code(application_id: str, db: AsyncSession = Depends(dat
         if not application:
             raise HTTPException(status_code=404, detail="Application not found")
         
-        # Generate secure token for this report (valid for 24 hours)
-        token = secrets.token_urlsafe(32)
-        expiry = datetime.now() + timedelta(hours=24)
-        
-        # Store token with application_id
-        report_tokens[token] = {
-            "application_id": application_id,
-            "expiry": expiry
-        }
+        # Generate secure token for this report (valid for SHARE_TOKEN_TTL_HOURS, default 24),
+        # stored where every worker can resolve it
+        token, expiry = await get_share_token_store().issue(application.id)
         
         # Create shareable URL - Use RENDER_EXTERNAL_URL if available, otherwise fallback to local/detected IP
         backend_base_url = os.getenv("RENDER_EXTERNAL_URL")
@@ -2871,7 +3025,8 @@ async def get_report_qr_code(application_id: str, db: AsyncSession = Depends(dat
         
         shareable_url = f"{backend_base_url}/shared-report/{token}"
         
-        # Generate QR code
+        # Generate QR code (qrcode/PIL load on first use, or during warm-up)
+        import qrcode
         qr = qrcode.QRCode(
             version=1,
             error_correction=qrcode.constants.ERROR_CORRECT_L,
@@ -2906,21 +3061,21 @@ async def get_report_qr_code(application_id: str, db: AsyncSession = Depends(dat
 
 
 @app.get("/shared-report/{token}")
-async def get_shared_report(token: str, db: AsyncSession = Depends(database.get_db)):
+async def get_shared_report(token: str, request: Request, db: AsyncSession = Depends(database.get_db)):
     """Download report using shareable token (no authentication required)"""
     try:
         # Validate token
-        if token not in report_tokens:
+        store = get_share_token_store()
+        shared = await store.resolve(token)
+        if shared is None:
             raise HTTPException(status_code=404, detail="Invalid or expired link")
         
-        token_data = report_tokens[token]
-        
-        # Check expiry
-        if datetime.now() > token_data["expiry"]:
-            del report_tokens[token]
+        # Check expiry (expired tokens not swept yet)
+        if shared.expired:
+            await store.revoke(token)
             raise HTTPException(status_code=410, detail="Link expired")
         
-        application_id = token_data["application_id"]
+        application_id = shared.application_id
         
         # Fetch Application with User details (same logic as regular report)
         from sqlalchemy.orm import selectinload
@@ -2935,104 +3090,24 @@ async def get_shared_report(token: str, db: AsyncSession = Depends(database.get_
         if not application or not application.prediction:
             raise HTTPException(status_code=404, detail="Report not available")
 
-        # Generate report (same logic as regular endpoint)
-        pred = application.prediction
-        
-        total_interest = (pred.total_repayment or 0) - (application.loan_amount or 0)
-        monthly_income = application.monthly_income or 50000
-        monthly_debt = application.monthly_debt_payments or 0
-        emi_to_income = (pred.emi / monthly_income * 100) if monthly_income > 0 and pred.emi else 0
-        debt_to_income = ((monthly_debt + (pred.emi or 0)) / monthly_income * 100) if monthly_income > 0 else 0
-        
-        # Calculate credit score using CIBIL-standard weighted factors
-        # This matches the CreditScoreEstimator in loan_advisor.py
-        from loan_advisor import CreditScoreEstimator
-        
-        # Build profile for credit score calculation
-        credit_profile = {
-            'monthly_income': monthly_income,
-            'debt_to_income_ratio': monthly_debt / monthly_income if monthly_income > 0 else 0.5,
-            'employment_status': application.employment_status or 'Employed',
-            'job_tenure': application.job_tenure or 2,
-            'experience': application.experience or 5,
-            'age': application.age or 30,
-            'home_ownership_status': application.home_ownership_status or 'Rent',
-            'education_level': application.education_level or 'Bachelor',
-        }
-        
-        credit_min, credit_max, credit_rating = CreditScoreEstimator.estimate(credit_profile)
-        credit_score = (credit_min + credit_max) // 2  # Use midpoint for display
-        
-        analysis_result = {
-            "decision": pred.decision,
-            "decision_reason": pred.decision_reason,
-            "approval_probability": pred.approval_probability,
-            "loan_details": {
-                "amount": application.loan_amount,
-                "duration_years": application.loan_duration // 12 if application.loan_duration else 0
-            },
-            "loan_purpose": application.loan_purpose,
-            "interest_rate": {"annual": pred.interest_rate},
-            "emi": {
-                "monthly": pred.emi,
-                "total_repayment": pred.total_repayment,
-                "total_interest": total_interest,
-            },
-            "income_analysis": {
-                "monthly_income": monthly_income,
-                "emi_to_income_ratio": emi_to_income,
-                "debt_to_income_ratio": debt_to_income,
-            },
-            "credit_score": {
-                "score": credit_score,
-                "rating": credit_rating,
-            },
-            "explanations": pred.shap_summary if pred.shap_summary else []
-        }
-        
-        class AppContext:
-            def __init__(self, app_obj):
-                u = app_obj.user
-                self.full_name = f"{u.first_name} {u.last_name}" if u.first_name else "Valued Customer"
-                self.email = u.email
-                self.mobile_number = u.mobile_number
-                self.id = str(app_obj.id)
-                self.loan_amount = app_obj.loan_amount
-                self.monthly_income = app_obj.monthly_income
-                self.loan_purpose = app_obj.loan_purpose
-                self.employment_status = app_obj.employment_status
-                self.loan_duration = app_obj.loan_duration
-                self.date_of_birth = u.date_of_birth
-                self.gender = u.gender or app_obj.gender
-                self.age = app_obj.age
-                self.address = f"{u.address_line1 or ''}, {u.city or ''}, {u.state or ''} - {u.pincode or ''}" if u.address_line1 else None
-                self.pan_number = u.pan_number
-                self.customer_id = u.customer_id
-                self.kyc_verified = u.kyc_verified
-
-        app_context = AppContext(application)
-        
-        # Generate PDF
-        pdf_bytes = report_generator.generate_loan_report_pdf(app_context, analysis_result)
-        
         # Generate filename with timestamp for uniqueness
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"Loan_Report_{application.user.customer_id}_{timestamp}.pdf"
         
-        # Return as downloadable file with mobile-friendly headers
-        return Response(
-            content=bytes(pdf_bytes),
-            media_type="application/pdf",
-            headers={
-                "Content-Disposition": f'attachment; filename="{filename}"',
-                "Content-Type": "application/pdf",
-                "Cache-Control": "no-cache, no-store, must-revalidate",
-                "Pragma": "no-cache",
-                "Expires": "0",
-                "X-Content-Type-Options": "nosniff"
-            }
-        )
+        # Same cached artifact as the regular endpoint, with mobile-friendly headers.
+        # no-cache (not no-store) so browsers revalidate with If-None-Match.
+        return await _report_response(request, application, {
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "Content-Type": "application/pdf",
+            "Pragma": "no-cache",
+            "Expires": "0",
+            "X-Content-Type-Options": "nosniff"
+        })
     
+    except ExecutorSaturated as e:
+        raise _report_busy(e)
+    except report_service.ReportTimeout as e:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
     except HTTPException:
         raise
     except Exception as e:
@@ -0,0 +1,26 @@
+-- One repayment row per (application, installment).
+-- Older lazy schedule generation could insert a schedule twice when two
+-- requests raced; keep one row per installment (PAID first, then oldest).
+
+DELETE FROM repayments
+WHERE id IN (
+    SELECT id FROM (
+        SELECT id,
+               ROW_NUMBER() OVER (
+                   PARTITION BY application_id, emi_number
+                   ORDER BY (payment_status = 'PAID') DESC, created_at, id
+               ) AS rn
+        FROM repayments
+    ) ranked
+    WHERE rn > 1
+);
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint WHERE conname = 'uq_repayments_application_emi'
+    ) THEN
+        ALTER TABLE repayments
+            ADD CONSTRAINT uq_repayments_application_emi UNIQUE (application_id, emi_number);
+    END IF;
+END $$;
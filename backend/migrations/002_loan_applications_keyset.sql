@@ -0,0 +1,5 @@
+-- Keyset pagination for the officer queue (/applications):
+-- ORDER BY created_at DESC, id DESC and seek past (created_at, id).
+
+CREATE INDEX IF NOT EXISTS ix_loan_applications_created_id
+    ON loan_applications (created_at DESC, id DESC);
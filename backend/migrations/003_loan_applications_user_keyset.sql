@@ -0,0 +1,5 @@
+-- Keyset pagination for a customer's own listing (/my-applications):
+-- WHERE user_id = ? ORDER BY created_at DESC, id DESC.
+
+CREATE INDEX IF NOT EXISTS ix_loan_applications_user_created_id
+    ON loan_applications (user_id, created_at DESC, id DESC);
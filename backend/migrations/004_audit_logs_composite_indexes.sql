@@ -0,0 +1,18 @@
+-- migrate: no-transaction
+-- migrate: skip-if SELECT EXISTS (SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid WHERE c.relname = 'audit_logs' AND c.relnamespace = to_regnamespace(current_schema())::oid)
+-- Composite indexes for the /activity/* hot paths. Every query filters one
+-- user's events (optionally by event_category or action) and orders by
+-- created_at DESC, so each becomes a single index range scan.
+-- Built CONCURRENTLY so audit writes are not blocked on a large table.
+-- Skipped when audit_logs is already partitioned: Postgres cannot build
+-- indexes on a partitioned table concurrently, and the partitioned table
+-- already has these indexes (from create_all, or from 005).
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_audit_logs_user_created
+    ON audit_logs (user_id, created_at DESC);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_audit_logs_user_category_created
+    ON audit_logs (user_id, event_category, created_at DESC);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_audit_logs_user_action_created
+    ON audit_logs (user_id, action, created_at DESC);
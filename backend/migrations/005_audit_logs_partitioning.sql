@@ -0,0 +1,60 @@
+-- Convert audit_logs into a table partitioned by month on created_at.
+-- Rows are copied into monthly partitions (audit_logs_yYYYYmMM) covering the
+-- existing history up to three months ahead; audit_partitions.py keeps
+-- creating future months and archives old ones.
+-- Runs in one transaction: audit writes wait until the copy is done.
+
+DO $$
+DECLARE
+    first_month DATE;
+    last_month DATE := (date_trunc('month', now()) + interval '3 months')::date;
+    month DATE;
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid
+        WHERE c.relname = 'audit_logs' AND c.relnamespace = to_regnamespace(current_schema())::oid
+    ) THEN
+        RETURN;  -- already partitioned
+    END IF;
+
+    ALTER TABLE audit_logs RENAME TO audit_logs_legacy;
+
+    UPDATE audit_logs_legacy SET created_at = now() WHERE created_at IS NULL;
+
+    CREATE TABLE audit_logs (LIKE audit_logs_legacy INCLUDING DEFAULTS)
+        PARTITION BY RANGE (created_at);
+    ALTER TABLE audit_logs ALTER COLUMN created_at SET NOT NULL;
+
+    CREATE TABLE audit_logs_default PARTITION OF audit_logs DEFAULT;
+
+    SELECT COALESCE(date_trunc('month', min(created_at))::date, date_trunc('month', now())::date)
+        INTO first_month FROM audit_logs_legacy;
+    month := first_month;
+    WHILE month <= last_month LOOP
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF audit_logs FOR VALUES FROM (%L) TO (%L)',
+            'audit_logs_y' || to_char(month, 'YYYY') || 'm' || to_char(month, 'MM'),
+            month, (month + interval '1 month')::date
+        );
+        month := (month + interval '1 month')::date;
+    END LOOP;
+
+    INSERT INTO audit_logs SELECT * FROM audit_logs_legacy;
+
+    -- Frees the legacy index and constraint names for the new table
+    DROP TABLE audit_logs_legacy;
+
+    ALTER TABLE audit_logs ADD CONSTRAINT audit_logs_pkey PRIMARY KEY (id, created_at);
+    ALTER TABLE audit_logs ADD CONSTRAINT audit_logs_user_id_fkey
+        FOREIGN KEY (user_id) REFERENCES users (id);
+
+    CREATE INDEX ix_audit_logs_id ON audit_logs (id);
+    CREATE INDEX ix_audit_logs_user_id ON audit_logs (user_id);
+    CREATE INDEX ix_audit_logs_action ON audit_logs (action);
+    CREATE INDEX ix_audit_logs_event_category ON audit_logs (event_category);
+    CREATE INDEX ix_audit_logs_session_id ON audit_logs (session_id);
+    CREATE INDEX ix_audit_logs_created_at ON audit_logs (created_at);
+    CREATE INDEX ix_audit_logs_user_created ON audit_logs (user_id, created_at DESC);
+    CREATE INDEX ix_audit_logs_user_category_created ON audit_logs (user_id, event_category, created_at DESC);
+    CREATE INDEX ix_audit_logs_user_action_created ON audit_logs (user_id, action, created_at DESC);
+END $$;
@@ -0,0 +1,183 @@
+"""
+Model Registry - single shared copy of the ML artifacts per process.
+
+loan_model.joblib and loan_encoders.joblib are loaded exactly once and
+handed to every service (LoanAdvisor, LoanPredictor) as a ModelBundle,
+together with version metadata for audit/persistence.
+
+Under gunicorn with preload_app (see gunicorn.conf.py) the master process
+calls preload() before forking, so all workers share the booster, encoders
+and SHAP explainer pages copy-on-write instead of holding private copies.
+"""
+
+import gc
+import hashlib
+import os
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+BASE_DIR = os.path.dirname(__file__)
+MODEL_PATH = os.getenv("MODEL_PATH", os.path.join(BASE_DIR, "loan_model.joblib"))
+ENCODER_PATH = os.getenv("ENCODER_PATH", os.path.join(BASE_DIR, "loan_encoders.joblib"))
+MODEL_VERSION = os.getenv("MODEL_VERSION", "xgboost_v1.0")
+
+
+def _file_sha256(path: str) -> Optional[str]:
+    """Content hash of an artifact, so deployments can tell models apart"""
+    try:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+    except OSError:
+        return None
+
+
+class ModelBundle:
+    """Loaded model + preprocessing artifacts shared across services"""
+
+    def __init__(self, model_path: str = MODEL_PATH, encoder_path: str = ENCODER_PATH, version: str = MODEL_VERSION):
+        self.version = version
+        self.model_path = model_path
+        self.encoder_path = encoder_path
+        self.model = None
+        self.feature_names: List[str] = []
+        self.ohe = None
+        self.scaler = None
+        self.cat_columns: List[str] = []
+        self.num_columns: List[str] = []
+        self.encoder = None  # FeatureEncoder
+        self.model_sha256 = None
+        self.encoder_sha256 = None
+        self.loaded_at = datetime.utcnow().isoformat()
+        self._shap_explainer = None
+        self._shap_loaded = False
+        self._shap_lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        # joblib/numpy are only needed once the model loads; keeps them off the API's import path
+        import joblib
+        from feature_encoder import FeatureEncoder
+
+        try:
+            if os.path.exists(self.model_path):
+                model_data = joblib.load(self.model_path)
+                self.model = model_data['model']
+                self.feature_names = list(model_data.get('feature_names', []))
+                self.model_sha256 = _file_sha256(self.model_path)
+                print(f"[ModelRegistry] Model loaded ({self.version}, {len(self.feature_names)} features)")
+            else:
+                print(f"[ModelRegistry] Model file not found: {self.model_path}")
+
+            if os.path.exists(self.encoder_path):
+                encoder_data = joblib.load(self.encoder_path)
+                self.ohe = encoder_data['ohe']
+                self.scaler = encoder_data['scaler']
+                self.cat_columns = list(encoder_data['cat_columns'])
+                self.num_columns = list(encoder_data['num_columns'])
+                self.encoder = FeatureEncoder.from_artifacts(encoder_data, self.feature_names)
+                self.encoder_sha256 = _file_sha256(self.encoder_path)
+                print(f"[ModelRegistry] Encoders loaded")
+            else:
+                print(f"[ModelRegistry] Encoder file not found: {self.encoder_path}")
+        except Exception as e:
+            print(f"[ModelRegistry] Error loading model artifacts: {e}")
+            self.model = None
+            self.encoder = None
+
+    @property
+    def ready(self) -> bool:
+        return self.model is not None and self.encoder is not None
+
+    @property
+    def shap_explainer(self):
+        """SHAP TreeExplainer, built on first use (None if shap is unavailable)"""
+        if not self._shap_loaded:
+            with self._shap_lock:
+                if not self._shap_loaded:
+                    if self.model is not None:
+                        try:
+                            import shap
+                            self._shap_explainer = shap.TreeExplainer(self.model)
+                            print("[ModelRegistry] SHAP TreeExplainer ready")
+                        except Exception as e:
+                            print(f"[ModelRegistry] SHAP unavailable: {e}")
+                    self._shap_loaded = True
+        return self._shap_explainer
+
+    def metadata(self) -> Dict[str, Any]:
+        return {
+            "model_version": self.version,
+            "model_sha256": self.model_sha256,
+            "encoder_sha256": self.encoder_sha256,
+            "loaded_at": self.loaded_at,
+            "n_features": len(self.feature_names),
+            "model_loaded": self.model is not None,
+            "encoders_loaded": self.encoder is not None,
+        }
+
+
+# Singleton bundle
+_bundle = None
+_bundle_lock = threading.Lock()
+_reload_listeners: List[Callable[[ModelBundle], None]] = []
+
+
+def get_model_bundle() -> ModelBundle:
+    """Get or load the shared model bundle"""
+    global _bundle
+    if _bundle is None:
+        with _bundle_lock:
+            if _bundle is None:
+                _bundle = ModelBundle()
+    return _bundle
+
+
+def current_version() -> str:
+    """Version of the loaded bundle (without forcing a load)"""
+    return _bundle.version if _bundle is not None else MODEL_VERSION
+
+
+def on_reload(callback: Callable[[ModelBundle], None]):
+    """Register a callback run with the new bundle after reload_model_bundle()"""
+    _reload_listeners.append(callback)
+
+
+def reload_model_bundle() -> ModelBundle:
+    """
+    Re-read the artifacts from disk (e.g. after a model deploy) and notify
+    listeners so services re-attach and caches drop stale predictions.
+    """
+    global _bundle
+    bundle = ModelBundle()
+    with _bundle_lock:
+        _bundle = bundle
+    for callback in list(_reload_listeners):
+        try:
+            callback(bundle)
+        except Exception as e:
+            print(f"[ModelRegistry] Reload listener failed: {e}")
+    print(f"[ModelRegistry] Reloaded {bundle.version}")
+    return bundle
+
+
+def preload():
+    """
+    Load everything up front in the gunicorn master, before workers fork.
+
+    gc.freeze() moves the loaded objects into the permanent generation so
+    worker garbage collections don't touch them, which would otherwise
+    dirty the shared pages and defeat copy-on-write.
+    """
+    from explanation_engine import EXPLANATION_BACKEND
+
+    bundle = get_model_bundle()
+    if EXPLANATION_BACKEND == "shap":
+        bundle.shap_explainer
+    gc.collect()
+    gc.freeze()
+    print(f"[ModelRegistry] Preloaded {bundle.version} (frozen {gc.get_freeze_count()} objects)")
+    return bundle
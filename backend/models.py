@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, Boolean, DateTime, Date, Text, Float, Integer, ForeignKey, func
+from sqlalchemy import Column, String, Boolean, DateTime, Date, Text, Float, Integer, ForeignKey, UniqueConstraint, Index, func
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from database import Base
@@ -100,6 +100,12 @@ class LoanApplication(Base):
     # Metadata
     created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     
+    __table_args__ = (
+        # Keyset pagination: newest first, id as tie-breaker (as in migrations/002 and 003)
+        Index("ix_loan_applications_created_id", created_at.desc(), id.desc()),
+        Index("ix_loan_applications_user_created_id", user_id, created_at.desc(), id.desc()),
+    )
+    
     # Relationships
     user = relationship("User", back_populates="loan_applications")
     prediction = relationship("LoanPrediction", back_populates="application", uselist=False)
@@ -205,6 +211,10 @@ class Repayment(Base):
     Tracks each EMI payment status.
     """
     __tablename__ = "repayments"
+    __table_args__ = (
+        # One row per installment - makes schedule creation idempotent
+        UniqueConstraint("application_id", "emi_number", name="uq_repayments_application_emi"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
     application_id = Column(UUID(as_uuid=True), ForeignKey("loan_applications.id"), nullable=False, index=True)
@@ -389,8 +399,19 @@ class AuditLog(Base):
     ip_address = Column(String(50), nullable=True)  # Masked IP for display
     user_agent = Column(String(500), nullable=True)
     
-    # Immutable timestamp
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    # Immutable timestamp - also the partition key, hence part of the primary key
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, primary_key=True, index=True)
+    
+    # Hot paths: one user's events, optionally per category/action, newest first
+    __table_args__ = (
+        Index("ix_audit_logs_user_created", user_id, created_at.desc()),
+        Index("ix_audit_logs_user_category_created", user_id, event_category, created_at.desc()),
+        Index("ix_audit_logs_user_action_created", user_id, action, created_at.desc()),
+        # Monthly partitions on Postgres, see audit_partitions.py
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+    # Events are still identified by id alone
+    __mapper_args__ = {"primary_key": [id]}
     
     # Relationships
     user = relationship("User", backref="audit_logs")
@@ -434,6 +455,20 @@ class UserSession(Base):
     user = relationship("User", backref="sessions")
 
 
+class ReportShareToken(Base):
+    """
+    Shareable report links (QR codes) - see share_tokens.py.
+    Only the sha256 of the token is stored; the link itself is the secret.
+    Expired rows are deleted by a periodic sweeper via the expires_at index.
+    """
+    __tablename__ = "report_share_tokens"
+
+    token_hash = Column(String(64), primary_key=True)
+    application_id = Column(UUID(as_uuid=True), ForeignKey("loan_applications.id", ondelete="CASCADE"), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+
 # =============================================================================
 # EVENT CATEGORIES
 # =============================================================================
@@ -0,0 +1,75 @@
+"""
+Keyset (cursor) pagination for newest-first listings.
+
+Pages are ordered by (created_at DESC, id DESC). The next page starts
+strictly after the last row of the current one, so the database seeks
+through the (created_at, id) index instead of counting past OFFSET rows.
+Inserts between requests do not shift or repeat rows.
+
+Cursors are opaque to clients: url-safe base64 of the last row's
+created_at and id. List endpoints return the next cursor in the
+X-Next-Cursor response header (absent on the last page) and X-Has-More
+("true"/"false"). One look-ahead row decides has-more; nothing is counted.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException, Response
+from sqlalchemy import and_, or_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+HAS_MORE_HEADER = "X-Has-More"
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(created_at: datetime, row_id: UUID) -> str:
+    payload = json.dumps([created_at.isoformat(), str(row_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """Cursor -> (created_at, id); malformed cursors are a 400"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), UUID(row_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+
+def after_cursor(query, created_column, id_column, cursor: Optional[str]):
+    """Restrict a newest-first query to rows after the cursor"""
+    if not cursor:
+        return query
+    created_at, row_id = decode_cursor(cursor)
+    return query.where(or_(
+        created_column < created_at,
+        and_(created_column == created_at, id_column < row_id)
+    ))
+
+
+def newest_first(query, created_column, id_column, limit: int):
+    """Order newest-first and fetch one extra row to detect a next page"""
+    return query.order_by(created_column.desc(), id_column.desc()).limit(limit + 1)
+
+
+def page_size(limit: Optional[int], default: int = DEFAULT_PAGE_SIZE, maximum: int = MAX_PAGE_SIZE) -> int:
+    if limit is None:
+        return default
+    return max(1, min(limit, maximum))
+
+
+def finish_page(rows: list, limit: int, response: Response, key=lambda row: (row.created_at, row.id)) -> list:
+    """Trim the look-ahead row; set X-Has-More, and X-Next-Cursor when more rows exist"""
+    has_more = len(rows) > limit
+    response.headers[HAS_MORE_HEADER] = "true" if has_more else "false"
+    if has_more:
+        rows = rows[:limit]
+        created_at, row_id = key(rows[-1])
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(created_at, row_id)
+    return rows
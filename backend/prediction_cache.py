@@ -0,0 +1,121 @@
+"""
+Content-addressed cache for LoanAdvisor results.
+
+The frontend re-sends identical /loan-advisor payloads as users move
+sliders back and forth. Results are a pure function of the normalized
+applicant profile (LoanAdvisor._build_profile) and the model, so they are
+cached under sha256(canonical profile JSON + model version).
+
+- LRU with a size limit (PREDICTION_CACHE_SIZE, default 2048 entries)
+- TTL per entry (PREDICTION_CACHE_TTL seconds, default 600)
+- Hit/miss/eviction counters
+- Cleared whenever the model registry reloads
+
+application_date is never served from cache; it is re-stamped on every hit.
+"""
+
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from model_registry import current_version, on_reload
+
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "2048"))
+PREDICTION_CACHE_TTL = float(os.getenv("PREDICTION_CACHE_TTL", "600"))
+
+
+class PredictionCache:
+    """Thread-safe LRU + TTL cache of analysis results"""
+
+    def __init__(self, max_entries: int = PREDICTION_CACHE_SIZE, ttl_seconds: float = PREDICTION_CACHE_TTL):
+        self.max_entries = max(0, max_entries)
+        self.ttl = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        # Bumped on clear() so results computed before an invalidation but
+        # stored after it land under keys nobody looks up any more
+        self._generation = 0
+
+    def make_key(self, user_input: Dict[str, Any]) -> str:
+        """Canonical hash of the normalized profile + model version"""
+        from loan_advisor import LoanAdvisor  # Imported on first use: pulls in the model stack
+
+        profile = LoanAdvisor._build_profile(user_input)
+        canonical = json.dumps(profile, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(f"{current_version()}|{self._generation}|{canonical}".encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, result = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+        # Callers may mutate their copy; application_date is always fresh
+        fresh = copy.deepcopy(result)
+        fresh["application_date"] = datetime.now().isoformat()
+        return fresh
+
+    def put(self, key: str, result: Dict[str, Any]):
+        if self.max_entries == 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, copy.deepcopy(result))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+            self.invalidations += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+# Singleton instance
+_cache = None
+
+
+def get_prediction_cache() -> PredictionCache:
+    """Get or create the prediction cache"""
+    global _cache
+    if _cache is None:
+        _cache = PredictionCache()
+        # Stale predictions must not survive a model reload
+        on_reload(lambda bundle: _cache.clear())
+    return _cache
@@ -0,0 +1,102 @@
+"""
+Repayment Service - creates EMI schedules in the repayments table.
+
+A schedule is written with one bulk INSERT ... ON CONFLICT DO NOTHING
+RETURNING statement instead of one ORM object per installment. The unique
+constraint on (application_id, emi_number) makes this idempotent. When two
+requests race on the first view of a schedule, the loser inserts nothing
+and reads back the winner's rows.
+
+Approved applications get their schedule eagerly, from a background task
+scheduled by /loan-application, so the GET normally finds it already there.
+"""
+
+from datetime import date
+from typing import List
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+import database
+import models
+
+
+def generate_emi_schedule(
+    loan_amount: float,
+    interest_rate: float,
+    tenure_months: int,
+    start_date: date
+) -> List[dict]:
+    """Generate complete EMI schedule with amortization (monthly due dates from start_date)"""
+    import amortization  # numpy; loaded on first use, or by the warm-up
+
+    return amortization.schedule(loan_amount, interest_rate, tenure_months, start_date).to_rows()
+
+
+def _insert_ignoring_duplicates(db: AsyncSession, rows: List[dict]):
+    """Dialect-specific bulk INSERT that skips rows already present"""
+    if db.get_bind().dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy.dialects.postgresql import insert
+    return insert(models.Repayment).values(rows).on_conflict_do_nothing(
+        index_elements=["application_id", "emi_number"]
+    )
+
+
+async def load_schedule(db: AsyncSession, application_id) -> List[models.Repayment]:
+    result = await db.execute(
+        select(models.Repayment)
+        .where(models.Repayment.application_id == application_id)
+        .order_by(models.Repayment.emi_number)
+    )
+    return list(result.scalars().all())
+
+
+async def ensure_schedule(
+    db: AsyncSession,
+    application: models.LoanApplication,
+    interest_rate: float
+) -> List[models.Repayment]:
+    """
+    Return the application's schedule, creating it first if needed.
+    Safe to call concurrently for the same application.
+    """
+    existing = await load_schedule(db, application.id)
+    if existing:
+        return existing
+
+    schedule = generate_emi_schedule(
+        application.loan_amount,
+        interest_rate,
+        application.loan_duration,
+        application.created_at.date()
+    )
+    rows = [{**emi_data, "application_id": application.id, "payment_status": "DUE"} for emi_data in schedule]
+
+    result = await db.scalars(
+        _insert_ignoring_duplicates(db, rows).returning(models.Repayment),
+        execution_options={"populate_existing": True}
+    )
+    inserted = sorted(result.all(), key=lambda repayment: repayment.emi_number)
+    await db.commit()
+
+    if len(inserted) == len(rows):
+        return inserted
+    # Another request created (part of) the schedule first
+    return await load_schedule(db, application.id)
+
+
+async def ensure_schedule_in_background(application_id):
+    """BackgroundTasks entry point: own session, errors only logged"""
+    try:
+        async with database.AsyncSessionLocal() as db:
+            application = await db.get(models.LoanApplication, application_id)
+            prediction = (await db.execute(
+                select(models.LoanPrediction).where(models.LoanPrediction.application_id == application_id)
+            )).scalars().first()
+            if application is None or prediction is None or prediction.decision != "APPROVED":
+                return
+            await ensure_schedule(db, application, prediction.interest_rate)
+    except Exception as e:
+        print(f"[RepaymentService] Schedule generation failed for {application_id}: {e}")
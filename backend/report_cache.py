@@ -0,0 +1,254 @@
+"""
+Report Cache - content-addressed store of rendered loan report PDFs.
+
+A report is fully determined by its inputs: the ReportContext (application
+and user profile fields) and the analysis dict built from the immutable
+LoanPrediction. The cache key is the sha256 of those inputs plus the
+template version, a hash of the report template's source files. Any change
+to the profile, the application or the template gives a new key, so a
+stale PDF is never served. The report prints no clock time: its dates come
+from the application and prediction (ReportContext), its Report ID from
+the key.
+
+- Artifacts are files in REPORT_CACHE_DIR named <user_id>.<key>.pdf, so
+  all workers on the host share them and they survive restarts.
+- The key doubles as the ETag. A request whose If-None-Match matches
+  gets a 304 without touching the disk or the renderer.
+- Eviction is LRU by bytes. Once REPORT_CACHE_MAX_BYTES (default 256 MB)
+  is exceeded, the least recently served files are deleted. Recency is
+  the file mtime, bumped on every hit, so workers agree on it.
+- invalidate_user() deletes a user's artifacts when their profile
+  changes. This frees the space early; the new inputs would miss anyway.
+- Concurrent misses for the same key share one render.
+"""
+
+import asyncio
+import glob
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+REPORT_CACHE_DIR = os.getenv(
+    "REPORT_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "report_cache")
+)
+REPORT_CACHE_MAX_BYTES = int(os.getenv("REPORT_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+
+# Source files that define the report layout
+TEMPLATE_FILES = ("report_generator.py", "report_charts.py")
+
+
+@lru_cache(maxsize=1)
+def template_version() -> str:
+    """Hash of the template sources (read, not imported: the API process never loads the generator)"""
+    digest = hashlib.sha256()
+    base = os.path.dirname(os.path.abspath(__file__))
+    for name in TEMPLATE_FILES:
+        with open(os.path.join(base, name), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def report_key(context, analysis_result: Dict[str, Any]) -> str:
+    """sha256 over the template version and every input the generator reads"""
+    payload = json.dumps(
+        {"template": template_version(), "context": vars(context), "analysis": analysis_result},
+        sort_keys=True, default=str, separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def report_id(key: str) -> str:
+    """Report ID printed in the PDF footer: the same inputs always get the same ID"""
+    return f"RPT-{key[:16].upper()}"
+
+
+def etag_for(key: str) -> str:
+    return f'"{key}"'
+
+
+def etag_matches(if_none_match: Optional[str], key: str) -> bool:
+    """If-None-Match check (list of tags, weak prefixes and * allowed)"""
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag_for(key):
+            return True
+    return False
+
+
+class ReportCache:
+    """On-disk LRU of report PDFs within a byte budget"""
+
+    def __init__(self, directory: str = REPORT_CACHE_DIR, max_bytes: int = REPORT_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max(0, max_bytes)
+        # key -> (path, size), least recently used first
+        self._entries: "OrderedDict[str, Tuple[str, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._rendering: Dict[str, asyncio.Future] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._load()
+
+    def _load(self):
+        """Index artifacts already on disk, oldest mtime first"""
+        if not os.path.isdir(self.directory):
+            return
+        files = []
+        for path in glob.glob(os.path.join(self.directory, "*.pdf")):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, path, stat.st_size))
+        for _, path, size in sorted(files):
+            self._entries[self._key_of(path)] = (path, size)
+            self._bytes += size
+
+    @staticmethod
+    def _key_of(path: str) -> str:
+        return os.path.basename(path).rsplit(".", 2)[1]
+
+    def _path(self, user_id, key: str) -> str:
+        return os.path.join(self.directory, f"{user_id}.{key}.pdf")
+
+    def get(self, user_id, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        # Not indexed here, but another worker may have rendered it
+        path = entry[0] if entry is not None else self._path(user_id, key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            # Never rendered, or evicted by another worker
+            self._forget(key)
+            return None
+        if entry is None:
+            with self._lock:
+                if key not in self._entries:
+                    self._entries[key] = (path, len(data))
+                    self._bytes += len(data)
+        return data
+
+    def put(self, user_id, key: str, data: bytes):
+        if len(data) > self.max_bytes:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(user_id, key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (path, len(data))
+            self._bytes += len(data)
+            victims = []
+            while self._bytes > self.max_bytes and self._entries:
+                victim_key, (victim_path, victim_size) = self._entries.popitem(last=False)
+                self._bytes -= victim_size
+                victims.append(victim_path)
+            self.evictions += len(victims)
+        for victim_path in victims:
+            self._remove(victim_path)
+
+    def _forget(self, key: str):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry[1]
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def invalidate_user(self, user_id):
+        """Drop every artifact of one user (profile changed)"""
+        for path in glob.glob(os.path.join(self.directory, f"{user_id}.*.pdf")):
+            self._forget(self._key_of(path))
+            self._remove(path)
+            with self._lock:
+                self.invalidations += 1
+
+    async def get_or_render(
+        self,
+        user_id,
+        key: str,
+        render: Callable[[], Awaitable[bytes]]
+    ) -> bytes:
+        """Cached bytes, or render once (concurrent misses for the key wait on the same render)"""
+        data = self.get(user_id, key)
+        if data is not None:
+            with self._lock:
+                self.hits += 1
+            return data
+
+        pending = self._rendering.get(key)
+        if pending is not None:
+            with self._lock:
+                self.hits += 1
+            return await asyncio.shield(pending)
+
+        with self._lock:
+            self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._rendering[key] = future
+        try:
+            data = await render()
+            self.put(user_id, key, data)
+            future.set_result(data)
+            return data
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so a failure nobody else awaited is not logged
+            future.exception()
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            self._rendering.pop(key, None)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+# Singleton instance
+_cache = None
+
+
+def get_report_cache() -> ReportCache:
+    """Get or create the report artifact cache"""
+    global _cache
+    if _cache is None:
+        _cache = ReportCache()
+    return _cache
@@ -0,0 +1,548 @@
+"""
+Report Charts - the loan report's charts, drawn straight onto the FPDF page.
+
+The report used to build every chart as a matplotlib figure, rasterize it
+to PNG at 100-150 dpi and embed the image. That was most of the render
+time and most of the PDF's size. Gauges, pies, bars and radars are only
+arcs, polygons and rects, so they are now drawn with FPDF's own vector
+primitives: no matplotlib, no rasterizing, a few KB of path operators per
+chart, and sharp at any zoom.
+
+Every chart is drawn into a box (x, y, w, h in mm) on the current page:
+- approval_gauge(pdf, x, y, w, h, probability, decision)
+- credit_score_gauge(pdf, x, y, w, h, score)
+- loan_breakdown_pie(pdf, x, y, w, h, principal, interest)
+- emi_schedule_chart(pdf, x, y, w, h, principal, annual_rate, duration_months)
+- risk_radar_chart(pdf, x, y, w, h, analysis_result)
+
+REPORT_CHART_BACKEND=png keeps the matplotlib PNGs (requires matplotlib;
+falls back to vector without it). In that mode the gauges are memoized
+per bucket - probability to 0.1%, score to the point, i.e. exactly what
+the gauge prints - so a repeated gauge is rasterized once per worker
+(CHART_PNG_CACHE_SIZE entries per gauge). Per-applicant charts (pie,
+schedule, radar) are rasterized each time.
+
+Drawing state (colors, fonts, line width, cursor) is restored after each
+chart. Invalid inputs raise ValueError; the report skips that chart.
+"""
+
+import io
+import math
+import os
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Dict, List, Sequence, Tuple
+
+import amortization
+
+REPORT_CHART_BACKEND = os.getenv("REPORT_CHART_BACKEND", "vector").lower()
+CHART_PNG_CACHE_SIZE = int(os.getenv("CHART_PNG_CACHE_SIZE", "1024"))
+
+Color = Tuple[int, int, int]
+
+NAVY = (0, 51, 102)
+BLUE = (59, 130, 246)
+DARK_BLUE = (30, 64, 175)
+AMBER = (245, 158, 11)
+GREEN = (22, 163, 74)
+YELLOW = (234, 179, 8)
+RED = (220, 38, 38)
+TRACK = (211, 211, 211)
+TEXT = (55, 65, 81)
+MUTED = (107, 114, 128)
+BLACK = (0, 0, 0)
+
+PT = 25.4 / 72  # mm per point
+
+RISK_CATEGORIES = ['Credit\nScore', 'Income\nStability', 'Debt\nBurden',
+                   'EMI\nAffordability', 'Overall\nRisk']
+CREDIT_SEGMENTS = [
+    (300, 550, RED),      # Poor
+    (550, 650, AMBER),    # Fair
+    (650, 750, YELLOW),   # Good
+    (750, 900, GREEN),    # Excellent
+]
+
+
+# ----------------------------------------------------------------------------
+# Shared chart data
+# ----------------------------------------------------------------------------
+
+def approval_color(probability: float) -> Color:
+    if probability >= 70:
+        return GREEN
+    if probability >= 40:
+        return YELLOW
+    return RED
+
+
+def credit_color(score: float) -> Color:
+    if score >= 750:
+        return GREEN
+    if score >= 650:
+        return YELLOW
+    if score >= 550:
+        return AMBER
+    return RED
+
+
+def risk_scores(analysis_result: Dict[str, Any]) -> List[float]:
+    """Radar values on a 0-100 scale (higher is better), in RISK_CATEGORIES order"""
+    income_analysis = analysis_result.get('income_analysis', {})
+    credit_score = analysis_result.get('credit_score', {}).get('score', 700)
+    probability = analysis_result.get('approval_probability', 0)
+
+    monthly_income = income_analysis.get('monthly_income', 0)
+    debt_ratio = income_analysis.get('debt_to_income_ratio', 30)
+    emi_ratio = income_analysis.get('emi_to_income_ratio', 30)
+
+    return [
+        min(100, max(0, (credit_score - 300) / 6)),  # Credit score: 300-900 -> 0-100
+        min(100, max(0, (monthly_income / 1000))),  # Income: Rs.100k = 100 points
+        max(0, min(100, 100 - debt_ratio)),  # Debt burden: lower is better
+        max(0, min(100, 100 - emi_ratio)),  # EMI affordability: lower is better
+        min(100, max(0, probability))  # Overall approval probability
+    ]
+
+
+def emi_split(principal: float, annual_rate: float, duration_months: int):
+    """Principal/interest per installment for the first 5 years"""
+    months = min(duration_months, 60)
+    plan = amortization.schedule(principal, annual_rate, duration_months)
+    return plan.principal_component[:months], plan.interest_component[:months]
+
+
+# ----------------------------------------------------------------------------
+# Vector primitives
+# ----------------------------------------------------------------------------
+
+def _tint(color: Color, alpha: float) -> Color:
+    """color at alpha over white (the page), without a transparency group"""
+    return tuple(round(255 - (255 - c) * alpha) for c in color)
+
+
+def _point(cx: float, cy: float, r: float, theta: float) -> Tuple[float, float]:
+    """Polar -> page coordinates (theta counter-clockwise from 3 o'clock; page y grows down)"""
+    return cx + r * math.cos(theta), cy - r * math.sin(theta)
+
+
+def _arc_points(cx, cy, r, start, end) -> List[Tuple[float, float]]:
+    steps = max(2, int(abs(end - start) / math.radians(3)) + 1)
+    return [_point(cx, cy, r, start + (end - start) * i / steps) for i in range(steps + 1)]
+
+
+def _dot(pdf, cx, cy, r, color: Color):
+    pdf.set_fill_color(*color)
+    pdf.ellipse(cx - r, cy - r, 2 * r, 2 * r, style='F')
+
+
+def _band(pdf, cx, cy, r, width, start, end, color: Color):
+    """Thick arc with round caps (matplotlib's wide line with solid_capstyle='round')"""
+    if abs(end - start) > 1e-6:
+        outer = _arc_points(cx, cy, r + width / 2, start, end)
+        inner = _arc_points(cx, cy, r - width / 2, end, start)
+        pdf.set_fill_color(*color)
+        pdf.polygon(outer + inner, style='F')
+    for theta in (start, end):
+        _dot(pdf, *_point(cx, cy, r, theta), width / 2, color)
+
+
+def _sector(pdf, cx, cy, r, start, end, color: Color):
+    pdf.set_fill_color(*color)
+    pdf.polygon([(cx, cy)] + _arc_points(cx, cy, r, start, end), style='F')
+
+
+def _label(pdf, x, y, text: str, size: float, color: Color = TEXT, style: str = '', align: str = 'C'):
+    """Text (\\n for line breaks) centred vertically on y; align C, L or R around x"""
+    pdf.set_font('Arial', style, size)
+    pdf.set_text_color(*color)
+    lines = text.split('\n')
+    leading = size * PT * 1.15
+    baseline = y - leading * (len(lines) - 1) / 2 + size * PT * 0.35
+    for index, line in enumerate(lines):
+        width = pdf.get_string_width(line)
+        left = x - width / 2 if align == 'C' else x - width if align == 'R' else x
+        pdf.text(left, baseline + index * leading, line)
+
+
+@contextmanager
+def _canvas(pdf):
+    """Draw without leaking colors, fonts, line width or the cursor into the report"""
+    x, y = pdf.get_x(), pdf.get_y()
+    with pdf.local_context():
+        yield
+    pdf.set_xy(x, y)
+
+
+# ----------------------------------------------------------------------------
+# Vector charts
+# ----------------------------------------------------------------------------
+
+def _gauge_dial(pdf, cx, cy, r, width, fraction, color: Color, ticks: Sequence[str], bands=()):
+    """Semicircle track (with optional tinted (start, end, color) bands), value arc from the left, needle and tick labels"""
+    _band(pdf, cx, cy, r, width, math.pi, 0, TRACK)
+    for start, end, band_color in bands:
+        _band(pdf, cx, cy, r, width, math.pi * (1 - start), math.pi * (1 - end), band_color)
+    needle = math.pi * (1 - min(1, max(0, fraction)))
+    _band(pdf, cx, cy, r, width, math.pi, needle, color)
+
+    tip = _point(cx, cy, r, needle)
+    pdf.set_draw_color(*BLACK)
+    pdf.set_line_width(0.5)
+    pdf.line(cx, cy, *tip)
+    _dot(pdf, *tip, 1.6, BLACK)
+
+    for index, tick in enumerate(ticks):
+        theta = math.pi * (1 - index / (len(ticks) - 1))
+        _label(pdf, *_point(cx, cy, r + width / 2 + 5, theta), tick, 9)
+
+
+def _vector_approval_gauge(pdf, x, y, w, h, probability, decision):
+    color = approval_color(probability)
+    cx, cy = x + w / 2, y + h * 0.8
+    r = min(w / 2, h * 0.8) * 0.72
+    _gauge_dial(pdf, cx, cy, r, 10, probability / 100, color, ['0%', '25%', '50%', '75%', '100%'])
+    _label(pdf, cx, cy - r * 0.42, f'{probability:.1f}%', 28, color, 'B')
+    _label(pdf, cx, cy - r * 0.14, str(decision), 12)
+
+
+def _vector_credit_score_gauge(pdf, x, y, w, h, score):
+    cx, cy = x + w / 2, y + h * 0.85
+    r = min(w / 2, h * 0.85) * 0.72
+    bands = [((start - 300) / 600, (end - 300) / 600, _tint(color, 0.3)) for start, end, color in CREDIT_SEGMENTS]
+    _gauge_dial(pdf, cx, cy, r, 7, (score - 300) / 600, credit_color(score),
+                ['300', '450', '600', '750', '900'], bands)
+    _label(pdf, cx, cy - r * 0.4, str(score), 26, credit_color(score), 'B')
+    _label(pdf, cx, cy - r * 0.12, 'Credit Score', 11)
+
+
+def _vector_loan_breakdown_pie(pdf, x, y, w, h, principal, interest):
+    total = principal + interest
+    if total <= 0 or principal < 0 or interest < 0:
+        raise ValueError("Pie chart needs a positive total")
+
+    _label(pdf, x + w / 2, y + 4, 'Loan Cost Distribution', 15, NAVY, 'B')
+    cx, cy = x + w / 2, y + h / 2 + 5
+    r = min(w, h) * 0.3
+    slices = [
+        (principal, f'Principal\nRs.{principal:,.0f}', BLUE),
+        (interest, f'Interest\nRs.{interest:,.0f}', AMBER),
+    ]
+
+    # Start at 12 o'clock and go counter-clockwise, each slice pulled out by 8% of r
+    start = math.pi / 2
+    for value, text, color in slices:
+        end = start + 2 * math.pi * value / total
+        middle = (start + end) / 2
+        ox, oy = _point(0, 0, r * 0.08, middle)
+        _sector(pdf, cx + ox + 0.8, cy + oy + 0.8, r, start, end, _tint(BLACK, 0.15))  # Shadow
+        _sector(pdf, cx + ox, cy + oy, r, start, end, color)
+        _label(pdf, *_point(cx + ox, cy + oy, r * 0.6, middle), f'{100 * value / total:.1f}%', 11, BLACK, 'B')
+        lx, ly = _point(cx + ox, cy + oy, r * 1.15, middle)
+        _label(pdf, lx, ly, text, 10, BLACK, 'B', 'L' if math.cos(middle) >= 0 else 'R')
+        start = end
+
+
+def _vector_emi_schedule_chart(pdf, x, y, w, h, principal, annual_rate, duration_months):
+    principal_payments, interest_payments = emi_split(principal, annual_rate, duration_months)
+    months = len(principal_payments)
+    if months == 0:
+        raise ValueError("EMI chart needs at least one installment")
+
+    _label(pdf, x + w / 2, y + 4, 'EMI Payment Schedule', 14, BLACK, 'B')
+    left, right, top, bottom = x + 16, x + w - 4, y + 14, y + h - 12
+    peak = max(float(p + i) for p, i in zip(principal_payments, interest_payments)) or 1.0
+    step = 10 ** math.floor(math.log10(peak / 4)) if peak >= 4 else 1
+    for nice in (1, 2, 2.5, 5, 10):
+        if peak / (step * nice) <= 5:
+            step *= nice
+            break
+    y_max = step * math.ceil(peak / step)
+
+    def to_y(value):
+        return bottom - (bottom - top) * value / y_max
+
+    # Dashed grid and y-axis labels
+    pdf.set_draw_color(*_tint(BLACK, 0.3))
+    pdf.set_line_width(0.2)
+    pdf.set_dash_pattern(dash=1, gap=1)
+    tick = 0.0
+    while tick <= y_max + 1e-9:
+        pdf.line(left, to_y(tick), right, to_y(tick))
+        _label(pdf, left - 1.5, to_y(tick), f'{int(tick / 1000)}K', 8, BLACK, '', 'R')
+        tick += step
+    pdf.set_dash_pattern()
+
+    slot = (right - left) / months
+    bar = slot * 0.8
+    principal_color, interest_color = _tint(BLUE, 0.8), _tint(AMBER, 0.8)
+    for index in range(months):
+        bx = left + slot * index + (slot - bar) / 2
+        p, i = float(principal_payments[index]), float(interest_payments[index])
+        pdf.set_fill_color(*principal_color)
+        pdf.rect(bx, to_y(p), bar, bottom - to_y(p), style='F')
+        pdf.set_fill_color(*interest_color)
+        pdf.rect(bx, to_y(p + i), bar, to_y(p) - to_y(p + i), style='F')
+        if months <= 12 or (index + 1) % 10 == 0:
+            _label(pdf, bx + bar / 2, bottom + 3, str(index + 1), 8, BLACK)
+
+    pdf.set_draw_color(*BLACK)
+    pdf.set_line_width(0.3)
+    pdf.line(left, bottom, right, bottom)
+    pdf.line(left, top, left, bottom)
+    _label(pdf, (left + right) / 2, bottom + 8, 'Month', 10, BLACK, 'B')
+
+    # Legend
+    for row, (text, color) in enumerate((('Principal', principal_color), ('Interest', interest_color))):
+        ly = top + 2 + row * 5
+        pdf.set_fill_color(*color)
+        pdf.rect(right - 24, ly - 1.5, 5, 3, style='F')
+        _label(pdf, right - 18, ly, text, 9, BLACK, '', 'L')
+
+
+def _vector_risk_radar_chart(pdf, x, y, w, h, analysis_result):
+    values = risk_scores(analysis_result)
+    _label(pdf, x + w / 2, y + 5, 'Risk Assessment Profile', 16, NAVY, 'B')
+    cx, cy = x + w / 2, y + h / 2 + 5
+    radius = min(w, h) * 0.34
+
+    def scale(value):
+        return radius * value / 110  # 110 leaves room above 100, as before
+
+    # First axis at 12 o'clock, then clockwise
+    angles = [math.pi / 2 - 2 * math.pi * index / len(values) for index in range(len(values))]
+
+    pdf.set_draw_color(*_tint(MUTED, 0.5))
+    pdf.set_line_width(0.25)
+    pdf.set_dash_pattern(dash=1.2, gap=1.2)
+    for ring in (20, 40, 60, 80, 100):
+        pdf.ellipse(cx - scale(ring), cy - scale(ring), 2 * scale(ring), 2 * scale(ring), style='D')
+    for theta in angles:
+        pdf.line(cx, cy, *_point(cx, cy, radius, theta))
+    pdf.set_dash_pattern()
+    pdf.set_draw_color(*_tint(BLACK, 0.6))
+    pdf.ellipse(cx - radius, cy - radius, 2 * radius, 2 * radius, style='D')
+
+    for ring in (20, 40, 60, 80, 100):
+        _label(pdf, *_point(cx, cy, scale(ring), math.radians(67.5)), str(ring), 9, MUTED)
+
+    points = [_point(cx, cy, scale(value), theta) for value, theta in zip(values, angles)]
+    pdf.set_fill_color(*_tint(BLUE, 0.2))
+    pdf.set_draw_color(*BLUE)
+    pdf.set_line_width(0.9)
+    pdf.polygon(points, style='DF')
+    for px, py in points:
+        _dot(pdf, px, py, 1.3, BLUE)
+
+    for text, theta in zip(RISK_CATEGORIES, angles):
+        _label(pdf, *_point(cx, cy, radius + 9, theta), text, 11, DARK_BLUE, 'B')
+
+
+# ----------------------------------------------------------------------------
+# PNG fallback (matplotlib)
+# ----------------------------------------------------------------------------
+
+@lru_cache(maxsize=1)
+def _pyplot():
+    """matplotlib.pyplot, imported on first PNG chart (None if not installed)"""
+    try:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+        return plt
+    except ImportError:
+        return None
+
+
+def _hex(color: Color) -> str:
+    return '#%02x%02x%02x' % color
+
+
+def _png(fig, dpi, **kwargs) -> bytes:
+    plt = _pyplot()
+    buf = io.BytesIO()
+    plt.savefig(buf, format='png', dpi=dpi, bbox_inches='tight', **kwargs)
+    plt.close(fig)
+    return buf.getvalue()
+
+
+@lru_cache(maxsize=CHART_PNG_CACHE_SIZE)
+def _png_approval_gauge(probability: float, decision: str) -> bytes:
+    import numpy as np
+    plt = _pyplot()
+    fig, ax = plt.subplots(figsize=(8, 5), subplot_kw={'projection': 'polar'})
+    color = _hex(approval_color(probability))
+
+    theta = np.linspace(0, np.pi, 100)
+    ax.plot(theta, [1]*len(theta), 'lightgray', linewidth=30, solid_capstyle='round')
+    score_theta = np.linspace(0, np.pi * (probability/100), 50)
+    ax.plot(score_theta, [1]*len(score_theta), color, linewidth=30, solid_capstyle='round')
+
+    needle_angle = np.pi * (probability/100)
+    ax.plot([needle_angle, needle_angle], [0, 1], 'black', linewidth=2)
+    ax.plot(needle_angle, 1, 'o', color='black', markersize=10)
+
+    ax.set_ylim(0, 1.3)
+    ax.set_theta_direction(-1)
+    ax.set_theta_zero_location('W')
+    ax.set_xticks([0, np.pi/4, np.pi/2, 3*np.pi/4, np.pi])
+    ax.set_xticklabels(['0%', '25%', '50%', '75%', '100%'], fontsize=9)
+    ax.set_yticks([])
+    ax.spines['polar'].set_visible(False)
+
+    ax.text(np.pi/2, 0.4, f'{probability:.1f}%',
+            ha='center', va='center', fontsize=28, fontweight='bold', color=color)
+    ax.text(np.pi/2, 0.15, decision,
+            ha='center', va='center', fontsize=12, color='#374151')
+    plt.tight_layout()
+    return _png(fig, 120, facecolor='white')
+
+
+@lru_cache(maxsize=CHART_PNG_CACHE_SIZE)
+def _png_credit_score_gauge(score: int) -> bytes:
+    import numpy as np
+    plt = _pyplot()
+    fig, ax = plt.subplots(figsize=(7, 3.5), subplot_kw={'projection': 'polar'})
+
+    theta = np.linspace(0, np.pi, 100)
+    ax.plot(theta, [1]*len(theta), 'lightgray', linewidth=25, solid_capstyle='round')
+    for start, end, color in CREDIT_SEGMENTS:
+        seg_theta = np.linspace(np.pi * ((start - 300) / 600), np.pi * ((end - 300) / 600), 30)
+        ax.plot(seg_theta, [1]*len(seg_theta), _hex(color), linewidth=25, solid_capstyle='round', alpha=0.3)
+
+    needle_angle = np.pi * ((score - 300) / 600)
+    score_color = _hex(credit_color(score))
+    ax.plot([needle_angle, needle_angle], [0, 1], 'black', linewidth=2)
+    ax.plot(needle_angle, 1, 'o', color='black', markersize=8)
+    score_arc = np.linspace(0, needle_angle, 50)
+    ax.plot(score_arc, [1]*len(score_arc), score_color, linewidth=25, solid_capstyle='round')
+
+    ax.set_ylim(0, 1.3)
+    ax.set_theta_direction(-1)
+    ax.set_theta_zero_location('W')
+    ax.set_xticks([0, np.pi/4, np.pi/2, 3*np.pi/4, np.pi])
+    ax.set_xticklabels(['300', '450', '600', '750', '900'], fontsize=9)
+    ax.set_yticks([])
+    ax.spines['polar'].set_visible(False)
+
+    ax.text(np.pi/2, 0.35, str(score),
+            ha='center', va='center', fontsize=26, fontweight='bold', color=score_color)
+    ax.text(np.pi/2, 0.1, 'Credit Score',
+            ha='center', va='center', fontsize=11, color='#374151')
+    plt.tight_layout()
+    return _png(fig, 100)
+
+
+def _png_loan_breakdown_pie(principal, interest) -> bytes:
+    plt = _pyplot()
+    fig, ax = plt.subplots(figsize=(7, 5))
+    sizes = [principal, interest]
+    labels = [f'Principal\nRs.{principal:,.0f}', f'Interest\nRs.{interest:,.0f}']
+    ax.pie(sizes, explode=(0.08, 0.08), labels=labels, colors=[_hex(BLUE), _hex(AMBER)], autopct='%1.1f%%',
+           shadow=True, startangle=90, textprops={'fontsize': 11, 'weight': 'bold'})
+    ax.axis('equal')
+    ax.set_title('Loan Cost Distribution', fontsize=15, fontweight='bold', pad=20, color=_hex(NAVY))
+    plt.tight_layout(pad=1.5)
+    return _png(fig, 120, facecolor='white')
+
+
+def _png_emi_schedule_chart(principal, annual_rate, duration_months) -> bytes:
+    import numpy as np
+    plt = _pyplot()
+    principal_payments, interest_payments = emi_split(principal, annual_rate, duration_months)
+    x = np.arange(1, len(principal_payments) + 1)
+
+    fig, ax = plt.subplots(figsize=(10, 4))
+    ax.bar(x, principal_payments, label='Principal', color=_hex(BLUE), alpha=0.8)
+    ax.bar(x, interest_payments, bottom=principal_payments, label='Interest', color=_hex(AMBER), alpha=0.8)
+    ax.set_xlabel('Month', fontsize=10, fontweight='bold')
+    ax.set_ylabel('Amount (Rs.)', fontsize=10, fontweight='bold')
+    ax.set_title('EMI Payment Schedule', fontsize=14, fontweight='bold', pad=15)
+    ax.legend(loc='upper right', fontsize=9)
+    ax.grid(axis='y', alpha=0.3, linestyle='--')
+    ax.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'{int(x/1000)}K'))
+    plt.tight_layout()
+    return _png(fig, 100)
+
+
+def _png_risk_radar_chart(analysis_result) -> bytes:
+    import numpy as np
+    plt = _pyplot()
+    values = risk_scores(analysis_result)
+    angles = np.linspace(0, 2 * np.pi, len(values), endpoint=False).tolist()
+    values += values[:1]  # Complete the circle
+    angles += angles[:1]
+
+    fig, ax = plt.subplots(figsize=(8, 8), subplot_kw=dict(projection='polar'))
+    ax.plot(angles, values, 'o-', linewidth=2.5, color=_hex(BLUE), markersize=8)
+    ax.fill(angles, values, alpha=0.20, color=_hex(BLUE))
+    ax.set_theta_offset(np.pi / 2)
+    ax.set_theta_direction(-1)
+    ax.set_xticks(angles[:-1])
+    ax.set_xticklabels(RISK_CATEGORIES, fontsize=11, fontweight='bold', color=_hex(DARK_BLUE))
+    ax.set_ylim(0, 110)
+    ax.set_yticks([20, 40, 60, 80, 100])
+    ax.set_yticklabels(['20', '40', '60', '80', '100'], fontsize=9, color=_hex(MUTED))
+    ax.set_rlabel_position(22.5)
+    ax.set_title('Risk Assessment Profile', fontsize=16, fontweight='bold', pad=25, color=_hex(NAVY))
+    ax.grid(True, linestyle='--', alpha=0.5, linewidth=1)
+    plt.tight_layout(pad=2.0)
+    return _png(fig, 150, facecolor='white')
+
+
+def _use_png() -> bool:
+    return REPORT_CHART_BACKEND == 'png' and _pyplot() is not None
+
+
+# ----------------------------------------------------------------------------
+# Public API: draw a chart into (x, y, w, h) on the current page
+# ----------------------------------------------------------------------------
+
+def approval_gauge(pdf, x, y, w, h, probability, decision):
+    probability = round(float(probability), 1)
+    if _use_png():
+        pdf.image(io.BytesIO(_png_approval_gauge(probability, str(decision))), x=x, y=y, w=w, h=h)
+        return
+    with _canvas(pdf):
+        _vector_approval_gauge(pdf, x, y, w, h, probability, decision)
+
+
+def credit_score_gauge(pdf, x, y, w, h, score):
+    score = int(round(score))
+    if _use_png():
+        pdf.image(io.BytesIO(_png_credit_score_gauge(score)), x=x, y=y, w=w, h=h)
+        return
+    with _canvas(pdf):
+        _vector_credit_score_gauge(pdf, x, y, w, h, score)
+
+
+def loan_breakdown_pie(pdf, x, y, w, h, principal, interest):
+    if _use_png():
+        pdf.image(io.BytesIO(_png_loan_breakdown_pie(principal, interest)), x=x, y=y, w=w, h=h)
+        return
+    with _canvas(pdf):
+        _vector_loan_breakdown_pie(pdf, x, y, w, h, principal, interest)
+
+
+def emi_schedule_chart(pdf, x, y, w, h, principal, annual_rate, duration_months):
+    if _use_png():
+        pdf.image(io.BytesIO(_png_emi_schedule_chart(principal, annual_rate, duration_months)), x=x, y=y, w=w, h=h)
+        return
+    with _canvas(pdf):
+        _vector_emi_schedule_chart(pdf, x, y, w, h, principal, annual_rate, duration_months)
+
+
+def risk_radar_chart(pdf, x, y, w, h, analysis_result):
+    if _use_png():
+        pdf.image(io.BytesIO(_png_risk_radar_chart(analysis_result)), x=x, y=y, w=w, h=h)
+        return
+    with _canvas(pdf):
+        _vector_risk_radar_chart(pdf, x, y, w, h, analysis_result)
+
+
+def png_cache_info() -> Dict[str, Any]:
+    """Hit/miss counts of the memoized gauge PNGs"""
+    return {
+        "approval_gauge": _png_approval_gauge.cache_info()._asdict(),
+        "credit_score_gauge": _png_credit_score_gauge.cache_info()._asdict(),
+    }
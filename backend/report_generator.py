@@ -5,22 +5,18 @@ Designed for Indian Banking Standards
 """
 
 from fpdf import FPDF
-from datetime import datetime
-import io
+from datetime import datetime, timedelta, timezone
 import base64
+import hashlib
 import math
-import numpy as np
+import report_charts
 
-# Try to import matplotlib for charts, fallback gracefully
-try:
-    import matplotlib
-    matplotlib.use('Agg')
-    import matplotlib.pyplot as plt
-    import matplotlib.patches as mpatches
-    from matplotlib.figure import Figure
-    MATPLOTLIB_AVAILABLE = True
-except ImportError:
-    MATPLOTLIB_AVAILABLE = False
+IST = timezone(timedelta(hours=5, minutes=30))
+
+
+def _document_hash(application_id) -> int:
+    """Stable 10-digit fingerprint of the application (hash() differs per process)"""
+    return int(hashlib.sha256(str(application_id).encode()).hexdigest(), 16) % 10000000000
 
 
 class RBICompliantLoanReport(FPDF):
@@ -46,9 +42,22 @@ class RBICompliantLoanReport(FPDF):
         text = text.replace('"', '"').replace('"', '"')
         return text
     
-    def __init__(self):
+    def __init__(self, report_date=None, report_id=None):
         super().__init__()
         self.set_auto_page_break(auto=True, margin=35)
+        # Printed dates and the ID come from the inputs, never the clock, so
+        # the same inputs render the same PDF (see report_cache)
+        report_date = report_date or datetime.now(timezone.utc)
+        self.report_date = report_date.astimezone(IST) if report_date.tzinfo else report_date
+        self.report_id = report_id or f'RPT-{self.report_date.strftime("%Y%m%d%H%M%S")}'
+        self.set_creation_date(report_date)
+    
+    def application_date(self, application):
+        """Application timestamp in IST, falling back to the report date"""
+        created = getattr(application, 'application_date', None)
+        if created is None:
+            return self.report_date
+        return created.astimezone(IST) if created.tzinfo else created
         
     def header(self):
         """Premium RBI-styled header"""
@@ -120,8 +129,8 @@ class RBICompliantLoanReport(FPDF):
         self.set_font('Arial', '', 7)
         self.set_text_color(80, 80, 80)
         self.cell(0, 5, 
-            f'Page {self.page_no()}/{{nb}} | Report ID: RPT-{datetime.now().strftime("%Y%m%d%H%M%S")} | '
-            f'Generated: {datetime.now().strftime("%d-%b-%Y %H:%M:%S IST")}', 0, 0, 'C')
+            f'Page {self.page_no()}/{{nb}} | Report ID: {self.report_id} | '
+            f'Generated: {self.report_date.strftime("%d-%b-%Y %H:%M:%S IST")}', 0, 0, 'C')
         
     def add_cover_section(self, application, analysis_result):
         """Add formal cover section with report title"""
@@ -163,7 +172,7 @@ class RBICompliantLoanReport(FPDF):
         self.set_text_color(60, 60, 60)
         
         # First row
-        self.cell(85, 6, f'Report Date: {datetime.now().strftime("%d %B %Y")}', 0, 0)
+        self.cell(85, 6, f'Report Date: {self.report_date.strftime("%d %B %Y")}', 0, 0)
         self.cell(81, 6, f'Application ID: {str(application.id)[:12]}...', 0, 1)
         
         # Second row
@@ -265,282 +274,6 @@ class RBICompliantLoanReport(FPDF):
                 return f"{data[:2]}{'*' * (len(data)-4)}{data[-2:]}"
             return data
     
-    def create_approval_gauge(self, probability, decision):
-        """Create approval score gauge chart"""
-        if not MATPLOTLIB_AVAILABLE:
-            return None
-        
-        try:
-            fig, ax = plt.subplots(figsize=(8, 5), subplot_kw={'projection': 'polar'})
-            
-            # Gauge settings
-            theta = np.linspace(0, np.pi, 100)
-            
-            # Background arcs
-            ax.plot(theta, [1]*len(theta), 'lightgray', linewidth=30, solid_capstyle='round')
-            
-            # Color based on score
-            score_theta = np.linspace(0, np.pi * (probability/100), 50)
-            if probability >= 70:
-                color = '#16a34a'  # Green
-            elif probability >= 40:
-                color = '#eab308'  # Yellow
-            else:
-                color = '#dc2626'  # Red
-            
-            ax.plot(score_theta, [1]*len(score_theta), color, linewidth=30, solid_capstyle='round')
-            
-            # Needle
-            needle_angle = np.pi * (probability/100)
-            ax.plot([needle_angle, needle_angle], [0, 1], 'black', linewidth=2)
-            ax.plot(needle_angle, 1, 'o', color='black', markersize=10)
-            
-            # Labels
-            ax.set_ylim(0, 1.3)
-            ax.set_theta_direction(-1)
-            ax.set_theta_zero_location('W')
-            ax.set_xticks([0, np.pi/4, np.pi/2, 3*np.pi/4, np.pi])
-            ax.set_xticklabels(['0%', '25%', '50%', '75%', '100%'], fontsize=9)
-            ax.set_yticks([])
-            ax.spines['polar'].set_visible(False)
-            
-            # Center text
-            ax.text(np.pi/2, 0.4, f'{probability:.1f}%', 
-                   ha='center', va='center', fontsize=28, fontweight='bold', color=color)
-            ax.text(np.pi/2, 0.15, decision, 
-                   ha='center', va='center', fontsize=12, color='#374151')
-            
-            plt.tight_layout()
-            
-            # Save to bytes with higher quality
-            buf = io.BytesIO()
-            plt.savefig(buf, format='png', dpi=120, bbox_inches='tight', facecolor='white')
-            buf.seek(0)
-            plt.close(fig)
-            return buf
-        except Exception as e:
-            print(f"Error creating gauge: {e}")
-            return None
-    
-    def create_loan_breakdown_pie(self, principal, interest):
-        """Create pie chart for loan cost breakdown"""
-        if not MATPLOTLIB_AVAILABLE:
-            return None
-        
-        try:
-            fig, ax = plt.subplots(figsize=(7, 5))
-            
-            sizes = [principal, interest]
-            labels = [f'Principal\nRs.{principal:,.0f}', f'Interest\nRs.{interest:,.0f}']
-            colors = ['#3b82f6', '#f59e0b']
-            explode = (0.08, 0.08)
-            
-            ax.pie(sizes, explode=explode, labels=labels, colors=colors, autopct='%1.1f%%',
-                   shadow=True, startangle=90, textprops={'fontsize': 11, 'weight': 'bold'})
-            ax.axis('equal')
-            ax.set_title('Loan Cost Distribution', fontsize=15, fontweight='bold', pad=20, color='#003366')
-            
-            plt.tight_layout(pad=1.5)
-            
-            buf = io.BytesIO()
-            plt.savefig(buf, format='png', dpi=120, bbox_inches='tight', facecolor='white')
-            buf.seek(0)
-            plt.close(fig)
-            return buf
-        except Exception as e:
-            print(f"Error creating pie chart: {e}")
-            return None
-    
-    def create_emi_schedule_chart(self, monthly_emi, duration_months, principal, interest):
-        """Create EMI payment schedule chart"""
-        if not MATPLOTLIB_AVAILABLE:
-            return None
-        
-        try:
-            # Calculate payment schedule
-            months = min(duration_months, 60)  # Show max 5 years
-            x = np.arange(1, months + 1)
-            
-            # Proper amortization calculation
-            # Total interest over entire loan period divided by duration_months
-            total_monthly_interest = interest / duration_months if duration_months > 0 else 0
-            principal_payments = []
-            interest_payments = []
-            
-            remaining = principal
-            for i in range(months):
-                if remaining > 0 and monthly_emi > 0:
-                    # Interest decreases as principal is paid down
-                    int_payment = total_monthly_interest * (remaining / principal)
-                    prin_payment = monthly_emi - int_payment
-                    
-                    # Ensure non-negative values
-                    int_payment = max(0, min(int_payment, monthly_emi))
-                    prin_payment = max(0, monthly_emi - int_payment)
-                    
-                    principal_payments.append(prin_payment)
-                    interest_payments.append(int_payment)
-                    remaining = max(0, remaining - prin_payment)
-                else:
-                    principal_payments.append(0)
-                    interest_payments.append(0)
-            
-            fig, ax = plt.subplots(figsize=(10, 4))
-            
-            ax.bar(x, principal_payments, label='Principal', color='#3b82f6', alpha=0.8)
-            ax.bar(x, interest_payments, bottom=principal_payments, label='Interest', 
-                  color='#f59e0b', alpha=0.8)
-            
-            ax.set_xlabel('Month', fontsize=10, fontweight='bold')
-            ax.set_ylabel('Amount (Rs.)', fontsize=10, fontweight='bold')
-            ax.set_title('EMI Payment Schedule', fontsize=14, fontweight='bold', pad=15)
-            ax.legend(loc='upper right', fontsize=9)
-            ax.grid(axis='y', alpha=0.3, linestyle='--')
-            
-            # Format y-axis
-            ax.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'{int(x/1000)}K'))
-            
-            plt.tight_layout()
-            
-            buf = io.BytesIO()
-            plt.savefig(buf, format='png', dpi=100, bbox_inches='tight')
-            buf.seek(0)
-            plt.close(fig)
-            return buf
-        except Exception as e:
-            print(f"Error creating EMI chart: {e}")
-            return None
-    
-    def create_credit_score_gauge(self, score):
-        """Create credit score gauge"""
-        if not MATPLOTLIB_AVAILABLE:
-            return None
-        
-        try:
-            fig, ax = plt.subplots(figsize=(7, 3.5), subplot_kw={'projection': 'polar'})
-            
-            theta = np.linspace(0, np.pi, 100)
-            ax.plot(theta, [1]*len(theta), 'lightgray', linewidth=25, solid_capstyle='round')
-            
-            # Color segments
-            segments = [
-                (300, 550, '#dc2626'),  # Poor - Red
-                (550, 650, '#f59e0b'),  # Fair - Orange
-                (650, 750, '#eab308'),  # Good - Yellow
-                (750, 900, '#16a34a'),  # Excellent - Green
-            ]
-            
-            for start, end, color in segments:
-                start_theta = np.pi * ((start - 300) / 600)
-                end_theta = np.pi * ((end - 300) / 600)
-                seg_theta = np.linspace(start_theta, end_theta, 30)
-                ax.plot(seg_theta, [1]*len(seg_theta), color, linewidth=25, solid_capstyle='round', alpha=0.3)
-            
-            # Score needle
-            needle_angle = np.pi * ((score - 300) / 600)
-            score_color = '#16a34a' if score >= 750 else '#eab308' if score >= 650 else '#f59e0b' if score >= 550 else '#dc2626'
-            ax.plot([needle_angle, needle_angle], [0, 1], 'black', linewidth=2)
-            ax.plot(needle_angle, 1, 'o', color='black', markersize=8)
-            
-            # Score arc
-            score_arc = np.linspace(0, needle_angle, 50)
-            ax.plot(score_arc, [1]*len(score_arc), score_color, linewidth=25, solid_capstyle='round')
-            
-            ax.set_ylim(0, 1.3)
-            ax.set_theta_direction(-1)
-            ax.set_theta_zero_location('W')
-            ax.set_xticks([0, np.pi/4, np.pi/2, 3*np.pi/4, np.pi])
-            ax.set_xticklabels(['300', '450', '600', '750', '900'], fontsize=9)
-            ax.set_yticks([])
-            ax.spines['polar'].set_visible(False)
-            
-            # Center text
-            ax.text(np.pi/2, 0.35, str(score), 
-                   ha='center', va='center', fontsize=26, fontweight='bold', color=score_color)
-            ax.text(np.pi/2, 0.1, 'Credit Score', 
-                   ha='center', va='center', fontsize=11, color='#374151')
-            
-            plt.tight_layout()
-            
-            buf = io.BytesIO()
-            plt.savefig(buf, format='png', dpi=100, bbox_inches='tight')
-            buf.seek(0)
-            plt.close(fig)
-            return buf
-        except Exception as e:
-            print(f"Error creating credit gauge: {e}")
-            return None
-    
-    def create_risk_radar_chart(self, analysis_result):
-        """Create risk assessment radar chart"""
-        if not MATPLOTLIB_AVAILABLE:
-            return None
-        
-        try:
-            income_analysis = analysis_result.get('income_analysis', {})
-            credit_score = analysis_result.get('credit_score', {}).get('score', 700)
-            probability = analysis_result.get('approval_probability', 0)
-            
-            # Calculate risk scores (0-100, higher is better)
-            categories = ['Credit\nScore', 'Income\nStability', 'Debt\nBurden', 
-                         'EMI\nAffordability', 'Overall\nRisk']
-            
-            # Normalize values properly to 0-100 scale
-            monthly_income = income_analysis.get('monthly_income', 0)
-            debt_ratio = income_analysis.get('debt_to_income_ratio', 30)
-            emi_ratio = income_analysis.get('emi_to_income_ratio', 30)
-            
-            values = [
-                min(100, max(0, (credit_score - 300) / 6)),  # Credit score: 300-900 -> 0-100
-                min(100, max(0, (monthly_income / 1000))),  # Income: ₹100k = 100 points
-                max(0, min(100, 100 - debt_ratio)),  # Debt burden: lower is better
-                max(0, min(100, 100 - emi_ratio)),  # EMI affordability: lower is better
-                min(100, max(0, probability))  # Overall approval probability
-            ]
-            
-            # Number of variables
-            num_vars = len(categories)
-            
-            # Compute angle for each axis
-            angles = np.linspace(0, 2 * np.pi, num_vars, endpoint=False).tolist()
-            values += values[:1]  # Complete the circle
-            angles += angles[:1]
-            
-            # Create larger figure for better clarity
-            fig, ax = plt.subplots(figsize=(8, 8), subplot_kw=dict(projection='polar'))
-            
-            # Plot with thicker lines
-            ax.plot(angles, values, 'o-', linewidth=2.5, color='#3b82f6', markersize=8)
-            ax.fill(angles, values, alpha=0.20, color='#3b82f6')
-            
-            # Fix axis to go in the right order
-            ax.set_theta_offset(np.pi / 2)
-            ax.set_theta_direction(-1)
-            
-            # Draw axis lines for each angle and label with better spacing
-            ax.set_xticks(angles[:-1])
-            ax.set_xticklabels(categories, fontsize=11, fontweight='bold', color='#1e40af')
-            
-            # Set y-axis limits and labels with better visibility
-            ax.set_ylim(0, 110)  # Slight extra space for labels
-            ax.set_yticks([20, 40, 60, 80, 100])
-            ax.set_yticklabels(['20', '40', '60', '80', '100'], fontsize=9, color='#6b7280')
-            ax.set_rlabel_position(22.5)  # Rotate radial labels away from plot
-            
-            ax.set_title('Risk Assessment Profile', fontsize=16, fontweight='bold', pad=25, color='#003366')
-            ax.grid(True, linestyle='--', alpha=0.5, linewidth=1)
-            
-            plt.tight_layout(pad=2.0)
-            
-            buf = io.BytesIO()
-            plt.savefig(buf, format='png', dpi=150, bbox_inches='tight', facecolor='white')
-            buf.seek(0)
-            plt.close(fig)
-            return buf
-        except Exception as e:
-            print(f"Error creating radar chart: {e}")
-            return None
-            
     def add_info_box(self, content, box_type='info'):
         """Add styled information box"""
         colors = {
@@ -618,7 +351,7 @@ class RBICompliantLoanReport(FPDF):
         loan_duration = getattr(application, 'loan_duration', 0) or 0
         self.add_key_value('Loan Tenure', f"{loan_duration} Months ({loan_duration // 12} Years)")
         self.add_key_value('Loan Purpose', getattr(application, 'loan_purpose', 'Personal') or 'Personal')
-        self.add_key_value('Application Date', datetime.now().strftime('%d-%b-%Y'))
+        self.add_key_value('Application Date', self.application_date(application).strftime('%d-%b-%Y'))
         
         # KYC Status - Actual from user data
         kyc_verified = getattr(application, 'kyc_verified', False)
@@ -635,14 +368,11 @@ class RBICompliantLoanReport(FPDF):
         decision = analysis_result.get('decision', 'PENDING')
         
         # Add approval gauge chart
-        if MATPLOTLIB_AVAILABLE:
-            try:
-                gauge_img = self.create_approval_gauge(probability, decision)
-                if gauge_img:
-                    self.image(gauge_img, x=35, y=self.get_y(), w=140, h=70)
-                    self.ln(75)
-            except Exception as e:
-                print(f"Could not generate gauge chart: {e}")
+        try:
+            report_charts.approval_gauge(self, 35, self.get_y(), 140, 70, probability, decision)
+            self.ln(75)
+        except Exception as e:
+            print(f"Could not generate gauge chart: {e}")
         
         # Score interpretation box with enhanced styling
         self.ln(2)
@@ -741,14 +471,11 @@ class RBICompliantLoanReport(FPDF):
         rating = credit_score.get('rating', 'N/A')
         
         # Add credit score gauge chart
-        if MATPLOTLIB_AVAILABLE:
-            try:
-                gauge_img = self.create_credit_score_gauge(score)
-                if gauge_img:
-                    self.image(gauge_img, x=30, y=self.get_y(), w=150, h=50)
-                    self.ln(55)
-            except Exception as e:
-                print(f"Could not generate credit score gauge: {e}")
+        try:
+            report_charts.credit_score_gauge(self, 30, self.get_y(), 150, 50, score)
+            self.ln(55)
+        except Exception as e:
+            print(f"Could not generate credit score gauge: {e}")
         
         self.subsection_title('Credit Score Summary')
         
@@ -773,7 +500,7 @@ class RBICompliantLoanReport(FPDF):
         # Credit factors
         self.add_key_value('Credit Bureau', 'CIBIL / Experian / Equifax')
         self.add_key_value('Score Range', '300 - 900')
-        self.add_key_value('Report Date', datetime.now().strftime('%d-%b-%Y'))
+        self.add_key_value('Report Date', self.report_date.strftime('%d-%b-%Y'))
         
         self.ln(3)
         
@@ -812,14 +539,11 @@ class RBICompliantLoanReport(FPDF):
             principal_pct = interest_pct = 0
         
         # Add pie chart
-        if MATPLOTLIB_AVAILABLE:
-            try:
-                pie_img = self.create_loan_breakdown_pie(principal, interest)
-                if pie_img:
-                    self.image(pie_img, x=55, y=self.get_y(), w=100, h=60)
-                    self.ln(68)
-            except Exception as e:
-                print(f"Could not generate pie chart: {e}")
+        try:
+            report_charts.loan_breakdown_pie(self, 55, self.get_y(), 100, 60, principal, interest)
+            self.ln(68)
+        except Exception as e:
+            print(f"Could not generate pie chart: {e}")
         
         self.ln(3)
         self.subsection_title('Cost Distribution')
@@ -1037,16 +761,13 @@ class RBICompliantLoanReport(FPDF):
             self.add_page()
         
         # Add risk radar chart with better positioning
-        if MATPLOTLIB_AVAILABLE:
-            try:
-                radar_img = self.create_risk_radar_chart(analysis_result)
-                if radar_img:
-                    # Center the chart on page
-                    self.image(radar_img, x=40, y=self.get_y(), w=130, h=130)
-                    self.ln(135)
-            except Exception as e:
-                print(f"Could not generate radar chart: {e}")
-                self.ln(5)  # Add spacing even if chart fails
+        try:
+            # Center the chart on page
+            report_charts.risk_radar_chart(self, 40, self.get_y(), 130, 130, analysis_result)
+            self.ln(135)
+        except Exception as e:
+            print(f"Could not generate radar chart: {e}")
+            self.ln(5)  # Add spacing even if chart fails
         
         income_analysis = analysis_result.get('income_analysis', {})
         credit_score = analysis_result.get('credit_score', {})
@@ -1325,7 +1046,7 @@ class RBICompliantLoanReport(FPDF):
         # Mock signature data
         self.set_font('Arial', 'I', 8)
         self.set_text_color(100, 100, 100)
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        timestamp = self.report_date.strftime("%Y-%m-%d %H:%M:%S")
         self.cell(75, 5, f"Name: {getattr(application, 'first_name', 'Valued')} {getattr(application, 'last_name', 'Customer')}", 0, 0, 'L')
         self.cell(30, 5, '', 0, 0)
         self.cell(75, 5, 'DigiSign: SYSTEM_AUTH_V1', 0, 1, 'L')
@@ -1333,29 +1054,31 @@ class RBICompliantLoanReport(FPDF):
         self.set_xy(25, y_sig + 25)
         self.cell(75, 5, f'Timestamp: {timestamp}', 0, 0, 'L')
         self.cell(30, 5, '', 0, 0)
-        self.cell(75, 5, f'Date: {datetime.now().strftime("%Y-%m-%d")}', 0, 1, 'L')
+        self.cell(75, 5, f'Date: {self.report_date.strftime("%Y-%m-%d")}', 0, 1, 'L')
 
         self.set_xy(25, y_sig + 33)
         self.set_font('Courier', 'B', 7)
         self.set_text_color(50, 50, 50)
-        hash_val = f"SIGNED-HASH-{hash(str(application.id))%10000000000:010d}"
+        hash_val = f"SIGNED-HASH-{_document_hash(application.id):010d}"
         self.cell(75, 5, hash_val, 0, 0, 'L')
         
         self.ln(15)
 
 
-def generate_loan_report_pdf(application, analysis_result):
+def generate_loan_report_pdf(application, analysis_result, report_id=None):
     """
     Generate comprehensive RBI-compliant loan report PDF
     
     Args:
         application: Loan application object with applicant details
+            (report_date / application_date are printed when present)
         analysis_result: Dictionary containing loan analysis from ML model
+        report_id: Report ID for the footer (derived from the cache key)
         
     Returns:
         bytes: PDF file content
     """
-    pdf = RBICompliantLoanReport()
+    pdf = RBICompliantLoanReport(getattr(application, 'report_date', None), report_id)
     pdf.alias_nb_pages()
     
     # Page 1: Cover Page + Account & Customer Information
@@ -1400,7 +1123,7 @@ def generate_loan_report_pdf(application, analysis_result):
     pdf.set_font('Arial', 'I', 9)
     pdf.set_text_color(100, 100, 100)
     pdf.cell(0, 5, 'This is a digitally generated document. No physical signature required.', 0, 1, 'C')
-    pdf.cell(0, 5, f'Document Hash: SHA256-{abs(hash(str(application.id)))%10000000000:010d}', 0, 1, 'C')
+    pdf.cell(0, 5, f'Document Hash: SHA256-{_document_hash(application.id):010d}', 0, 1, 'C')
     pdf.cell(0, 5, 'Verify authenticity at: https://verify.secureidentityhub.com', 0, 1, 'C')
     
     return pdf.output()
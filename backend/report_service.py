@@ -0,0 +1,218 @@
+"""
+Report Service - renders loan report PDFs in a process pool.
+
+generate_loan_report_pdf() builds an 8-page FPDF document with four
+charts (report_charts). That is pure-Python CPU work, so /loan-report and
+/shared-report hand it to a pool of worker processes and await the
+result. The event loop stays free for other users.
+
+Built on InferenceExecutor (bounded admission + queue/compute metrics):
+- REPORT_WORKERS: worker processes (default 2)
+- REPORT_MAX_QUEUE: renders allowed to wait for a free worker (default 8);
+  beyond that ExecutorSaturated is raised (503 in the API)
+- REPORT_TIMEOUT: seconds one render may take (default 30). Enforced
+  inside the worker with SIGALRM, so a stuck render frees its worker;
+  raises ReportTimeout (504 in the API)
+- REPORT_MAX_TASKS_PER_CHILD: renders before a worker is replaced
+  (default 100), which keeps its memory in check
+
+Workers are spawned, not forked: the parent has an event loop, DB
+connections and model threads that must not be copied. Each worker
+imports the report modules once, at start-up.
+
+The application/prediction -> report inputs mapping that both endpoints
+used to repeat lives here too (build_report_inputs).
+"""
+
+import multiprocessing
+import os
+import signal
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional, Tuple
+
+from inference_executor import InferenceExecutor
+
+REPORT_WORKERS = int(os.getenv("REPORT_WORKERS", "2"))
+REPORT_MAX_QUEUE = int(os.getenv("REPORT_MAX_QUEUE", "8"))
+REPORT_TIMEOUT = float(os.getenv("REPORT_TIMEOUT", "30"))
+REPORT_MAX_TASKS_PER_CHILD = int(os.getenv("REPORT_MAX_TASKS_PER_CHILD", "100"))
+
+
+class ReportTimeout(Exception):
+    """Raised when one report render exceeds REPORT_TIMEOUT"""
+
+
+class ReportContext:
+    """Applicant details the report needs, detached from the ORM so it can be pickled"""
+
+    def __init__(self, app_obj):
+        u = app_obj.user
+        self.full_name = f"{u.first_name} {u.last_name}" if u.first_name else "Valued Customer"
+        self.email = u.email
+        self.mobile_number = u.mobile_number
+        self.id = str(app_obj.id)
+        self.loan_amount = app_obj.loan_amount
+        self.monthly_income = app_obj.monthly_income
+        self.loan_purpose = app_obj.loan_purpose
+        self.employment_status = app_obj.employment_status
+        self.loan_duration = app_obj.loan_duration
+        self.date_of_birth = u.date_of_birth
+        self.gender = u.gender or app_obj.gender
+        self.age = app_obj.age
+        self.address = f"{u.address_line1 or ''}, {u.city or ''}, {u.state or ''} - {u.pincode or ''}" if u.address_line1 else None
+        self.pan_number = u.pan_number
+        self.customer_id = u.customer_id
+        self.kyc_verified = u.kyc_verified
+        # Dates printed on the report come from the records, not the clock,
+        # so they are part of the cache key and a cached PDF never goes stale
+        pred = app_obj.prediction
+        self.application_date = app_obj.created_at
+        self.report_date = getattr(pred, 'created_at', None) or app_obj.created_at
+
+
+def build_analysis_result(application) -> Dict[str, Any]:
+    """Map an application and its stored prediction to the dict the generator expects"""
+    pred = application.prediction
+
+    # Calculate total interest
+    total_interest = (pred.total_repayment or 0) - (application.loan_amount or 0)
+
+    # Calculate income ratios from real application data
+    monthly_income = application.monthly_income or 50000
+    monthly_debt = application.monthly_debt_payments or 0
+    emi_to_income = (pred.emi / monthly_income * 100) if monthly_income > 0 and pred.emi else 0
+    debt_to_income = ((monthly_debt + (pred.emi or 0)) / monthly_income * 100) if monthly_income > 0 else 0
+
+    # Calculate credit score using CIBIL-standard weighted factors
+    # This matches the CreditScoreEstimator in loan_advisor.py
+    from loan_advisor import CreditScoreEstimator
+
+    credit_profile = {
+        'monthly_income': monthly_income,
+        'debt_to_income_ratio': monthly_debt / monthly_income if monthly_income > 0 else 0.5,
+        'employment_status': application.employment_status or 'Employed',
+        'job_tenure': application.job_tenure or 2,
+        'experience': application.experience or 5,
+        'age': application.age or 30,
+        'home_ownership_status': application.home_ownership_status or 'Rent',
+        'education_level': application.education_level or 'Bachelor',
+    }
+
+    credit_min, credit_max, credit_rating = CreditScoreEstimator.estimate(credit_profile)
+    credit_score = (credit_min + credit_max) // 2  # Use midpoint for display
+
+    return {
+        "decision": pred.decision,
+        "decision_reason": pred.decision_reason,
+        "approval_probability": pred.approval_probability,
+        "loan_details": {
+            "amount": application.loan_amount,
+            "duration_years": application.loan_duration // 12 if application.loan_duration else 0
+        },
+        "loan_purpose": application.loan_purpose,
+        "interest_rate": {"annual": pred.interest_rate},
+        "emi": {
+            "monthly": pred.emi,
+            "total_repayment": pred.total_repayment,
+            "total_interest": total_interest,
+        },
+        "income_analysis": {
+            "monthly_income": monthly_income,
+            "emi_to_income_ratio": emi_to_income,
+            "debt_to_income_ratio": debt_to_income,
+        },
+        "credit_score": {
+            "score": credit_score,
+            "rating": credit_rating,
+        },
+        "explanations": pred.shap_summary if pred.shap_summary else []
+    }
+
+
+def build_report_inputs(application) -> Tuple[ReportContext, Dict[str, Any]]:
+    """Application (with user + prediction loaded) -> picklable generator arguments"""
+    return ReportContext(application), build_analysis_result(application)
+
+
+# ----------------------------------------------------------------------------
+# Worker side (module-level so it can be pickled into the pool)
+# ----------------------------------------------------------------------------
+
+def _init_worker():
+    # Pay for the FPDF/report imports once per worker, not on the first report
+    import report_generator  # noqa: F401
+
+
+def _on_alarm(signum, frame):
+    raise ReportTimeout("Report rendering timed out")
+
+
+def render(context: ReportContext, analysis_result: Dict[str, Any], timeout: float = REPORT_TIMEOUT,
+           report_id: Optional[str] = None) -> bytes:
+    """Render one report; runs inside a worker process"""
+    import report_generator
+
+    alarm = hasattr(signal, "setitimer") and timeout > 0
+    if alarm:
+        signal.signal(signal.SIGALRM, _on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return bytes(report_generator.generate_loan_report_pdf(context, analysis_result, report_id))
+    finally:
+        if alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+class ReportService(InferenceExecutor):
+    """Process pool for report rendering with bounded admission"""
+
+    def __init__(self, workers: int = REPORT_WORKERS, max_queue: int = REPORT_MAX_QUEUE, timeout: float = REPORT_TIMEOUT):
+        super().__init__(kind="process", workers=workers, max_queue=max_queue)
+        self.timeout = timeout
+        self.timeouts = 0
+
+    def _get_pool(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                max_tasks_per_child=REPORT_MAX_TASKS_PER_CHILD,
+            )
+        return self._pool
+
+    async def render(self, context: ReportContext, analysis_result: Dict[str, Any], report_id: Optional[str] = None) -> bytes:
+        """PDF bytes; raises ExecutorSaturated, ReportTimeout or the generator's error"""
+        try:
+            return await self.run(render, context, analysis_result, self.timeout, report_id)
+        except ReportTimeout:
+            with self._lock:
+                self.timeouts += 1
+            raise
+        except BrokenProcessPool:
+            # A worker died (OOM, signal); start a fresh pool for the next report
+            with self._lock:
+                broken = self._pool is not None and getattr(self._pool, "_broken", False)
+            if broken:
+                print("[ReportService] Worker pool broke, restarting it")
+                self.shutdown()
+            raise
+
+    def metrics(self) -> Dict[str, Any]:
+        metrics = super().metrics()
+        metrics["timeout_seconds"] = self.timeout
+        metrics["timeouts"] = self.timeouts
+        return metrics
+
+
+# Singleton instance
+_service = None
+
+
+def get_report_service() -> ReportService:
+    """Get or create the report rendering service"""
+    global _service
+    if _service is None:
+        _service = ReportService()
+    return _service
@@ -390,6 +390,7 @@ class EligibilityResponse(BaseModel):
     approval_probability: Optional[float] = None
     credit_rating: Optional[str] = None
     income_to_emi_ratio: Optional[float] = None
+    recommended_tenure: Optional[int] = None  # Tenure (months) that allows max_eligible_amount
 
 
 # =============================================================================
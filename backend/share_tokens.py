@@ -0,0 +1,253 @@
+"""
+Share Tokens - expiring tokens behind the QR report links.
+
+/loan-application/{id}/report-qr issues a token and /shared-report/{token}
+resolves it. Tokens used to live in a dict in main.py. That dict was
+never swept, was lost on restart and was private to one worker, so a QR
+generated on one worker was a 404 on the next.
+
+TokenStore is the interface; SHARE_TOKEN_STORE picks the implementation:
+- "db" (default): DBTokenStore, the report_share_tokens table. Works across
+  workers and restarts. Only sha256(token) is stored and it is the primary
+  key, so a lookup is a single-row key probe. expires_at is indexed, and
+  sweep() deletes expired rows in batches of SHARE_TOKEN_SWEEP_BATCH.
+- "memory": MemoryTokenStore, for single-node dev. A dict gives O(1)
+  lookups, and a heap ordered by expiry drops expired tokens on every
+  issue() and sweep(). It holds at most SHARE_TOKEN_MAX_ENTRIES tokens;
+  when full, the token closest to expiry is evicted.
+
+Tokens are valid for SHARE_TOKEN_TTL_HOURS (default 24). An expired token
+that has not been swept yet still resolves, so the endpoint can answer 410
+rather than 404. sweep_loop() runs sweep() every SHARE_TOKEN_SWEEP_INTERVAL
+seconds (default 600) as a startup task.
+"""
+
+import asyncio
+import hashlib
+import heapq
+import os
+import secrets
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, insert, select
+
+import database
+import models
+
+SHARE_TOKEN_STORE = os.getenv("SHARE_TOKEN_STORE", "db").lower()
+SHARE_TOKEN_TTL_HOURS = float(os.getenv("SHARE_TOKEN_TTL_HOURS", "24"))
+SHARE_TOKEN_MAX_ENTRIES = int(os.getenv("SHARE_TOKEN_MAX_ENTRIES", "10000"))
+SHARE_TOKEN_SWEEP_INTERVAL = float(os.getenv("SHARE_TOKEN_SWEEP_INTERVAL", "600"))
+SHARE_TOKEN_SWEEP_BATCH = int(os.getenv("SHARE_TOKEN_SWEEP_BATCH", "1000"))
+
+
+class ShareToken:
+    """A resolved token: which application it shares and until when"""
+
+    __slots__ = ("application_id", "expires_at")
+
+    def __init__(self, application_id, expires_at: datetime):
+        self.application_id = application_id
+        self.expires_at = expires_at
+
+    @property
+    def expired(self) -> bool:
+        return datetime.now(timezone.utc) >= self.expires_at
+
+
+def hash_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class TokenStore(ABC):
+    """Issues and resolves share tokens"""
+
+    def __init__(self, ttl: timedelta = timedelta(hours=SHARE_TOKEN_TTL_HOURS)):
+        self.ttl = ttl
+        self.issued = 0
+        self.resolved = 0
+        self.misses = 0
+        self.revoked = 0
+        self.swept = 0
+
+    async def issue(self, application_id) -> Tuple[str, datetime]:
+        """New token for the application -> (token, expires_at)"""
+        token = secrets.token_urlsafe(32)
+        expires_at = datetime.now(timezone.utc) + self.ttl
+        await self._put(hash_token(token), application_id, expires_at)
+        self.issued += 1
+        return token, expires_at
+
+    async def resolve(self, token: str) -> Optional[ShareToken]:
+        """The token's entry (possibly expired but not yet swept), or None"""
+        entry = await self._get(hash_token(token))
+        if entry is None:
+            self.misses += 1
+        else:
+            self.resolved += 1
+        return entry
+
+    async def revoke(self, token: str):
+        await self._delete(hash_token(token))
+        self.revoked += 1
+
+    async def sweep(self) -> int:
+        """Delete expired tokens; returns how many were removed"""
+        removed = await self._sweep(datetime.now(timezone.utc))
+        self.swept += removed
+        return removed
+
+    @abstractmethod
+    async def _put(self, key: str, application_id, expires_at: datetime):
+        ...
+
+    @abstractmethod
+    async def _get(self, key: str) -> Optional[ShareToken]:
+        ...
+
+    @abstractmethod
+    async def _delete(self, key: str):
+        ...
+
+    @abstractmethod
+    async def _sweep(self, now: datetime) -> int:
+        ...
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "store": type(self).__name__,
+            "ttl_seconds": self.ttl.total_seconds(),
+            "issued": self.issued,
+            "resolved": self.resolved,
+            "misses": self.misses,
+            "revoked": self.revoked,
+            "swept": self.swept,
+        }
+
+
+class MemoryTokenStore(TokenStore):
+    """Bounded in-process store (single worker only)"""
+
+    def __init__(self, max_entries: int = SHARE_TOKEN_MAX_ENTRIES, **kwargs):
+        super().__init__(**kwargs)
+        self.max_entries = max(1, max_entries)
+        self._entries: Dict[str, ShareToken] = {}
+        # (expires_at, key); entries of revoked tokens are skipped when popped
+        self._heap: List[Tuple[datetime, str]] = []
+        self.evictions = 0
+
+    def _pop_while(self, condition) -> int:
+        removed = 0
+        while self._heap and condition(self._heap[0][0]):
+            expires_at, key = heapq.heappop(self._heap)
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at == expires_at:
+                del self._entries[key]
+                removed += 1
+        return removed
+
+    async def _put(self, key: str, application_id, expires_at: datetime):
+        self._pop_while(lambda expiry: expiry <= datetime.now(timezone.utc))
+        while len(self._entries) >= self.max_entries and self._heap:
+            # Full of live tokens: give up the one closest to expiry
+            expiry, victim = heapq.heappop(self._heap)
+            entry = self._entries.get(victim)
+            if entry is not None and entry.expires_at == expiry:
+                del self._entries[victim]
+                self.evictions += 1
+        self._entries[key] = ShareToken(application_id, expires_at)
+        heapq.heappush(self._heap, (expires_at, key))
+        if len(self._heap) > 2 * self.max_entries:
+            # Too many stale heap entries from revoked tokens
+            self._heap = [(entry.expires_at, k) for k, entry in self._entries.items()]
+            heapq.heapify(self._heap)
+
+    async def _get(self, key: str) -> Optional[ShareToken]:
+        return self._entries.get(key)
+
+    async def _delete(self, key: str):
+        self._entries.pop(key, None)
+
+    async def _sweep(self, now: datetime) -> int:
+        return self._pop_while(lambda expiry: expiry <= now)
+
+    def metrics(self) -> Dict[str, Any]:
+        metrics = super().metrics()
+        metrics["entries"] = len(self._entries)
+        metrics["max_entries"] = self.max_entries
+        metrics["evictions"] = self.evictions
+        return metrics
+
+
+class DBTokenStore(TokenStore):
+    """report_share_tokens table, shared by every worker"""
+
+    def __init__(self, engine=None, sweep_batch: int = SHARE_TOKEN_SWEEP_BATCH, **kwargs):
+        super().__init__(**kwargs)
+        self.engine = engine or database.engine
+        self.sweep_batch = max(1, sweep_batch)
+
+    async def _put(self, key: str, application_id, expires_at: datetime):
+        if not isinstance(application_id, uuid.UUID):
+            application_id = uuid.UUID(str(application_id))
+        async with self.engine.begin() as conn:
+            await conn.execute(insert(models.ReportShareToken).values(
+                token_hash=key, application_id=application_id, expires_at=expires_at
+            ))
+
+    async def _get(self, key: str) -> Optional[ShareToken]:
+        table = models.ReportShareToken
+        async with self.engine.connect() as conn:
+            row = (await conn.execute(
+                select(table.application_id, table.expires_at).where(table.token_hash == key)
+            )).first()
+        if row is None:
+            return None
+        expires_at = row.expires_at
+        if expires_at.tzinfo is None:
+            # SQLite hands back naive datetimes; they were written as UTC
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        return ShareToken(row.application_id, expires_at)
+
+    async def _delete(self, key: str):
+        async with self.engine.begin() as conn:
+            await conn.execute(delete(models.ReportShareToken).where(models.ReportShareToken.token_hash == key))
+
+    async def _sweep(self, now: datetime) -> int:
+        table = models.ReportShareToken
+        removed = 0
+        while True:
+            # Bounded batches keep each delete (and its locks) short
+            expired = select(table.token_hash).where(table.expires_at <= now).limit(self.sweep_batch)
+            async with self.engine.begin() as conn:
+                result = await conn.execute(delete(table).where(table.token_hash.in_(expired)))
+            removed += result.rowcount
+            if result.rowcount < self.sweep_batch:
+                return removed
+
+
+async def sweep_loop():
+    """Startup task: delete expired share tokens for as long as the app runs"""
+    while True:
+        await asyncio.sleep(SHARE_TOKEN_SWEEP_INTERVAL)
+        try:
+            removed = await get_share_token_store().sweep()
+            if removed:
+                print(f"[ShareTokens] Swept {removed} expired tokens")
+        except Exception as e:
+            print(f"[ShareTokens] Sweep failed: {e}")
+
+
+# Singleton instance
+_store = None
+
+
+def get_share_token_store() -> TokenStore:
+    """Get or create the configured share token store"""
+    global _store
+    if _store is None:
+        _store = MemoryTokenStore() if SHARE_TOKEN_STORE == "memory" else DBTokenStore()
+    return _store
@@ -0,0 +1,142 @@
+"""
+Test /activity/dashboard on SQLite: the single window-function query gives
+the same totals, recent events, last login and session count as the old
+per-category queries, and log_audit() drops the cached dashboard
+"""
+import asyncio
+import tempfile
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, select
+
+import main
+import models
+from activity_cache import get_activity_cache
+from audit_pipeline import build_row, get_audit_pipeline
+from test_eligibility import _api
+
+Log = models.AuditLog
+CATEGORIES = ["SECURITY", "LOAN", "KYC", "PAYMENT", "PROFILE"]
+# (category, action) per event, oldest first; KYC is left empty on purpose
+EVENTS = (
+    [("SECURITY", models.AuditAction.LOGIN_SUCCESS)] * 3
+    + [("SECURITY", models.AuditAction.LOGIN_FAILED)] * 5
+    + [("LOAN", "LOAN_APPLIED")] * 3
+    + [("PAYMENT", "EMI_PAID")] * 6
+    + [("PROFILE", "PROFILE_UPDATED")]
+    + [("SYSTEM", "SOMETHING_ELSE")] * 2
+)
+
+
+async def _seed(sessions, user_id):
+    other_id = uuid.uuid4()
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    async with sessions() as db:
+        db.add(models.User(id=other_id, mobile_number="9000000009", password_hash="x"))
+        for n, (category, action) in enumerate(EVENTS):
+            db.add(Log(
+                user_id=user_id, action=action, event_category=category, description=f"event {n}",
+                created_at=start + timedelta(minutes=7 * n), location_city=f"City {n}", location_country="India"
+            ))
+            # The same events for another user must not show up
+            db.add(Log(user_id=other_id, action=action, event_category=category, created_at=start + timedelta(minutes=7 * n)))
+        for active in (True, True, False):
+            db.add(models.UserSession(user_id=user_id, is_active=active))
+        await db.commit()
+
+
+async def _old_dashboard(sessions, user_id):
+    """The per-category queries the endpoint used before the window-function rewrite"""
+    async with sessions() as db:
+        dashboard = {}
+        for category in CATEGORIES:
+            logs = (await db.execute(
+                select(Log).where(Log.user_id == user_id, Log.event_category == category)
+                .order_by(Log.created_at.desc()).limit(5)
+            )).scalars().all()
+            total = (await db.execute(
+                select(func.count(Log.id)).where(Log.user_id == user_id, Log.event_category == category)
+            )).scalar()
+            dashboard[category.lower()] = {
+                "total": total,
+                "recent": [
+                    {"action": log.action, "description": log.description, "severity": log.severity,
+                     "timestamp": log.created_at.isoformat()}
+                    for log in logs
+                ],
+            }
+        last_login = (await db.execute(
+            select(Log).where(Log.user_id == user_id, Log.action == models.AuditAction.LOGIN_SUCCESS)
+            .order_by(Log.created_at.desc()).limit(1)
+        )).scalars().first()
+        active_sessions = (await db.execute(
+            select(func.count(models.UserSession.id)).where(
+                models.UserSession.user_id == user_id, models.UserSession.is_active == True
+            )
+        )).scalar()
+    return {
+        "user_id": str(user_id),
+        "last_login": last_login.created_at.isoformat() if last_login else None,
+        "last_login_location": f"{last_login.location_city}, {last_login.location_country}" if last_login else None,
+        "active_sessions": active_sessions,
+        "categories": dashboard,
+    }
+
+
+def test_single_query_matches_per_category_queries():
+    async def run(tmp):
+        async with _api(tmp) as (sessions, user_id, client):
+            get_activity_cache().invalidate(user_id)
+            empty = (await client.get("/activity/dashboard")).json()
+            get_activity_cache().invalidate(user_id)
+            await _seed(sessions, user_id)
+            response = await client.get("/activity/dashboard")
+            assert response.status_code == 200, response.text
+            return empty, response.json(), await _old_dashboard(sessions, user_id)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        empty, new, old = asyncio.run(run(tmp))
+
+    assert empty["last_login"] is None and empty["active_sessions"] == 0
+    assert all(entry == {"total": 0, "recent": []} for entry in empty["categories"].values())
+    assert new == old
+    assert new["categories"]["security"]["total"] == 8 and len(new["categories"]["security"]["recent"]) == 5
+    assert new["categories"]["kyc"] == {"total": 0, "recent": []}
+    assert new["active_sessions"] == 2 and new["last_login_location"] == "City 2, India"
+    print("PASS: one-query dashboard matches the per-category queries")
+
+
+def test_log_audit_invalidates_cached_dashboard():
+    async def run(tmp):
+        async with _api(tmp) as (sessions, user_id, client):
+            cache = get_activity_cache()
+            first = (await client.get("/activity/dashboard")).json()
+            hits = cache.hits
+            assert (await client.get("/activity/dashboard")).json() == first
+            assert cache.hits == hits + 1 and cache.get(user_id) is not None
+
+            pipeline = get_audit_pipeline()
+            queued = len(pipeline._queue)
+            await main.log_audit(None, user_id, models.AuditAction.PROFILE_UPDATED, description="changed email")
+            assert len(pipeline._queue) == queued + 1
+            event = pipeline._queue.pop()  # never written: this pipeline isn't running
+
+            assert cache.get(user_id) is None
+            # Once the event lands the endpoint rebuilds from the database
+            async with sessions() as db:
+                await db.execute(Log.__table__.insert().values(build_row(event)))
+                await db.commit()
+            return (await client.get("/activity/dashboard")).json()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        rebuilt = asyncio.run(run(tmp))
+
+    assert rebuilt["categories"]["profile"]["total"] == 1
+    assert rebuilt["categories"]["profile"]["recent"][0]["description"] == "changed email"
+    print("PASS: log_audit dropped the cached dashboard")
+
+
+if __name__ == "__main__":
+    test_single_query_matches_per_category_queries()
+    test_log_audit_invalidates_cached_dashboard()
@@ -0,0 +1,28 @@
+"""
+Test that batch scoring is the same analysis as scoring one applicant at
+a time, including rows the model cannot encode (rule-based fallback)
+"""
+from loan_advisor import get_advisor
+from test_advisor_concurrency import _applicants, _strip
+
+
+def test_batch_matches_single():
+    advisor = get_advisor()
+    rows = _applicants(count=12, seed=3)
+    rows[3] = dict(rows[3], experience='ten')  # Cannot be encoded -> rule-based score
+    rows[5] = dict(rows[5], loan_purpose='Spaceship', home_ownership_status='Houseboat')  # Unknown categories
+    rows[8] = dict(rows[8], monthly_income=0)
+    rows[10] = dict(rows[10], experience=None)
+
+    batch = [_strip(result) for result in advisor.analyze_batch(rows)]
+    single = [_strip(advisor.analyze(row)) for row in rows]
+
+    assert len(batch) == len(rows)
+    for idx, (got, expected) in enumerate(zip(batch, single)):
+        assert got == expected, f"Row {idx} differs between analyze_batch and analyze"
+    assert advisor.analyze_batch([]) == []
+    print(f"PASS: analyze_batch matches analyze for {len(rows)} mixed rows")
+
+
+if __name__ == "__main__":
+    test_batch_matches_single()
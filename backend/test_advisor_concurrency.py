@@ -0,0 +1,107 @@
+"""
+Concurrency stress test: a shared LoanAdvisor must give every thread the
+result (and SHAP explanations) for its own applicant
+"""
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import loan_advisor
+import model_registry
+from loan_advisor import get_advisor
+
+THREADS = 16
+ROUNDS = 8
+
+
+def _applicants(count=40, seed=7):
+    rng = random.Random(seed)
+    applicants = []
+    for _ in range(count):
+        applicants.append({
+            'age': rng.randint(21, 65),
+            'employment_status': rng.choice(['Employed', 'Self-Employed']),
+            'education_level': rng.choice(['High School', 'Associate', 'Bachelor', 'Master', 'PhD']),
+            'experience': rng.randint(0, 30),
+            'job_tenure': rng.randint(0, 15),
+            'monthly_income': rng.randint(10000, 300000),
+            'monthly_debt_payments': rng.randint(0, 20000),
+            'loan_amount': rng.randint(50000, 5000000),
+            'loan_duration': rng.choice([12, 36, 60, 120]),
+            'loan_purpose': rng.choice(['Personal', 'Education', 'Medical', 'Venture', 'Home Improvement']),
+            'home_ownership_status': rng.choice(['Own', 'Rent', 'Mortgage']),
+            'cibil_score': rng.randint(450, 880),
+        })
+    return applicants
+
+
+def _strip(result):
+    result = dict(result)
+    result.pop('application_date', None)
+    return result
+
+
+def test_concurrent_analyze_matches_sequential():
+    advisor = get_advisor()
+    applicants = _applicants()
+    expected = [_strip(advisor.analyze(a)) for a in applicants]
+
+    jobs = list(range(len(applicants))) * ROUNDS
+    random.Random(1).shuffle(jobs)
+
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        results = list(pool.map(lambda idx: (idx, _strip(advisor.analyze(applicants[idx]))), jobs))
+
+    mismatches = [idx for idx, result in results if result != expected[idx]]
+    assert not mismatches, f"{len(mismatches)} of {len(results)} concurrent results did not match their input"
+    print(f"PASS: {len(results)} concurrent analyses matched their inputs")
+
+
+def test_get_advisor_creates_one_instance():
+    loan_advisor._advisor = None
+    listeners = len(model_registry._reload_listeners)
+    barrier = threading.Barrier(THREADS)
+
+    def create(_):
+        barrier.wait()
+        return get_advisor()
+
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        advisors = list(pool.map(create, range(THREADS)))
+
+    assert len({id(a) for a in advisors}) == 1
+    assert len(model_registry._reload_listeners) == listeners + 1
+    print(f"PASS: {THREADS} racing threads got one advisor")
+
+
+def test_analyze_batch_during_reload_matches_sequential():
+    advisor = get_advisor()
+    applicants = _applicants(count=16, seed=21)
+    batches = [applicants[i:i + 4] for i in range(0, len(applicants), 4)]
+    expected = [[_strip(r) for r in advisor.analyze_batch(batch)] for batch in batches]
+
+    stop = threading.Event()
+
+    def reload_repeatedly():
+        while not stop.is_set():
+            model_registry.reload_model_bundle()
+
+    reloader = threading.Thread(target=reload_repeatedly)
+    reloader.start()
+    try:
+        jobs = list(range(len(batches))) * ROUNDS
+        with ThreadPoolExecutor(max_workers=THREADS) as pool:
+            results = list(pool.map(lambda idx: (idx, [_strip(r) for r in advisor.analyze_batch(batches[idx])]), jobs))
+    finally:
+        stop.set()
+        reloader.join()
+
+    mismatches = [idx for idx, result in results if result != expected[idx]]
+    assert not mismatches, f"{len(mismatches)} batches changed across a reload of the same artifacts"
+    print(f"PASS: {len(results)} batches stayed consistent while the bundle reloaded")
+
+
+if __name__ == "__main__":
+    test_concurrent_analyze_matches_sequential()
+    test_get_advisor_creates_one_instance()
+    test_analyze_batch_during_reload_matches_sequential()
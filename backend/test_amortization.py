@@ -0,0 +1,66 @@
+"""
+Test the amortization engine: schedules add up to the paisa, agree with the
+closed-form totals and use calendar-correct due dates
+"""
+from datetime import date
+
+import numpy as np
+
+import amortization
+
+
+def test_schedule_rows_add_up():
+    rng = np.random.default_rng(0)
+    principal = rng.uniform(10000, 5000000, 300).round(2)
+    rate = rng.choice([0.0, 10.5, 12.5, 13.75, 18.0], 300)
+    tenure = rng.choice([1, 6, 12, 36, 60, 120, 240], 300)
+
+    plan = amortization.portfolio_schedule(principal, rate, tenure)
+    totals = amortization.totals(principal, rate, tenure)
+
+    assert len(plan) == tenure.sum()
+    assert np.array_equal(plan.emi_paise, plan.principal_paise + plan.interest_paise)
+    assert np.array_equal(np.bincount(plan.loan_index, weights=plan.principal_paise).astype(np.int64),
+                          amortization.to_paise(principal))
+    assert np.array_equal(np.bincount(plan.loan_index, weights=plan.emi_paise) / 100, totals['total_repayment'])
+    assert (plan.interest_paise >= 0).all()
+    assert (plan.outstanding_paise[plan.emi_number == tenure[plan.loan_index]] == 0).all()
+
+    # Every installment but the last is the EMI
+    not_last = plan.emi_number < tenure[plan.loan_index]
+    assert np.array_equal(plan.emi_paise[not_last], amortization.to_paise(totals['emi'])[plan.loan_index][not_last])
+    print("PASS: schedules add up to the paisa")
+
+
+def test_single_loan_matches_recurrence():
+    plan = amortization.schedule(500000, 12.5, 36)
+    monthly_rate = 12.5 / 1200
+    emi = plan.emi_paise[0]
+    balance = 50000000
+    for row in range(35):
+        interest = plan.interest_paise[row]
+        assert abs(interest - balance * monthly_rate) <= 1  # Within a paisa of the running balance
+        balance -= emi - interest
+        assert abs(balance - plan.outstanding_paise[row]) <= 1
+    print("PASS: closed-form balances track the running recurrence")
+
+
+def test_due_dates_follow_calendar_months():
+    rows = amortization.schedule(100000, 12.0, 14, date(2023, 1, 31)).to_rows()
+    due = [row["due_date"] for row in rows]
+    assert due[:3] == [date(2023, 2, 28), date(2023, 3, 31), date(2023, 4, 30)]
+    assert due[12] == date(2024, 2, 29)
+    assert rows[0]["emi_number"] == 1 and rows[-1]["emi_number"] == 14
+    print("PASS: due dates are calendar months clamped to month end")
+
+
+def test_rounding_is_half_up():
+    assert amortization.to_paise([1.005, 2.675, 0.125, -0.0]).tolist() == [101, 268, 13, 0]
+    print("PASS: half-up paise rounding")
+
+
+if __name__ == "__main__":
+    test_schedule_rows_add_up()
+    test_single_loan_matches_recurrence()
+    test_due_dates_follow_calendar_months()
+    test_rounding_is_half_up()
@@ -0,0 +1,133 @@
+"""
+Test the audit pipeline against a throwaway SQLite database: events are
+written in batches, spooled while the table is unavailable and replayed
+once it is back, and drained on stop()
+"""
+import asyncio
+import glob
+import os
+import tempfile
+import uuid
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+import models
+from audit_pipeline import AuditPipeline, capture_event
+
+
+async def _setup(tmp, create_tables=True):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tmp, 'audit.db')}")
+    user_id = uuid.uuid4()
+    if create_tables:
+        async with engine.begin() as conn:
+            await conn.run_sync(lambda sync: models.Base.metadata.create_all(
+                sync, tables=[models.User.__table__, models.AuditLog.__table__]
+            ))
+            await conn.execute(models.User.__table__.insert().values(
+                id=user_id, mobile_number="9000000000", password_hash="x"
+            ))
+    return engine, user_id
+
+
+async def _count(engine):
+    async with engine.connect() as conn:
+        return (await conn.execute(select(func.count()).select_from(models.AuditLog.__table__))).scalar()
+
+
+def _events(user_id, count):
+    return [capture_event(user_id, models.AuditAction.LOGIN_SUCCESS, metadata={"n": n}) for n in range(count)]
+
+
+def test_batches_and_invalidates():
+    async def run(tmp):
+        engine, user_id = await _setup(tmp)
+        invalidated = []
+        pipeline = AuditPipeline(engine, batch_size=50, flush_interval=0.05, spool_dir=tmp,
+                                 on_written=invalidated.extend)
+        pipeline.start()
+        for event in _events(user_id, 120):
+            pipeline.enqueue(event)
+        await asyncio.sleep(0.5)
+
+        assert await _count(engine) == 120
+        assert pipeline.metrics()["batches"] == 3
+        assert set(invalidated) == {user_id}
+
+        async with engine.connect() as conn:
+            row = (await conn.execute(select(models.AuditLog.__table__).limit(1))).mappings().first()
+        assert row["event_category"] == "SECURITY" and row["description"] == models.AuditAction.LOGIN_SUCCESS
+
+        await pipeline.stop()
+        await engine.dispose()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(run(tmp))
+    print("PASS: events written in multi-row batches")
+
+
+def test_spools_and_replays():
+    async def run(tmp):
+        engine, user_id = await _setup(tmp, create_tables=False)
+        pipeline = AuditPipeline(engine, batch_size=50, spool_dir=tmp)
+        for event in _events(user_id, 70):
+            pipeline.enqueue(event)
+        # No audit_logs table yet: every batch lands in the spool file
+        await pipeline.flush()
+        assert pipeline.metrics()["spooled"] == 70
+        assert sum(1 for _ in open(pipeline.spool_path)) == 70
+
+        engine, user_id = await _setup(tmp)
+        pipeline.engine = engine
+        await pipeline._replay_spool(force=True)
+        assert await _count(engine) == 70
+        assert pipeline.metrics()["replayed"] == 70
+        assert not glob.glob(os.path.join(tmp, "audit_spool.*"))
+        await engine.dispose()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(run(tmp))
+    print("PASS: spooled events replayed once the database is back")
+
+
+def test_rejected_row_does_not_block_batch():
+    async def run(tmp):
+        engine, user_id = await _setup(tmp)
+        pipeline = AuditPipeline(engine, batch_size=10, spool_dir=tmp)
+        events = _events(user_id, 9)
+        duplicate = dict(events[0])
+        for event in events + [duplicate]:
+            pipeline.enqueue(event)
+        await pipeline.flush()
+
+        assert await _count(engine) == 9
+        assert pipeline.metrics()["rejected"] == 1
+        assert sum(1 for _ in open(pipeline.rejected_path)) == 1
+        await engine.dispose()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(run(tmp))
+    print("PASS: a rejected row is set aside, the rest of its batch is written")
+
+
+def test_stop_drains_queue():
+    async def run(tmp):
+        engine, user_id = await _setup(tmp)
+        pipeline = AuditPipeline(engine, batch_size=500, flush_interval=60, spool_dir=tmp)
+        pipeline.start()
+        for event in _events(user_id, 30):
+            pipeline.enqueue(event)
+        await pipeline.stop()
+        assert await _count(engine) == 30
+        await engine.dispose()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(run(tmp))
+    print("PASS: stop() drains queued events")
+
+
+if __name__ == "__main__":
+    test_batches_and_invalidates()
+    test_spools_and_replays()
+    test_rejected_row_does_not_block_batch()
+    test_stop_drains_queue()
@@ -0,0 +1,93 @@
+"""
+Test the micro-batcher: concurrent submits coalesce into capped
+analyze_batch calls, every caller gets its own result, and one bad row
+does not fail the rest of its batch
+"""
+import asyncio
+
+import inference_executor
+from batch_scheduler import MicroBatcher
+from loan_advisor import get_advisor
+from test_advisor_concurrency import _applicants, _strip
+
+
+class RecordingExecutor(inference_executor.InferenceExecutor):
+    """Real thread executor that remembers the size of every batch it ran"""
+
+    def __init__(self):
+        super().__init__(kind="thread", workers=2, max_queue=64)
+        self.batch_sizes = []
+
+    async def run(self, fn, *args):
+        if fn is inference_executor.analyze_batch:
+            self.batch_sizes.append(len(args[0]))
+        return await super().run(fn, *args)
+
+
+def _run_with(executor, coroutine):
+    previous = inference_executor._executor
+    inference_executor._executor = executor
+    try:
+        return asyncio.run(coroutine)
+    finally:
+        inference_executor._executor = previous
+        executor.shutdown()
+
+
+def test_concurrent_submits_coalesce_and_map_back():
+    applicants = _applicants(count=40, seed=5)
+    expected = [_strip(get_advisor().analyze(a)) for a in applicants]
+    batcher = MicroBatcher(window_ms=50, max_rows=32)
+    executor = RecordingExecutor()
+
+    async def burst():
+        return await asyncio.gather(*(batcher.submit(a) for a in applicants))
+
+    results = _run_with(executor, burst())
+
+    # 40 callers -> one full batch of 32 plus the 8 left when the window closed
+    assert executor.batch_sizes == [32, 8], executor.batch_sizes
+    assert batcher.batches == 2 and batcher.largest_batch == 32
+    assert [_strip(r) for r in results] == expected
+    print(f"PASS: 40 concurrent submits ran as batches {executor.batch_sizes}, results mapped back")
+
+
+def test_small_burst_is_one_executor_call():
+    applicants = _applicants(count=5, seed=9)
+    batcher = MicroBatcher(window_ms=50, max_rows=32)
+    executor = RecordingExecutor()
+
+    async def burst():
+        return await asyncio.gather(*(batcher.submit(a) for a in applicants))
+
+    results = _run_with(executor, burst())
+    assert executor.batch_sizes == [5]
+    assert [r['loan_details'] for r in results] == [get_advisor().analyze(a)['loan_details'] for a in applicants]
+    print("PASS: 5 concurrent submits shared one executor call")
+
+
+def test_failing_row_does_not_fail_batch_mates():
+    applicants = _applicants(count=6, seed=13)
+    bad = dict(applicants[2], cibil_score='n/a')  # analyze() raises on this row
+    rows = applicants[:2] + [bad] + applicants[3:]
+    expected = {i: _strip(get_advisor().analyze(a)) for i, a in enumerate(rows) if a is not bad}
+    batcher = MicroBatcher(window_ms=50, max_rows=32)
+    executor = RecordingExecutor()
+
+    async def burst():
+        return await asyncio.gather(*(batcher.submit(a) for a in rows), return_exceptions=True)
+
+    results = _run_with(executor, burst())
+
+    assert isinstance(results[2], Exception)
+    assert {i: _strip(r) for i, r in enumerate(results) if i != 2} == expected
+    # The whole batch failed once, then every row was retried on its own
+    assert batcher.isolated_retries == 1
+    assert executor.batch_sizes == [6] + [1] * 6
+    print("PASS: the bad row failed alone, its 5 batch-mates got their results")
+
+
+if __name__ == "__main__":
+    test_concurrent_submits_coalesce_and_map_back()
+    test_small_burst_is_one_executor_call()
+    test_failing_row_does_not_fail_batch_mates()
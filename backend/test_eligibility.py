@@ -0,0 +1,115 @@
+"""
+Test the max-eligible-amount solver: the amount it returns is APPROVED, one
+rounding step more is not (unless the search ceiling was reached), and
+/eligibility reports the solver's answer rather than a fixed multiple of
+the requested amount
+"""
+import asyncio
+import contextlib
+import os
+import tempfile
+import uuid
+
+import httpx
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import auth
+import database
+import main
+import models
+from loan_advisor import LoanAdvisor, get_advisor
+from test_advisor_concurrency import _applicants
+from warmup import WARMUP_PROFILE
+
+
+@contextlib.asynccontextmanager
+async def _api(tmp, role="customer"):
+    """The FastAPI app on a throwaway SQLite database, authenticated as a new user"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tmp, 'api.db')}")
+    async with engine.begin() as conn:
+        await conn.run_sync(models.Base.metadata.create_all)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+
+    user_id = uuid.uuid4()
+    async with sessions() as db:
+        db.add(models.User(id=user_id, role=role, mobile_number=str(uuid.uuid4().int)[:10], password_hash="x"))
+        await db.commit()
+
+    async def get_db():
+        async with sessions() as session:
+            yield session
+
+    main.app.dependency_overrides[database.get_db] = get_db
+    token = auth.create_access_token({"user_id": str(user_id), "role": role})
+    client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=main.app), base_url="http://test",
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    try:
+        yield sessions, user_id, client
+    finally:
+        await client.aclose()
+        main.app.dependency_overrides.pop(database.get_db, None)
+        await engine.dispose()
+
+
+def _approved(advisor, user_input, amount, tenure):
+    return advisor.analyze({**user_input, 'loan_amount': amount, 'loan_duration': tenure})['decision'] == "APPROVED"
+
+
+def test_max_eligible_is_tight():
+    advisor = get_advisor()
+    step = LoanAdvisor.ELIGIBILITY_ROUNDING
+    solved = 0
+    for user_input in _applicants(count=30, seed=17):
+        result = advisor.max_eligible_amount(user_input)
+        amount, tenure = result['max_eligible_amount'], result['recommended_tenure']
+        if amount <= 0:
+            assert tenure is None
+            continue
+        solved += 1
+        upper = max(user_input['loan_amount'] * 3, user_input['monthly_income'] * 120)
+        assert amount % step == 0
+        assert _approved(advisor, user_input, amount, tenure), (user_input, result)
+        assert amount + step > upper or not _approved(advisor, user_input, amount + step, tenure), (user_input, result)
+    assert solved >= 10
+    print(f"PASS: {solved} solved amounts approved, one rounding step more rejected")
+
+
+def test_eligibility_endpoint_uses_solver():
+    features = dict(WARMUP_PROFILE)
+    expected = get_advisor().max_eligible_amount(features)
+    assert expected['max_eligible_amount'] > 0
+
+    async def run(tmp):
+        async with _api(tmp) as (sessions, user_id, client):
+            async with sessions() as db:
+                application = models.LoanApplication(
+                    user_id=user_id, features_json=features,
+                    loan_amount=features['loan_amount'], loan_duration=features['loan_duration'],
+                    monthly_income=features['monthly_income']
+                )
+                db.add(application)
+                await db.flush()
+                db.add(models.LoanPrediction(
+                    application_id=application.id, approval_probability=82.0, ml_probability=0.82,
+                    decision="APPROVED", interest_rate=11.5, emi=11000, total_repayment=660000,
+                    total_interest=160000, credit_rating="Good"
+                ))
+                await db.commit()
+            response = await client.get("/eligibility")
+            assert response.status_code == 200, response.text
+            return response.json()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        body = asyncio.run(run(tmp))
+
+    assert body['max_eligible_amount'] == expected['max_eligible_amount']
+    assert body['recommended_tenure'] == expected['recommended_tenure']
+    assert body['max_eligible_amount'] != features['loan_amount'] * 1.5
+    print(f"PASS: /eligibility reports the solved {body['max_eligible_amount']:.0f} over {body['recommended_tenure']} months")
+
+
+if __name__ == "__main__":
+    test_max_eligible_is_tight()
+    test_eligibility_endpoint_uses_solver()
@@ -0,0 +1,54 @@
+"""
+Test the explanation engine: native TreeSHAP matches shap, top-k selection
+matches the original full sort
+"""
+import numpy as np
+
+from explanation_engine import ExplanationEngine
+from model_registry import get_model_bundle
+from test_feature_encoder import random_rows
+
+
+def _reference_top(values, k):
+    """Original selection: stable descending sort of significant features"""
+    magnitudes = np.abs(values)
+    significant = [i for i in range(len(values)) if magnitudes[i] > 0.0001]
+    if significant:
+        return sorted(significant, key=lambda i: magnitudes[i], reverse=True)[:k]
+    return sorted(range(len(values)), key=lambda i: magnitudes[i], reverse=True)[:5]
+
+
+def test_top_k_matches_full_sort():
+    engine = ExplanationEngine(get_model_bundle())
+    rng = np.random.default_rng(0)
+    for _ in range(1000):
+        # Few distinct values so ties are common
+        values = rng.choice([-0.5, -0.2, 0.0, 0.00005, 0.2, 0.3, 0.5], size=len(engine.feature_names)).astype(np.float32)
+        factors = engine.explain(values, {})
+        expected = _reference_top(values, engine.top_k)
+        assert [f["shap_value"] for f in factors] == [float(round(abs(values[i]), 6)) for i in expected]
+    print("PASS: argpartition top-k matches stable full sort")
+
+
+def test_native_matches_shap():
+    try:
+        import shap  # noqa: F401
+    except ImportError:
+        print("SKIP: shap not installed")
+        return
+
+    bundle = get_model_bundle()
+    native = ExplanationEngine(bundle, backend="native")
+    reference = ExplanationEngine(bundle, backend="shap")
+    assert native.backend == "native" and reference.backend == "shap"
+
+    rows = random_rows(200)
+    features = bundle.encoder.encode_rows(rows)
+    assert np.array_equal(native.contributions(features), reference.contributions(features))
+    assert native.explain_rows(features, rows) == reference.explain_rows(features, rows)
+    print("PASS: pred_contribs explanations identical to shap.TreeExplainer")
+
+
+if __name__ == "__main__":
+    test_top_k_matches_full_sort()
+    test_native_matches_shap()
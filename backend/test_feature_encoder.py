@@ -0,0 +1,91 @@
+"""
+Test that FeatureEncoder matches the original pandas preprocessing bit for bit
+"""
+import os
+import random
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from feature_encoder import FeatureEncoder
+
+BASE_DIR = os.path.dirname(__file__)
+
+
+def _load_artifacts():
+    model_data = joblib.load(os.path.join(BASE_DIR, "loan_model.joblib"))
+    encoder_data = joblib.load(os.path.join(BASE_DIR, "loan_encoders.joblib"))
+    return model_data, encoder_data
+
+
+def pandas_encode(rows, encoder_data, feature_names):
+    """The per-request DataFrame path FeatureEncoder replaces"""
+    ohe = encoder_data['ohe']
+    scaler = encoder_data['scaler']
+    cat_columns = encoder_data['cat_columns']
+    num_columns = encoder_data['num_columns']
+
+    raw_data = pd.DataFrame(rows)
+    encoded = ohe.transform(raw_data[cat_columns])
+    df_ohe = pd.DataFrame(encoded, columns=ohe.get_feature_names_out(cat_columns))
+    df_num_scaled = pd.DataFrame(scaler.transform(raw_data[num_columns]), columns=num_columns)
+
+    input_data = pd.concat([df_ohe, df_num_scaled], axis=1)
+    for col in feature_names:
+        if col not in input_data.columns:
+            input_data[col] = 0
+    return input_data[feature_names]
+
+
+def random_rows(count, seed=42):
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(count):
+        age = float(rng.randint(20, 70))
+        income = float(rng.randint(5000, 500000)) * 12
+        loan = float(rng.randint(10000, 5000000))
+        rows.append({
+            # Includes values the OHE has never seen ('High School', 'PhD')
+            'person_education': rng.choice(['High School', 'Associate', 'Bachelor', 'Master', 'PhD', 'Doctorate']),
+            'person_home_ownership': rng.choice(['OWN', 'RENT', 'MORTGAGE', 'OTHER']),
+            'loan_intent': rng.choice(['PERSONAL', 'EDUCATION', 'MEDICAL', 'VENTURE', 'HOMEIMPROVEMENT', 'DEBTCONSOLIDATION']),
+            'previous_loan_defaults_on_file': rng.choice(['Yes', 'No']),
+            'person_age': age,
+            'person_income': income,
+            'person_emp_exp': rng.randint(0, 40),
+            'loan_amnt': loan,
+            'loan_percent_income': loan / income,
+            'cb_person_cred_hist_length': max(0, age - 21),
+            'credit_score': rng.randint(300, 900),
+        })
+    return rows
+
+
+def test_encoder_matches_pandas_path():
+    model_data, encoder_data = _load_artifacts()
+    feature_names = model_data['feature_names']
+    encoder = FeatureEncoder.from_artifacts(encoder_data, feature_names)
+    rows = random_rows(500)
+
+    expected = pandas_encode(rows, encoder_data, feature_names).to_numpy(dtype=np.float32)
+
+    # Batch
+    actual = encoder.encode_rows(rows)
+    assert actual.dtype == np.float32
+    assert np.array_equal(actual, expected), "Batch encoding differs from pandas path"
+
+    # Single rows, including reuse of a preallocated buffer
+    buffer = np.empty((1, encoder.n_features), dtype=np.float32)
+    for idx, row in enumerate(rows[:50]):
+        assert np.array_equal(encoder.encode_row(row, out=buffer)[0], expected[idx])
+
+    # Model sees exactly the same input
+    model = model_data['model']
+    pandas_frame = pandas_encode(rows, encoder_data, feature_names)
+    assert np.array_equal(model.predict_proba(actual), model.predict_proba(pandas_frame))
+    print("PASS: FeatureEncoder output is bit-identical to the pandas path")
+
+
+if __name__ == "__main__":
+    test_encoder_matches_pandas_path()
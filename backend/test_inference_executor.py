@@ -0,0 +1,77 @@
+"""
+Test the inference executor's bounded admission: calls beyond
+workers + max_queue are rejected (503 + Retry-After at the API), and queue
+wait is measured apart from compute time
+"""
+import asyncio
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+import inference_executor
+import main
+from inference_executor import ExecutorSaturated, InferenceExecutor
+from warmup import WARMUP_PROFILE
+
+
+def _hold(gate: threading.Event, seconds: float):
+    gate.wait(5)
+    time.sleep(seconds)
+    return seconds
+
+
+def test_rejects_beyond_workers_plus_queue():
+    async def scenario():
+        executor = InferenceExecutor(kind="thread", workers=1, max_queue=1)
+        gate = threading.Event()
+        running = asyncio.ensure_future(executor.run(_hold, gate, 0.2))
+        queued = asyncio.ensure_future(executor.run(_hold, gate, 0.05))
+        await asyncio.sleep(0.05)
+        assert executor.metrics()["in_flight"] == 2 and executor.metrics()["queued"] == 1
+
+        try:
+            await executor.run(_hold, gate, 0)
+            raise AssertionError("third call should have been rejected")
+        except ExecutorSaturated:
+            pass
+
+        gate.set()
+        await asyncio.gather(running, queued)
+        executor.shutdown()
+        return executor
+
+    executor = asyncio.run(scenario())
+    metrics = executor.metrics()
+    assert metrics["rejected"] == 1 and metrics["completed"] == 2 and metrics["in_flight"] == 0
+
+    # The first call ran at once for ~200 ms; the second waited for it, then ran ~50 ms
+    (first_wait, second_wait), (first_compute, second_compute) = executor._queue_wait, executor._compute
+    assert first_wait < 0.05 and second_wait >= 0.15
+    assert first_compute >= 0.2 and 0.05 <= second_compute < 0.15
+    print(f"PASS: 3rd call rejected; queue wait {second_wait * 1000:.0f} ms kept apart from compute")
+
+
+def test_saturated_endpoints_return_503_with_retry_after():
+    saturated = InferenceExecutor(kind="thread", workers=1, max_queue=0)
+    saturated._inflight = 1  # every slot taken
+    previous = inference_executor._executor
+    inference_executor._executor = saturated
+    try:
+        client = TestClient(main.app)
+        for path, payload in (
+            ("/loan-advisor", WARMUP_PROFILE),
+            ("/loan-advisor/batch", {"applicants": [WARMUP_PROFILE]}),
+        ):
+            response = client.post(path, json=payload)
+            assert response.status_code == 503, (path, response.status_code, response.text)
+            assert response.headers["Retry-After"] == "1"
+    finally:
+        inference_executor._executor = previous
+    assert saturated.rejected == 2
+    print("PASS: saturated executor maps to 503 + Retry-After")
+
+
+if __name__ == "__main__":
+    test_rejects_beyond_workers_plus_queue()
+    test_saturated_endpoints_return_503_with_retry_after()
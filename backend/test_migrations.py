@@ -0,0 +1,119 @@
+"""
+Test the SQL migrations. Header directives are checked everywhere; the
+fresh-database and existing-database paths need a Postgres server:
+set MIGRATIONS_TEST_DATABASE_URL (a postgresql+asyncpg URL whose user may
+create databases) to run them. Both paths must end with every migration
+recorded and the same single set of indexes.
+"""
+import asyncio
+import os
+import uuid
+
+import pytest
+from sqlalchemy import MetaData, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.engine import make_url
+
+import apply_migrations
+import audit_partitions
+import models
+
+MIGRATIONS_TEST_DATABASE_URL = os.getenv("MIGRATIONS_TEST_DATABASE_URL")
+AUDIT_COMPOSITE_INDEXES = {"ix_audit_logs_user_created", "ix_audit_logs_user_category_created", "ix_audit_logs_user_action_created"}
+
+
+def _read(name):
+    with open(os.path.join(apply_migrations.MIGRATIONS_DIR, name)) as f:
+        return f.read()
+
+
+def test_header_directives():
+    sql = _read("004_audit_logs_composite_indexes.sql")
+    options = apply_migrations.directives(sql)
+    assert "no-transaction" in options
+    assert options["skip-if"].startswith("SELECT EXISTS") and "pg_partitioned_table" in options["skip-if"]
+    assert len(apply_migrations.split_statements(sql)) == 3
+    # A directive after the header is just a comment
+    assert apply_migrations.directives("SELECT 1;\n-- migrate: no-transaction\n") == {}
+    assert apply_migrations.directives(_read("005_audit_logs_partitioning.sql")) == {}
+    print("PASS: migration header directives parsed")
+
+
+def _legacy_metadata():
+    """The schema before 004/005: audit_logs unpartitioned, without the composite indexes"""
+    metadata = MetaData()
+    for table in models.Base.metadata.sorted_tables:
+        table.to_metadata(metadata)
+    audit_logs = metadata.tables["audit_logs"]
+    audit_logs.dialect_options["postgresql"]["partition_by"] = None
+    for index in [ix for ix in audit_logs.indexes if ix.name in AUDIT_COMPOSITE_INDEXES]:
+        audit_logs.indexes.discard(index)
+    return metadata
+
+
+async def _migrate(server_url, existing: bool):
+    name = f"migrations_test_{uuid.uuid4().hex[:8]}"
+    admin = create_async_engine(server_url, isolation_level="AUTOCOMMIT")
+    async with admin.connect() as conn:
+        await conn.exec_driver_sql(f"CREATE DATABASE {name}")
+    engine = create_async_engine(make_url(server_url).set(database=name))
+    try:
+        if existing:
+            user_id = uuid.uuid4()
+            async with engine.begin() as conn:
+                await conn.run_sync(_legacy_metadata().create_all)
+                await conn.execute(models.User.__table__.insert().values(id=user_id, mobile_number="9", password_hash="x"))
+                await conn.execute(text(
+                    "INSERT INTO audit_logs (id, user_id, action, event_category, created_at) VALUES"
+                    " (gen_random_uuid(), :user_id, 'LOGIN_SUCCESS', 'SECURITY', now() - interval '40 days'),"
+                    " (gen_random_uuid(), :user_id, 'LOGIN_SUCCESS', 'SECURITY', now())"
+                ), {"user_id": user_id})
+
+        # What app startup does, then the migrations
+        async with engine.begin() as conn:
+            await conn.run_sync(models.Base.metadata.create_all)
+            await audit_partitions.ensure_partitions(conn)
+        await apply_migrations.apply_migrations(engine=engine)
+
+        async with engine.connect() as conn:
+            applied = (await conn.execute(text("SELECT name FROM schema_migrations ORDER BY name"))).scalars().all()
+            indexes = (await conn.execute(text(
+                "SELECT tablename, indexname, regexp_replace(indexdef, ' ON (ONLY )?\\S+', ' ON T')"
+                " FROM pg_indexes WHERE schemaname = current_schema()"
+                " AND tablename IN ('audit_logs', 'loan_applications', 'repayments') ORDER BY 1, 2"
+            ))).all()
+            rows = (await conn.execute(text("SELECT count(*) FROM audit_logs"))).scalar()
+            partitioned = await audit_partitions.is_partitioned(conn)
+        return applied, [tuple(row) for row in indexes], rows, partitioned
+    finally:
+        await engine.dispose()
+        async with admin.connect() as conn:
+            await conn.exec_driver_sql(f"DROP DATABASE IF EXISTS {name} WITH (FORCE)")
+        await admin.dispose()
+
+
+def test_fresh_and_existing_databases_converge():
+    if not MIGRATIONS_TEST_DATABASE_URL:
+        pytest.skip("MIGRATIONS_TEST_DATABASE_URL not set")
+
+    async def run():
+        return (await _migrate(MIGRATIONS_TEST_DATABASE_URL, existing=False),
+                await _migrate(MIGRATIONS_TEST_DATABASE_URL, existing=True))
+
+    (fresh_applied, fresh_indexes, fresh_rows, fresh_partitioned), \
+        (existing_applied, existing_indexes, existing_rows, existing_partitioned) = asyncio.run(run())
+
+    every_file = apply_migrations.migration_files()
+    assert fresh_applied == existing_applied == every_file
+    assert fresh_partitioned and existing_partitioned
+    assert fresh_rows == 0 and existing_rows == 2
+    assert fresh_indexes == existing_indexes
+    audit_indexes = [name for table, name, _ in fresh_indexes if table == "audit_logs"]
+    assert len(audit_indexes) == len(set(audit_indexes))
+    assert AUDIT_COMPOSITE_INDEXES <= set(audit_indexes)
+    print(f"PASS: fresh and existing databases both applied {len(every_file)} migrations and share {len(fresh_indexes)} indexes")
+
+
+if __name__ == "__main__":
+    test_header_directives()
+    test_fresh_and_existing_databases_converge()
@@ -0,0 +1,166 @@
+"""
+Test keyset pagination: cursors round-trip, malformed cursors are a 400,
+and paging /my-applications, /applications and /activity/* on SQLite
+visits every row once, in (created_at DESC, id DESC) order, even when
+many rows share a created_at
+"""
+import asyncio
+import tempfile
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from fastapi import HTTPException
+
+import main
+import models
+import pagination
+from test_eligibility import _api
+
+PAGE = 4
+# 5 distinct timestamps, each shared by several rows: pages must split ties by id
+TIMESTAMPS = [datetime(2026, 3, 1, tzinfo=timezone.utc) + timedelta(hours=h) for h in range(5)]
+
+
+def test_cursor_round_trip():
+    for created_at in (datetime(2026, 3, 1, 12, 30, 15, 123456, tzinfo=timezone.utc), datetime(2026, 3, 1, 12, 30)):
+        row_id = uuid.uuid4()
+        cursor = pagination.encode_cursor(created_at, row_id)
+        assert "=" not in cursor and "/" not in cursor and "+" not in cursor
+        assert pagination.decode_cursor(cursor) == (created_at, row_id)
+
+    for malformed in ("not-a-cursor", "", "W10", pagination.encode_cursor(datetime.now(), uuid.uuid4())[:-3]):
+        try:
+            pagination.decode_cursor(malformed)
+            raise AssertionError(f"{malformed!r} decoded")
+        except HTTPException as e:
+            assert e.status_code == 400
+    print("PASS: cursors round-trip and malformed cursors raise 400")
+
+
+async def _page_through(client, path, items_of):
+    """Follow X-Next-Cursor to the end -> (ids in order, number of pages)"""
+    ids, pages, cursor = [], 0, None
+    while True:
+        params = {"limit": PAGE, **({"cursor": cursor} if cursor else {})}
+        response = await client.get(path, params=params)
+        assert response.status_code == 200, (path, response.text)
+        items = items_of(response.json())
+        pages += 1
+        ids.extend(item["id"] for item in items)
+        cursor = response.headers.get(pagination.NEXT_CURSOR_HEADER)
+        if response.headers[pagination.HAS_MORE_HEADER] == "false":
+            assert cursor is None, "last page must not carry a cursor"
+            assert len(items) <= PAGE
+            return ids, pages
+        assert cursor and len(items) == PAGE
+        assert pages < 50, "pagination did not terminate"
+
+
+def _expected(rows):
+    """ids ordered newest first, id descending within a timestamp"""
+    return [str(row_id) for _, row_id in sorted(rows, reverse=True)]
+
+
+async def _seed_applications(sessions, user_id, count):
+    rows = []
+    async with sessions() as db:
+        for n in range(count):
+            application = models.LoanApplication(
+                id=uuid.uuid4(), user_id=user_id, features_json={}, created_at=TIMESTAMPS[n % len(TIMESTAMPS)],
+                loan_amount=100000 + n, loan_purpose="Personal"
+            )
+            db.add(application)
+            rows.append((application.created_at, application.id))
+        await db.commit()
+    return rows
+
+
+def test_my_applications_pages_cover_everything_once():
+    async def run(tmp):
+        async with _api(tmp, role="customer") as (sessions, user_id, client):
+            rows = await _seed_applications(sessions, user_id, 23)
+            ids, pages = await _page_through(client, "/my-applications", lambda body: body)
+            bad = await client.get("/my-applications", params={"cursor": "garbage"})
+            return rows, ids, pages, bad
+
+    with tempfile.TemporaryDirectory() as tmp:
+        rows, ids, pages, bad = asyncio.run(run(tmp))
+
+    assert ids == _expected(rows) and len(set(ids)) == 23
+    assert pages == 6
+    assert bad.status_code == 400
+    print(f"PASS: /my-applications returned 23 applications over {pages} pages, ties split by id")
+
+
+def test_officer_applications_pages_cover_everything_once():
+    async def run(tmp):
+        async with _api(tmp, role="bank_officer") as (sessions, officer_id, client):
+            rows = []
+            for customer in range(3):
+                customer_id = uuid.uuid4()
+                async with sessions() as db:
+                    db.add(models.User(id=customer_id, mobile_number=f"800000000{customer}", password_hash="x"))
+                    await db.commit()
+                rows += await _seed_applications(sessions, customer_id, 7)
+            ids, pages = await _page_through(client, "/applications", lambda body: body)
+            exact = await client.get("/applications", params={"limit": len(rows)})
+            bad = await client.get("/applications", params={"cursor": "e30"})
+            return rows, ids, pages, exact, bad
+
+    with tempfile.TemporaryDirectory() as tmp:
+        rows, ids, pages, exact, bad = asyncio.run(run(tmp))
+
+    assert ids == _expected(rows) and pages == 6
+    # A page that ends exactly on the last row is the last page
+    assert exact.headers[pagination.HAS_MORE_HEADER] == "false"
+    assert pagination.NEXT_CURSOR_HEADER not in exact.headers and len(exact.json()) == 21
+    assert bad.status_code == 400
+    print(f"PASS: /applications returned 21 applications over {pages} pages")
+
+
+def test_activity_pages_cover_everything_once():
+    async def run(tmp):
+        async with _api(tmp) as (sessions, user_id, client):
+            security, everything = [], []
+            async with sessions() as db:
+                for n in range(18):
+                    category = "SECURITY" if n % 3 else "LOAN"
+                    log = models.AuditLog(
+                        id=uuid.uuid4(), user_id=user_id, action="LOGIN_SUCCESS" if n % 3 else "LOAN_APPLIED",
+                        event_category=category, created_at=TIMESTAMPS[n % len(TIMESTAMPS)]
+                    )
+                    db.add(log)
+                    everything.append((log.created_at, log.id))
+                    if category == "SECURITY":
+                        security.append((log.created_at, log.id))
+                await db.commit()
+            all_ids, _ = await _page_through(client, "/activity", lambda body: body["events"])
+            security_ids, _ = await _page_through(client, "/activity/security", lambda body: body["events"])
+            bad = await client.get("/activity/security", params={"cursor": "!!"})
+            # total_events counts every event, not the page, without asking for it
+            first = (await client.get("/activity", params={"limit": 5})).json()
+            cap = main.ACTIVITY_TOTAL_CAP
+            main.ACTIVITY_TOTAL_CAP = 10
+            try:
+                capped = (await client.get("/activity", params={"limit": 5})).json()
+            finally:
+                main.ACTIVITY_TOTAL_CAP = cap
+            return everything, security, all_ids, security_ids, bad, first, capped
+
+    with tempfile.TemporaryDirectory() as tmp:
+        everything, security, all_ids, security_ids, bad, first, capped = asyncio.run(run(tmp))
+
+    assert all_ids == _expected(everything)
+    assert len(first["events"]) == 5
+    assert first["total_events"] == 18 and first["total_is_estimate"] is False
+    assert capped["total_events"] == 10 and capped["total_is_estimate"] is True
+    assert security_ids == _expected(security) and len(security_ids) == 12
+    assert bad.status_code == 400
+    print("PASS: /activity and /activity/security paged every event once; /activity totals the feed")
+
+
+if __name__ == "__main__":
+    test_cursor_round_trip()
+    test_my_applications_pages_cover_everything_once()
+    test_officer_applications_pages_cover_everything_once()
+    test_activity_pages_cover_everything_once()
@@ -0,0 +1,99 @@
+"""
+Test the prediction cache: LRU eviction, TTL expiry, invalidation on model
+reload, copy-on-hit with a fresh application_date, and key normalization
+"""
+import time
+
+import model_registry
+import prediction_cache
+from loan_advisor import get_advisor
+from prediction_cache import PredictionCache
+from warmup import WARMUP_PROFILE
+
+
+def _result(tag):
+    return {"decision": tag, "explanations": [{"feature": "income"}], "application_date": "2020-01-01T00:00:00"}
+
+
+def test_lru_eviction():
+    cache = PredictionCache(max_entries=2, ttl_seconds=60)
+    cache.put("a", _result("A"))
+    cache.put("b", _result("B"))
+    assert cache.get("a")["decision"] == "A"  # "a" is now the most recently used
+    cache.put("c", _result("C"))
+
+    assert cache.get("b") is None
+    assert cache.get("a")["decision"] == "A" and cache.get("c")["decision"] == "C"
+    assert cache.metrics()["evictions"] == 1
+    print("PASS: least recently used entry evicted")
+
+
+def test_ttl_expiry():
+    cache = PredictionCache(max_entries=8, ttl_seconds=0.05)
+    cache.put("a", _result("A"))
+    assert cache.get("a") is not None
+    time.sleep(0.1)
+    assert cache.get("a") is None
+    metrics = cache.metrics()
+    assert metrics["expirations"] == 1 and metrics["entries"] == 0
+    print("PASS: entry expired after its TTL")
+
+
+def test_hit_is_a_fresh_copy():
+    cache = PredictionCache(max_entries=8, ttl_seconds=60)
+    stored = _result("A")
+    cache.put("a", stored)
+    stored["explanations"].append({"feature": "mutated after put"})
+
+    first = cache.get("a")
+    assert first["explanations"] == [{"feature": "income"}]
+    assert first["application_date"] != "2020-01-01T00:00:00"
+    first["explanations"][0]["feature"] = "mutated by caller"
+
+    second = cache.get("a")
+    assert second["explanations"] == [{"feature": "income"}]
+    assert second["application_date"] >= first["application_date"]
+    print("PASS: hits are deep copies with a re-stamped application_date")
+
+
+def test_reload_invalidates():
+    cache = prediction_cache.get_prediction_cache()
+    cache.clear()
+    key = cache.make_key(WARMUP_PROFILE)
+    cache.put(key, _result("A"))
+    assert cache.get(key) is not None
+
+    model_registry.reload_model_bundle()
+
+    assert cache.get(key) is None
+    new_key = cache.make_key(WARMUP_PROFILE)
+    assert new_key != key  # generation bump: results computed before the reload can't be found
+    print("PASS: model reload cleared the cache and moved to a new key generation")
+
+
+def test_irrelevant_keys_share_a_key():
+    cache = PredictionCache()
+    base = dict(WARMUP_PROFILE)
+    variants = [
+        dict(base, request_id="abc-123", coapplicant_relationship="Spouse"),
+        dict(base, monthly_income=str(base["monthly_income"]), loan_amount=float(base["loan_amount"])),
+        {k: v for k, v in base.items() if k != "previous_loan_defaults"},
+    ]
+    key = cache.make_key(base)
+    assert all(cache.make_key(v) == key for v in variants)
+    assert cache.make_key(dict(base, loan_amount=base["loan_amount"] + 1)) != key
+
+    # Sharing a key is only safe if the analysis really is the same
+    advisor = get_advisor()
+    strip = lambda r: {k: v for k, v in r.items() if k != "application_date"}
+    expected = strip(advisor.analyze(base))
+    assert all(strip(advisor.analyze(v)) == expected for v in variants)
+    print("PASS: profiles differing only in irrelevant keys share one cache key")
+
+
+if __name__ == "__main__":
+    test_lru_eviction()
+    test_ttl_expiry()
+    test_hit_is_a_fresh_copy()
+    test_reload_invalidates()
+    test_irrelevant_keys_share_a_key()
@@ -0,0 +1,59 @@
+"""
+LoanPredictor under concurrency: one singleton however many threads ask
+for it, and predictions stay consistent while the model bundle reloads
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import loan_predictor
+import model_registry
+from test_advisor_concurrency import _applicants
+
+THREADS = 16
+
+
+def test_get_predictor_creates_one_instance():
+    loan_predictor._predictor = None
+    listeners = len(model_registry._reload_listeners)
+    barrier = threading.Barrier(THREADS)
+
+    def create(_):
+        barrier.wait()
+        return loan_predictor.get_predictor()
+
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        predictors = list(pool.map(create, range(THREADS)))
+
+    assert len({id(p) for p in predictors}) == 1
+    assert len(model_registry._reload_listeners) == listeners + 1
+    print(f"PASS: {THREADS} racing threads got one predictor")
+
+
+def test_predict_during_reload_matches_sequential():
+    predictor = loan_predictor.get_predictor()
+    applicants = _applicants(count=24, seed=11)
+    expected = [predictor.predict(a) for a in applicants]
+
+    stop = threading.Event()
+
+    def reload_repeatedly():
+        while not stop.is_set():
+            model_registry.reload_model_bundle()
+
+    reloader = threading.Thread(target=reload_repeatedly)
+    reloader.start()
+    try:
+        with ThreadPoolExecutor(max_workers=THREADS) as pool:
+            results = list(pool.map(predictor.predict, applicants * 4))
+    finally:
+        stop.set()
+        reloader.join()
+
+    mismatches = [i for i, result in enumerate(results) if result != expected[i % len(applicants)]]
+    assert not mismatches, f"{len(mismatches)} predictions changed across a reload of the same artifacts"
+    print(f"PASS: {len(results)} predictions stayed consistent while the bundle reloaded")
+
+
+if __name__ == "__main__":
+    test_get_predictor_creates_one_instance()
+    test_predict_during_reload_matches_sequential()
@@ -0,0 +1,91 @@
+"""
+Test ensure_schedule against a throwaway SQLite database: repeated and
+concurrent calls for one application leave exactly one row per EMI
+"""
+import asyncio
+import os
+import tempfile
+import uuid
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import models
+from repayment_service import ensure_schedule
+
+TENURE = 24
+CONCURRENT_CALLS = 8
+
+
+async def _setup(tmp):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tmp, 'repayments.db')}")
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync: models.Base.metadata.create_all(
+            sync, tables=[models.User.__table__, models.LoanApplication.__table__, models.Repayment.__table__]
+        ))
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    user_id = uuid.uuid4()
+    async with sessions() as db:
+        db.add(models.User(id=user_id, mobile_number="9000000001", password_hash="x"))
+        application = models.LoanApplication(
+            user_id=user_id, features_json={}, loan_amount=600000, loan_duration=TENURE, monthly_income=90000
+        )
+        db.add(application)
+        await db.commit()
+        await db.refresh(application)
+    return engine, sessions, application.id
+
+
+async def _ensure(sessions, application_id):
+    async with sessions() as db:
+        application = await db.get(models.LoanApplication, application_id)
+        return await ensure_schedule(db, application, 11.5)
+
+
+async def _rows(sessions, application_id):
+    async with sessions() as db:
+        return (await db.execute(
+            select(func.count(), func.count(func.distinct(models.Repayment.emi_number)))
+            .where(models.Repayment.application_id == application_id)
+        )).one()
+
+
+def test_repeated_calls_are_idempotent():
+    async def run(tmp):
+        engine, sessions, application_id = await _setup(tmp)
+        first = await _ensure(sessions, application_id)
+        second = await _ensure(sessions, application_id)
+        rows = await _rows(sessions, application_id)
+        await engine.dispose()
+        return first, second, rows
+
+    with tempfile.TemporaryDirectory() as tmp:
+        first, second, (count, distinct) = asyncio.run(run(tmp))
+
+    assert [r.emi_number for r in first] == list(range(1, TENURE + 1))
+    assert [r.id for r in second] == [r.id for r in first]
+    assert count == distinct == TENURE
+    print(f"PASS: second call returned the same {TENURE} installments")
+
+
+def test_concurrent_calls_create_one_schedule():
+    async def run(tmp):
+        engine, sessions, application_id = await _setup(tmp)
+        # return_exceptions=False: any IntegrityError would fail the test here
+        results = await asyncio.gather(*(_ensure(sessions, application_id) for _ in range(CONCURRENT_CALLS)))
+        rows = await _rows(sessions, application_id)
+        await engine.dispose()
+        return results, rows
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results, (count, distinct) = asyncio.run(run(tmp))
+
+    assert count == distinct == TENURE
+    ids = [r.id for r in results[0]]
+    assert all([r.id for r in schedule] == ids for schedule in results)
+    print(f"PASS: {CONCURRENT_CALLS} concurrent calls left exactly {TENURE} rows")
+
+
+if __name__ == "__main__":
+    test_repeated_calls_are_idempotent()
+    test_concurrent_calls_create_one_schedule()
@@ -0,0 +1,82 @@
+"""
+Test the report artifact cache: keys follow the report inputs, repeat
+requests are served from disk, concurrent misses share one render, and
+eviction keeps the cache within its byte budget
+"""
+import asyncio
+import os
+import tempfile
+from types import SimpleNamespace
+
+import report_cache
+from report_cache import ReportCache
+
+
+def _inputs(city="Pune", emi=16600.0):
+    context = SimpleNamespace(id="app-1", full_name="Asha Rao", address=f"12 MG Road, {city}")
+    analysis = {"decision": "APPROVED", "emi": {"monthly": emi}}
+    return context, analysis
+
+
+def test_key_follows_inputs():
+    key = report_cache.report_key(*_inputs())
+    assert key == report_cache.report_key(*_inputs())
+    assert key != report_cache.report_key(*_inputs(city="Mumbai"))
+    assert key != report_cache.report_key(*_inputs(emi=16601.0))
+
+    assert report_cache.etag_matches(f'W/"{key}", "other"', key)
+    assert report_cache.etag_matches("*", key)
+    assert not report_cache.etag_matches('"other"', key)
+    assert not report_cache.etag_matches(None, key)
+    print("PASS: cache key and ETag follow the report inputs")
+
+
+def test_hits_and_single_render():
+    renders = []
+
+    async def render():
+        renders.append(1)
+        await asyncio.sleep(0.05)
+        return b"%PDF-" + b"x" * 100
+
+    async def run(tmp):
+        cache = ReportCache(tmp, max_bytes=10_000)
+        results = await asyncio.gather(*[cache.get_or_render("user-1", "k1", render) for _ in range(5)])
+        assert all(result == results[0] for result in results)
+        assert len(renders) == 1
+
+        assert await cache.get_or_render("user-1", "k1", render) == results[0]
+        assert len(renders) == 1
+        # A fresh process (another worker) finds the artifact on disk
+        assert ReportCache(tmp, max_bytes=10_000).get("user-1", "k1") == results[0]
+
+        cache.invalidate_user("user-1")
+        assert cache.get("user-1", "k1") is None
+        await cache.get_or_render("user-1", "k1", render)
+        assert len(renders) == 2
+
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(run(tmp))
+    print("PASS: repeat downloads are file reads, concurrent misses render once")
+
+
+def test_lru_eviction_by_bytes():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ReportCache(tmp, max_bytes=1000)
+        for index in range(4):
+            cache.put("user-1", f"k{index}", b"x" * 300)
+        assert cache.get("user-1", "k0") is None  # Oldest went first
+        cache.get("user-1", "k1")  # k1 is now most recent
+        cache.put("user-2", "k4", b"x" * 300)
+
+        assert cache.get("user-1", "k2") is None
+        assert cache.get("user-1", "k1") is not None
+        assert cache.metrics()["bytes"] <= 1000
+        assert sorted(os.listdir(tmp)) == ["user-1.k1.pdf", "user-1.k3.pdf", "user-2.k4.pdf"]
+    print("PASS: least recently served artifacts evicted within the byte budget")
+
+
+if __name__ == "__main__":
+    test_key_follows_inputs()
+    test_hits_and_single_render()
+    test_lru_eviction_by_bytes()
@@ -0,0 +1,76 @@
+"""
+Test the report charts: the vector backend draws every chart without
+embedding images or leaking drawing state, and the PNG fallback rasterizes
+a repeated gauge only once
+"""
+import report_charts
+import report_generator
+from test_report_service import _application
+from report_service import build_report_inputs
+
+
+def _page():
+    pdf = report_generator.RBICompliantLoanReport()
+    pdf.add_page()
+    return pdf
+
+
+def test_vector_charts_keep_state():
+    _, analysis = build_report_inputs(_application())
+    pdf = _page()
+    pdf.set_font('Arial', '', 9)
+    pdf.set_text_color(10, 20, 30)
+    pdf.set_xy(15, 40)
+    state = (pdf.font_style, pdf.font_size_pt, pdf.text_color, pdf.fill_color, pdf.line_width, pdf.get_x(), pdf.get_y())
+
+    report_charts.approval_gauge(pdf, 35, 40, 140, 70, 84.0, 'APPROVED')
+    report_charts.credit_score_gauge(pdf, 30, 120, 150, 50, 783)
+    report_charts.loan_breakdown_pie(pdf, 55, 180, 100, 60, 500000, 97600)
+    pdf.add_page()
+    report_charts.emi_schedule_chart(pdf, 10, 40, 190, 80, 500000, 11.5, 36)
+    report_charts.risk_radar_chart(pdf, 40, 130, 130, 130, analysis)
+    pdf.set_xy(15, 40)
+
+    assert (pdf.font_style, pdf.font_size_pt, pdf.text_color, pdf.fill_color, pdf.line_width, pdf.get_x(), pdf.get_y()) == state
+    assert pdf.page == 2
+    assert b"/Subtype /Image" not in bytes(pdf.output())
+
+    try:
+        report_charts.loan_breakdown_pie(_page(), 55, 40, 100, 60, 0, 0)
+        raise AssertionError("empty pie should be rejected")
+    except ValueError:
+        pass
+    print("PASS: vector charts drawn without images or leaked state")
+
+
+def test_report_uses_vector_charts():
+    context, analysis = build_report_inputs(_application())
+    pdf = bytes(report_generator.generate_loan_report_pdf(context, analysis))
+    assert pdf[:5] == b"%PDF-"
+    assert b"/Subtype /Image" not in pdf
+    print(f"PASS: vector report rendered ({len(pdf):,} bytes)")
+
+
+def test_png_gauges_memoized():
+    if report_charts._pyplot() is None:
+        print("SKIP: matplotlib not installed")
+        return
+    backend = report_charts.REPORT_CHART_BACKEND
+    report_charts.REPORT_CHART_BACKEND = 'png'
+    try:
+        report_charts._png_approval_gauge.cache_clear()
+        pdf = _page()
+        for probability in (84.0, 84.04, 83.96):  # All print as 84.0%
+            report_charts.approval_gauge(pdf, 35, 40, 140, 70, probability, 'APPROVED')
+        info = report_charts.png_cache_info()["approval_gauge"]
+        assert info["misses"] == 1 and info["hits"] == 2
+        assert b"/Subtype /Image" in bytes(pdf.output())
+    finally:
+        report_charts.REPORT_CHART_BACKEND = backend
+    print("PASS: PNG gauge rasterized once per bucket")
+
+
+if __name__ == "__main__":
+    test_vector_charts_keep_state()
+    test_report_uses_vector_charts()
+    test_png_gauges_memoized()
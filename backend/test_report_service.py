@@ -0,0 +1,135 @@
+"""
+Test the report rendering service: reports are rendered in worker
+processes from picklable inputs, and a render past the timeout is aborted
+without taking its worker down
+"""
+import asyncio
+import multiprocessing
+import re
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timezone
+from types import SimpleNamespace
+
+import report_cache
+import report_service
+
+
+def _application(predicted_at=datetime(2026, 3, 2, 4, 15, tzinfo=timezone.utc)):
+    user = SimpleNamespace(
+        first_name="Asha", last_name="Rao", email="asha@example.com", mobile_number="9000000001",
+        date_of_birth=date(1990, 4, 2), gender="Female", address_line1="12 MG Road", city="Pune",
+        state="Maharashtra", pincode="411001", pan_number="ABCDE1234F", customer_id="LA20260001",
+        kyc_verified=True
+    )
+    prediction = SimpleNamespace(
+        decision="APPROVED", decision_reason="Strong profile", approval_probability=84.0,
+        interest_rate=11.5, emi=16600.0, total_repayment=597600.0, created_at=predicted_at,
+        shap_summary=[{"factor": "Credit Score", "impact": "positive", "shap_value": 0.4,
+                       "description": "Above the minimum threshold"}]
+    )
+    return SimpleNamespace(
+        id="6f1c2b1e-0000-4000-8000-000000000001", user=user, prediction=prediction,
+        loan_amount=500000.0, loan_duration=36, loan_purpose="Personal", monthly_income=90000.0,
+        monthly_debt_payments=5000.0, employment_status="Employed", job_tenure=4, experience=8, age=35,
+        home_ownership_status="Rent", education_level="Bachelor", gender="Female",
+        created_at=datetime(2026, 2, 27, 20, 0, tzinfo=timezone.utc)
+    )
+
+
+def test_report_inputs():
+    context, analysis = report_service.build_report_inputs(_application())
+    assert context.full_name == "Asha Rao"
+    assert context.address == "12 MG Road, Pune, Maharashtra - 411001"
+    assert analysis["emi"]["total_interest"] == 97600.0
+    assert round(analysis["income_analysis"]["emi_to_income_ratio"], 2) == 18.44
+    assert 300 <= analysis["credit_score"]["score"] <= 900
+    print("PASS: report inputs built from application + prediction")
+
+
+def test_render_and_timeout():
+    async def run():
+        service = report_service.ReportService(workers=1, max_queue=0)
+        context, analysis = report_service.build_report_inputs(_application())
+        try:
+            pdf = await service.render(context, analysis)
+            assert pdf[:5] == b"%PDF-"
+
+            service.timeout = 0.01
+            try:
+                await service.render(context, analysis)
+                raise AssertionError("render should have timed out")
+            except report_service.ReportTimeout:
+                pass
+
+            # Same worker process keeps serving
+            service.timeout = report_service.REPORT_TIMEOUT
+            assert (await service.render(context, analysis))[:5] == b"%PDF-"
+            metrics = service.metrics()
+            assert metrics["timeouts"] == 1 and metrics["completed"] == 2
+        finally:
+            service.shutdown()
+
+    asyncio.run(run())
+    print("PASS: render in a worker process, timeout aborts only that report")
+
+
+def _page_text(pdf: bytes) -> str:
+    streams = re.findall(rb"stream\r?\n(.*?)\r?\nendstream", pdf, re.S)
+    text = []
+    for stream in streams:
+        try:
+            text.append(zlib.decompress(stream).decode("latin-1"))
+        except zlib.error:
+            continue
+    return "\n".join(text)
+
+
+def test_same_inputs_render_same_pdf():
+    context, analysis = report_service.build_report_inputs(_application())
+    key = report_cache.report_key(context, analysis)
+    report_id = report_cache.report_id(key)
+
+    async def run():
+        # Two spawned workers: separate processes, separate hash seeds
+        service = report_service.ReportService(workers=2, max_queue=4)
+        try:
+            return await asyncio.gather(*(service.render(context, analysis, report_id) for _ in range(4)))
+        finally:
+            service.shutdown()
+
+    pdfs = asyncio.run(run())
+    pdfs.append(report_service.render(context, analysis, report_id=report_id))
+    assert all(pdf == pdfs[0] for pdf in pdfs)
+
+    text = _page_text(pdfs[0])
+    assert f"Report ID: {report_id}" in text
+    assert "Generated: 02-Mar-2026 09:45:00 IST" in text  # prediction time, in IST
+    assert "28-Feb-2026" in text  # Application Date: 20:00 UTC is the next day in IST
+
+    # A later prediction is a different report
+    later = report_service.build_report_inputs(_application(datetime(2026, 4, 1, tzinfo=timezone.utc)))
+    assert report_cache.report_key(*later) != key
+    print(f"PASS: {len(pdfs)} renders of the same inputs are byte-identical ({report_id})")
+
+
+def _report_key():
+    return report_cache.report_key(*report_service.build_report_inputs(_application()))
+
+
+def test_report_key_is_stable_across_processes():
+    # Every API worker (and every restart) must compute the same key, ETag and Report ID
+    keys = [_report_key()]
+    for _ in range(2):
+        # A fresh spawned interpreter each time: separate hash() salts
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            keys.append(pool.submit(_report_key).result())
+    assert len(set(keys)) == 1, keys
+    print(f"PASS: {len(keys)} processes build the same report key")
+
+
+if __name__ == "__main__":
+    test_report_inputs()
+    test_render_and_timeout()
+    test_same_inputs_render_same_pdf()
+    test_report_key_is_stable_across_processes()
@@ -0,0 +1,91 @@
+"""
+Test the QR share-token stores: tokens resolve until they expire, the
+database store is shared by independent store instances (workers), and
+both stores sweep expired tokens; the in-memory store stays bounded
+"""
+import asyncio
+import os
+import tempfile
+import uuid
+from datetime import timedelta
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+import models
+from share_tokens import DBTokenStore, MemoryTokenStore
+
+
+def test_memory_store_expiry_and_bound():
+    async def run():
+        store = MemoryTokenStore(max_entries=3)
+        application_id = uuid.uuid4()
+        token, expires_at = await store.issue(application_id)
+        shared = await store.resolve(token)
+        assert shared.application_id == application_id and not shared.expired
+        assert await store.resolve("unknown") is None
+
+        store.ttl = timedelta(seconds=-1)
+        stale, _ = await store.issue(application_id)
+        assert (await store.resolve(stale)).expired  # Still there for a 410 until swept
+        assert await store.sweep() == 1
+        assert await store.resolve(stale) is None
+
+        # Full of live tokens: the one closest to expiry makes room
+        tokens = []
+        for hours in (5, 1, 3, 4):
+            store.ttl = timedelta(hours=hours)
+            tokens.append((await store.issue(application_id))[0])
+        # Issuing 3h evicted the 1h token, issuing 4h then evicted the 3h one
+        assert [await store.resolve(t) is not None for t in tokens] == [True, False, False, True]
+        assert await store.resolve(token) is not None
+        assert store.metrics()["entries"] == 3 and store.metrics()["evictions"] == 2
+
+        await store.revoke(token)
+        assert await store.resolve(token) is None
+
+    asyncio.run(run())
+    print("PASS: memory store resolves, expires, sweeps and stays bounded")
+
+
+def test_db_store_shared_between_workers():
+    async def run(tmp):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tmp, 'tokens.db')}")
+        async with engine.begin() as conn:
+            await conn.run_sync(lambda sync: models.Base.metadata.create_all(
+                sync, tables=[models.User.__table__, models.LoanApplication.__table__,
+                              models.ReportShareToken.__table__]
+            ))
+        application_id = uuid.uuid4()
+        worker_a, worker_b = DBTokenStore(engine), DBTokenStore(engine, sweep_batch=2)
+
+        token, expires_at = await worker_a.issue(application_id)
+        shared = await worker_b.resolve(token)
+        assert shared.application_id == application_id and not shared.expired
+        assert abs((shared.expires_at - expires_at).total_seconds()) < 1
+
+        async with engine.connect() as conn:
+            stored = (await conn.execute(select(models.ReportShareToken.token_hash))).scalars().all()
+        assert token not in stored  # Only the hash is persisted
+
+        worker_a.ttl = timedelta(seconds=-1)
+        stale = [(await worker_a.issue(application_id))[0] for _ in range(5)]
+        assert (await worker_b.resolve(stale[0])).expired
+        assert await worker_b.sweep() == 5  # Batches of 2
+        assert await worker_b.resolve(stale[0]) is None
+        assert await worker_b.resolve(token) is not None
+
+        await worker_b.revoke(token)
+        assert await worker_a.resolve(token) is None
+        async with engine.connect() as conn:
+            assert (await conn.execute(select(func.count()).select_from(models.ReportShareToken.__table__))).scalar() == 0
+        await engine.dispose()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(run(tmp))
+    print("PASS: DB store shared across workers, expired tokens swept in batches")
+
+
+if __name__ == "__main__":
+    test_memory_store_expiry_and_bound()
+    test_db_store_shared_between_workers()
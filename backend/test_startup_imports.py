@@ -0,0 +1,61 @@
+"""
+Test that `import main` stays light: the model stack, report rendering and
+other heavy modules load on first use or in the warm-up, not at startup
+"""
+import json
+import os
+import subprocess
+import sys
+
+import bench_startup_imports
+
+
+def test_heavy_modules_stay_lazy():
+    total, modules, _ = bench_startup_imports.measure()
+    assert "main" in modules and total > 0
+    eager = [name for name in bench_startup_imports.LAZY_MODULES if name in modules]
+    assert not eager, f"Imported at startup: {eager}"
+    print(f"PASS: import main in {total:.0f} ms without {len(bench_startup_imports.LAZY_MODULES)} heavy modules")
+
+
+# Imported only inside the report worker processes, never by the API process
+REPORT_WORKER_MODULES = ("report_generator", "report_charts", "fpdf", "matplotlib")
+
+
+def request_path_modules():
+    """The deferred modules an API request can import in-process"""
+    from explanation_engine import EXPLANATION_BACKEND
+    skip = set(REPORT_WORKER_MODULES)
+    if EXPLANATION_BACKEND != "shap":
+        skip.add("shap")  # the native explanation backend never builds a TreeExplainer
+    return [name for name in bench_startup_imports.LAZY_MODULES if name not in skip]
+
+
+def test_warmup_covers_lazy_imports():
+    # A fresh interpreter, so modules imported by other tests don't count
+    script = (
+        "import json, sys, main, warmup\n"
+        "before = sorted(sys.modules)\n"
+        "state = warmup.warm_up()\n"
+        "print(json.dumps({'ready': state['ready'], 'error': state['error'],"
+        " 'before': before, 'after': sorted(sys.modules)}))\n"
+    )
+    env = dict(os.environ, MODEL_WARMUP="false")
+    result = subprocess.run(
+        [sys.executable, "-c", script], cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env, capture_output=True, text=True, check=True
+    )
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    assert report["ready"], report["error"]
+
+    expected = request_path_modules()
+    preloaded = [name for name in expected if name in report["before"]]
+    assert not preloaded, f"Not deferred by main.py: {preloaded}"
+    missing = [name for name in expected if name not in report["after"]]
+    assert not missing, f"Still imported on the first request after warm-up: {missing}"
+    print(f"PASS: warm-up loads all {len(expected)} deferred request-path modules")
+
+
+if __name__ == "__main__":
+    test_heavy_modules_stay_lazy()
+    test_warmup_covers_lazy_imports()
@@ -0,0 +1,103 @@
+"""
+Test that a failed warm-up leaves the instance not ready (/ready answers
+503), that warm_up_with_retry() recovers once the failure clears, and that
+an instance with MODEL_WARMUP=false still becomes ready. stop() ends a
+retry loop that would otherwise keep going
+"""
+import json
+import threading
+import time
+
+import main
+import warmup
+
+
+def _reset():
+    warmup._state.update(ready=False, attempts=0, error=None, skipped=False)
+    warmup._stop.clear()
+
+
+def test_failed_warmup_is_not_ready():
+    _reset()
+    lazy_imports = warmup.LAZY_IMPORTS
+    warmup.LAZY_IMPORTS = ("no_such_module_for_warmup",)
+    try:
+        state = warmup.warm_up_with_retry(max_attempts=2, delay=0.01)
+    finally:
+        warmup.LAZY_IMPORTS = lazy_imports
+
+    assert not state["ready"] and state["attempts"] == 2
+    assert "no_such_module_for_warmup" in state["error"]
+    assert not warmup.is_ready()
+
+    response = main.readiness_check()
+    assert response.status_code == 503
+    assert json.loads(response.body)["status"] == "warmup_failed"
+    print("PASS: failed warm-up keeps /ready at 503")
+
+
+def test_retry_recovers_after_failure():
+    _reset()
+    lazy_imports = warmup.LAZY_IMPORTS
+    calls = []
+
+    def flaky_wait(seconds):
+        # The failure clears while the retry loop is backing off
+        calls.append(seconds)
+        warmup.LAZY_IMPORTS = lazy_imports
+        return False
+
+    warmup.LAZY_IMPORTS = ("no_such_module_for_warmup",)
+    warmup._stop.wait = flaky_wait
+    try:
+        state = warmup.warm_up_with_retry(max_attempts=5, delay=0.01)
+    finally:
+        del warmup._stop.wait
+        warmup.LAZY_IMPORTS = lazy_imports
+
+    assert state["ready"] and state["error"] is None
+    assert state["attempts"] == 2 and len(calls) == 1
+    assert main.readiness_check()["status"] == "ready"
+    print("PASS: warm-up retried and /ready flipped to ready")
+
+
+def test_stop_ends_unbounded_retry():
+    _reset()
+    lazy_imports = warmup.LAZY_IMPORTS
+    warmup.LAZY_IMPORTS = ("no_such_module_for_warmup",)
+    result = {}
+    # Keeps failing with no attempt limit: only stop() ends it
+    thread = threading.Thread(target=lambda: result.update(warmup.warm_up_with_retry(max_attempts=0, delay=30)))
+    try:
+        thread.start()
+        deadline = time.monotonic() + 5
+        while warmup.get_status()["attempts"] < 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        warmup.stop()
+        thread.join(timeout=5)
+    finally:
+        warmup.LAZY_IMPORTS = lazy_imports
+
+    assert not thread.is_alive(), "retry loop ignored stop()"
+    assert not result["ready"] and result["attempts"] == 1
+    _reset()
+    print("PASS: stop() ends the retry loop mid-backoff")
+
+
+def test_disabled_warmup_is_ready():
+    _reset()
+    assert main.readiness_check().status_code == 503
+
+    state = warmup.skip()
+    assert state["ready"] and state["skipped"] and state["attempts"] == 0
+    body = main.readiness_check()
+    assert body["status"] == "skipped" and body["ready"]
+    _reset()
+    print("PASS: MODEL_WARMUP=false answers /ready with 200 skipped")
+
+
+if __name__ == "__main__":
+    test_failed_warmup_is_not_ready()
+    test_retry_recovers_after_failure()
+    test_stop_ends_unbounded_retry()
+    test_disabled_warmup_is_ready()
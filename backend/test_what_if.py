@@ -0,0 +1,47 @@
+"""
+Test the what-if grid: vectorized EMI and batched scoring give the same
+numbers as one analyze() call per cell
+"""
+import numpy as np
+
+from loan_advisor import EMICalculator, get_advisor
+from test_advisor_concurrency import _applicants
+
+
+def test_vectorized_emi_matches_scalar():
+    rng = np.random.default_rng(0)
+    principal = rng.uniform(10000, 5000000, 500).round(0)
+    rate = rng.choice([0.0, 10.5, 11.25, 12.5, 13.75, 15.4, 18.0], 500)
+    duration = rng.choice([6, 12, 36, 60, 84, 120, 240], 500)
+
+    many = EMICalculator.calculate_many(principal, rate, duration)
+    for idx in range(500):
+        single = EMICalculator.calculate(float(principal[idx]), float(rate[idx]), int(duration[idx]))
+        for key in ('emi', 'total_interest', 'total_repayment'):
+            assert many[key][idx] == single[key]
+    print("PASS: calculate_many matches calculate")
+
+
+def test_what_if_matches_analyze():
+    advisor = get_advisor()
+    axes = [
+        ('loan_amount', [100000, 750000, 3000000]),
+        ('loan_duration', [12, 60, 120]),
+        ('cibil_score', [580, 720, 820]),
+    ]
+    for base in _applicants(count=6):
+        grid = advisor.what_if(base, axes)
+        assert grid['count'] == 27
+        for cell in grid['cells']:
+            result = advisor.analyze({**base, **cell['inputs']})
+            assert cell['decision'] == result['decision']
+            assert cell['approval_probability'] == result['ml_probability']
+            assert cell['interest_rate'] == result['interest_rate']['annual']
+            assert cell['emi'] == result['emi']['monthly']
+            assert cell['emi_to_income_ratio'] == result['income_analysis']['emi_to_income_ratio']
+    print("PASS: what-if grid matches per-cell analyze()")
+
+
+if __name__ == "__main__":
+    test_vectorized_emi_matches_scalar()
+    test_what_if_matches_analyze()
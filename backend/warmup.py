@@ -0,0 +1,152 @@
+"""
+Startup warm-up for the ML services.
+
+Loads the shared model bundle, builds LoanAdvisor / LoanPredictor, and
+runs one synthetic inference (including a SHAP call) so the first real
+request doesn't pay for joblib loads, TreeExplainer construction or
+XGBoost's first-call setup. It also imports the modules main.py leaves
+out of its import path (LAZY_IMPORTS), off the request path.
+
+/health stays a pure liveness check; /ready reports this warm-up state so
+the load balancer only routes traffic to warm instances. A failed warm-up
+leaves the instance not ready: warm_up_with_retry() tries again with
+backoff (WARMUP_RETRY_DELAY seconds, doubling up to WARMUP_RETRY_MAX_DELAY)
+until it succeeds, WARMUP_MAX_ATTEMPTS is reached (0 = keep trying) or
+stop() is called at shutdown.
+With MODEL_WARMUP=false nothing is preloaded: skip() marks the instance
+ready straight away and /ready answers "skipped".
+"""
+
+import importlib
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict
+
+MODEL_WARMUP = os.getenv("MODEL_WARMUP", "true").lower() != "false"
+WARMUP_MAX_ATTEMPTS = int(os.getenv("WARMUP_MAX_ATTEMPTS", "0"))
+WARMUP_RETRY_DELAY = float(os.getenv("WARMUP_RETRY_DELAY", "5"))
+WARMUP_RETRY_MAX_DELAY = float(os.getenv("WARMUP_RETRY_MAX_DELAY", "60"))
+
+# Synthetic applicant used only for warm-up (never persisted)
+WARMUP_PROFILE = {
+    'gender': 'Male',
+    'age': 35,
+    'employment_status': 'Employed',
+    'education_level': 'Bachelor',
+    'experience': 8,
+    'job_tenure': 4,
+    'monthly_income': 75000,
+    'monthly_debt_payments': 5000,
+    'loan_amount': 500000,
+    'loan_duration': 60,
+    'loan_purpose': 'Personal',
+    'marital_status': 'Married',
+    'number_of_dependents': 1,
+    'home_ownership_status': 'Rent',
+    'property_area': 'Urban',
+    'previous_loan_defaults': 'No',
+    'cibil_score': 720,
+}
+
+# Imported on first use by the API (see bench_startup_imports.py); loaded here in the background
+LAZY_IMPORTS = ("amortization", "qrcode")
+
+_state = {
+    "ready": False,
+    "started_at": None,
+    "finished_at": None,
+    "duration_ms": None,
+    "model_version": None,
+    "attempts": 0,
+    "error": None,
+    "skipped": False,
+}
+_lock = threading.Lock()
+# Set at shutdown; ends warm_up_with_retry() so its executor thread can be joined
+_stop = threading.Event()
+
+
+def warm_up() -> Dict[str, Any]:
+    """
+    Load models and run a synthetic prediction + SHAP explanation (blocking).
+    Marks the instance ready only if every step succeeded.
+    """
+    with _lock:
+        if _state["ready"]:
+            return dict(_state)
+
+        start = time.perf_counter()
+        _state["started_at"] = datetime.utcnow().isoformat()
+        _state["attempts"] += 1
+        try:
+            for name in LAZY_IMPORTS:
+                importlib.import_module(name)
+
+            from model_registry import get_model_bundle
+            from loan_advisor import get_advisor
+            from loan_predictor import get_predictor
+
+            bundle = get_model_bundle()
+            _state["model_version"] = bundle.version
+
+            advisor = get_advisor()
+            advisor.analyze(dict(WARMUP_PROFILE))  # predict_proba + SHAP
+            advisor.analyze_batch([dict(WARMUP_PROFILE), dict(WARMUP_PROFILE)])
+            get_predictor().predict(dict(WARMUP_PROFILE))
+        except Exception as e:
+            # Not ready: /ready keeps answering 503 until a retry succeeds
+            print(f"[Warmup] Warm-up attempt {_state['attempts']} failed: {e}")
+            _state["error"] = str(e)
+        else:
+            _state["error"] = None
+            _state["ready"] = True
+
+        _state["duration_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        _state["finished_at"] = datetime.utcnow().isoformat()
+        if _state["ready"]:
+            print(f"[Warmup] Ready in {_state['duration_ms']} ms")
+        return dict(_state)
+
+
+def warm_up_with_retry(max_attempts: int = WARMUP_MAX_ATTEMPTS,
+                       delay: float = WARMUP_RETRY_DELAY,
+                       max_delay: float = WARMUP_RETRY_MAX_DELAY) -> Dict[str, Any]:
+    """Run warm_up() until it succeeds, backing off between attempts (blocking; stop() ends it)"""
+    attempt = 0
+    while not _stop.is_set():
+        state = warm_up()
+        attempt += 1
+        if state["ready"] or (max_attempts and attempt >= max_attempts):
+            if not state["ready"]:
+                print(f"[Warmup] Giving up after {attempt} attempts; instance stays not ready")
+            return state
+        print(f"[Warmup] Retrying in {delay:.1f}s")
+        _stop.wait(delay)
+        delay = min(delay * 2, max_delay)
+    print("[Warmup] Stopped before warm-up succeeded")
+    return get_status()
+
+
+def stop():
+    """Shutdown: end the retry loop at its next backoff"""
+    _stop.set()
+
+
+def skip() -> Dict[str, Any]:
+    """Warm-up disabled: ready now, models load on the first request"""
+    with _lock:
+        _state["skipped"] = True
+        _state["ready"] = True
+        _state["finished_at"] = datetime.utcnow().isoformat()
+        print("[Warmup] MODEL_WARMUP=false, skipping warm-up")
+        return dict(_state)
+
+
+def is_ready() -> bool:
+    return _state["ready"]
+
+
+def get_status() -> Dict[str, Any]:
+    return dict(_state)
@@ -3162,7 +3162,7 @@ export default function Dashboard() {
                             {activityTab === "all" ? "All Activity" : `${activityTab.charAt(0).toUpperCase() + activityTab.slice(1)} Activity`}
                         </h3>
                         <span className="text-gray-400 text-sm">
-                            {activityData.total_events || activityData.events?.length || 0} events
+                            {activityData.total_events || activityData.events?.length || 0}{activityData.total_is_estimate ? "+" : ""} events
                         </span>
                     </div>
 
@@ -417,7 +417,7 @@ export async function getDocuments(applicationId: string): Promise<KYCDocument[]
 // ACTIVITY LOG
 // =============================================================================
 
-export async function getActivityLog(limit: number = 50): Promise<{ total_events: number; events: ActivityEvent[] }> {
+export async function getActivityLog(limit: number = 50): Promise<{ total_events: number; total_is_estimate: boolean; events: ActivityEvent[] }> {
     const response = await authFetch(`${API_BASE_URL}/activity?limit=${limit}`);
     if (!response.ok) {
         const error: ApiError = await response.json();